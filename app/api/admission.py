@@ -0,0 +1,171 @@
+import math
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from urllib.parse import parse_qs
+
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.clients import client_key
+from app.config import Settings
+from app.metrics import ADMISSION_DECISIONS, ADMISSION_IN_FLIGHT
+
+# Проверки живости и сбор метрик не ограничиваются
+EXEMPT_PATHS = frozenset({"/health", "/metrics"})
+# Дорогие маршруты: полный проход по таблице или тысячи строк за запрос
+EXPENSIVE_PATHS = frozenset({"/drivers/export", "/drivers/bulk", "/drivers/lookup"})
+PAGE_PATHS = frozenset({"/drivers", "/drivers/"})
+# Долгие запросы (SSE, long-poll) почти всё время ждут: считаются отдельно от in_flight
+STREAMING_PATHS = frozenset({"/drivers/changes"})
+# Retry-After при перегрузке: очередь в процессе не держим, клиент повторяет сам
+OVERLOAD_RETRY_AFTER = 1
+# Причина отказа (метка decision) -> статус и detail ответа
+REJECTIONS = {
+    "rate_limited": (429, "Rate limit exceeded"),
+    "overloaded": (503, "Server is overloaded"),
+    "expensive_busy": (503, "Too many expensive requests in progress"),
+    "streams_busy": (503, "Too many change feed streams in progress"),
+}
+
+
+class RateLimitStore(ABC):
+    """Хранилище token bucket по ключу клиента: в памяти процесса, Redis и т.п."""
+
+    @abstractmethod
+    def take(self, key: str, rate: float, burst: int) -> float:
+        """Взять токен: 0 - запрос допущен, иначе через сколько секунд появится токен"""
+
+
+class InMemoryRateLimitStore(RateLimitStore):
+    """
+    Token bucket в памяти процесса. Лимит - на воркер: при N воркерах клиент
+    получает до N * rate. Бакеты давно не активных клиентов вытесняются (LRU).
+    """
+
+    def __init__(self, max_keys: int = 10_000) -> None:
+        self.max_keys = max_keys
+        # key -> (токены, время последнего пополнения)
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    def take(self, key: str, rate: float, burst: int) -> float:
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated_at = self._buckets.pop(key, (float(burst), now))
+            tokens = min(float(burst), tokens + (now - updated_at) * rate)
+            wait = 0.0
+            if tokens >= 1:
+                tokens -= 1
+            else:
+                wait = (1 - tokens) / rate
+            self._buckets[key] = (tokens, now)
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return wait
+
+
+def is_expensive(scope: Scope, page_limit: int) -> bool:
+    path = scope["path"]
+    if path in EXPENSIVE_PATHS:
+        return True
+    if path not in PAGE_PATHS or scope["method"] != "GET":
+        return False
+    values = parse_qs(scope["query_string"].decode("latin-1")).get("limit", [])
+    try:
+        return any(int(value) > page_limit for value in values)
+    except ValueError:
+        # Невалидный limit отклонит валидация маршрута
+        return False
+
+
+class AdmissionMiddleware:
+    """
+    ASGI middleware допуска запросов, проверки по порядку:
+
+    - token bucket на клиента - 429 с Retry-After до следующего токена;
+    - сброс нагрузки: в обработке уже max_in_flight_requests - 503; лента
+      изменений (SSE, long-poll) в них не входит и ограничена
+      max_streaming_requests;
+    - дорогие запросы (выгрузка, импорт, lookup, страницы больше
+      expensive_page_limit): одновременно не больше max_expensive_requests - 503.
+
+    Отказ мгновенный, без ожидания: лишние запросы не копятся в памяти и не
+    увеличивают задержку допущенных. Счётчики - в event loop, без блокировок.
+    """
+
+    def __init__(
+        self, app: ASGIApp, settings: Settings, store: RateLimitStore | None = None
+    ) -> None:
+        self.app = app
+        self.settings = settings
+        self.store = store or InMemoryRateLimitStore(settings.rate_limit_max_clients)
+        self.api_keys = settings.api_key_set
+        self.in_flight = 0
+        self.expensive_in_flight = 0
+        self.streaming_in_flight = 0
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"] in EXEMPT_PATHS:
+            await self.app(scope, receive, send)
+            return
+
+        settings = self.settings
+        if settings.rate_limit_per_second > 0:
+            wait = self.store.take(
+                client_key(scope, self.api_keys),
+                settings.rate_limit_per_second,
+                settings.rate_limit_burst,
+            )
+            if wait > 0:
+                await self._reject(scope, receive, send, "rate_limited", wait)
+                return
+        if scope["path"] in STREAMING_PATHS:
+            await self._stream(scope, receive, send)
+            return
+        if 0 < settings.max_in_flight_requests <= self.in_flight:
+            await self._reject(scope, receive, send, "overloaded", OVERLOAD_RETRY_AFTER)
+            return
+        expensive = settings.max_expensive_requests > 0 and is_expensive(
+            scope, settings.expensive_page_limit
+        )
+        if expensive and self.expensive_in_flight >= settings.max_expensive_requests:
+            await self._reject(scope, receive, send, "expensive_busy", OVERLOAD_RETRY_AFTER)
+            return
+
+        ADMISSION_DECISIONS.inc(decision="admitted")
+        self.in_flight += 1
+        self.expensive_in_flight += expensive
+        ADMISSION_IN_FLIGHT.observe(self.in_flight)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.in_flight -= 1
+            self.expensive_in_flight -= expensive
+
+    async def _stream(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if 0 < self.settings.max_streaming_requests <= self.streaming_in_flight:
+            await self._reject(scope, receive, send, "streams_busy", OVERLOAD_RETRY_AFTER)
+            return
+        ADMISSION_DECISIONS.inc(decision="admitted")
+        self.streaming_in_flight += 1
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.streaming_in_flight -= 1
+
+    async def _reject(
+        self, scope: Scope, receive: Receive, send: Send, reason: str, wait: float
+    ) -> None:
+        ADMISSION_DECISIONS.inc(decision=reason)
+        status_code, detail = REJECTIONS[reason]
+        response = JSONResponse(
+            {"detail": detail},
+            status_code=status_code,
+            headers={"Retry-After": str(max(1, math.ceil(wait)))},
+        )
+        await response(scope, receive, send)
@@ -1,24 +1,100 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+import json
+import time
+from collections.abc import AsyncIterator, Callable, Iterator, Sequence
+from typing import Any, TypeVar
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response
 from fastapi import status as http_status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+from sqlalchemy import Row
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.database.session import get_db
+from app.api.encoders import (
+    csv_header,
+    encode_changes,
+    encode_csv,
+    encode_lookup,
+    encode_ndjson,
+    encode_sse,
+    encode_sse_reset,
+    encode_versioned_driver,
+)
+from app.api.etags import CACHE_CONTROL, etag_matches, make_etag, not_modified
+from app.api.negotiation import VARY, negotiate
+from app.api.pagination import (
+    decode_cursor,
+    decode_search_cursor,
+    encode_cursor,
+    encode_search_cursor,
+)
+from app.database.session import get_read_session, get_session, track_write
 from app.models.domain.driver import DriverStatus
-from app.models.schemas.driver import DriverCreateRequest, DriverResponse
-from app.services.driver_service import DriverService
+from app.models.schemas.driver import (
+    BulkDriverReport,
+    BulkDriverResult,
+    BulkDriverStatus,
+    DriverChangesPage,
+    DriverCreateRequest,
+    DriverLookupRequest,
+    DriverLookupResponse,
+    DriverResponse,
+    DriverStatsResponse,
+    DriverStatusChange,
+    DriverUpdateRequest,
+    DriverVersionedResponse,
+    ExportFormat,
+    OnConflict,
+    StatusChangeOutcome,
+    StatusChangeReport,
+)
+from app.services.change_feed import driver_change_notifier
+from app.services.create_batcher import CreateQueueFullError
+from app.services.driver_service import (
+    BULK_BATCH_SIZE,
+    DriverChangesPrunedError,
+    DriverNotFoundError,
+    DriverService,
+    DriverVersionConflictError,
+)
 
 router = APIRouter(prefix="/drivers", tags=["drivers"])
 
+T = TypeVar("T")
+
+
+async def run_service(db: Session | AsyncSession, func: Callable[..., T], *args: Any) -> T:
+    """
+    Вызов синхронного метода DriverService без блокировки event loop:
+    через AsyncSession.run_sync (async путь) или в threadpool (sync путь).
+    """
+    if isinstance(db, AsyncSession):
+        return await db.run_sync(func, *args)
+    return await run_in_threadpool(func, db, *args)
+
+
+# Через сколько секунд повторить создание при переполненной очереди группового commit
+CREATE_RETRY_AFTER = "1"
+
 
 @router.post(
     "/",
     response_model=DriverResponse,
     status_code=http_status.HTTP_201_CREATED,
     summary="Создать профиль водителя",
+    dependencies=[Depends(track_write)],
 )
 async def create_driver(
-    driver_data: DriverCreateRequest, db: Session = Depends(get_db)
+    driver_data: DriverCreateRequest,
+    request: Request,
+    response: Response,
+    on_conflict: OnConflict = Query(
+        OnConflict.ERROR, description="error - 409 на дубликат, return - вернуть существующего"
+    ),
+    db: Session | AsyncSession = Depends(get_session),
 ) -> DriverResponse:
     """
     Создание нового профиля водителя.
@@ -26,10 +102,25 @@ async def create_driver(
     - **user_id**: ID пользователя в системе
     - **license_number**: Номер водительского удостоверения
     - **years_of_experience**: Опыт вождения в годах
+    - **on_conflict**: `return` делает запрос идемпотентным: водитель того же
+      user_id с этим номером прав возвращается с кодом 200
+
+    С AUTOPILOT_CREATE_BATCH_ENABLED=1 создание ждёт группового commit вместе
+    с конкурентными запросами; при переполненной очереди - 503 с Retry-After.
     """
+    batcher = request.app.state.create_batcher
     try:
-        # В create_driver после создания driver:
-        driver = DriverService.create_driver(db, driver_data)
+        if on_conflict == OnConflict.RETURN_EXISTING:
+            driver, created = await run_service(db, DriverService.get_or_create_driver, driver_data)
+            if not created:
+                response.status_code = http_status.HTTP_200_OK
+        elif batcher is not None:
+            driver = await batcher.submit(driver_data)
+        # Синхронный сервис уходит в threadpool, чтобы не блокировать event loop
+        elif isinstance(db, AsyncSession):
+            driver = await DriverService.create_driver_async(db, driver_data)
+        else:
+            driver = await run_in_threadpool(DriverService.create_driver, db, driver_data)
         if driver.id is None:
             raise HTTPException(
                 status_code=http_status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -49,6 +140,12 @@ async def create_driver(
             status_code=http_status.HTTP_409_CONFLICT,
             detail="Driver with this license number already exists",
         ) from None
+    except CreateQueueFullError as e:
+        raise HTTPException(
+            status_code=http_status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+            headers={"Retry-After": CREATE_RETRY_AFTER},
+        ) from None
     except Exception as e:
         raise HTTPException(
             status_code=http_status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -56,35 +153,504 @@ async def create_driver(
         ) from None
 
 
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def _parse_cursor(after: str | None) -> int | None:
+    if after is None:
+        return None
+    try:
+        return decode_cursor(after)
+    except ValueError as e:
+        raise HTTPException(status_code=http_status.HTTP_400_BAD_REQUEST, detail=str(e)) from None
+
+
 @router.get("/", response_model=list[DriverResponse], summary="Получить список водителей")
 async def get_drivers(
+    request: Request,
     status: DriverStatus | None = Query(None),
-    skip: int = Query(0),
-    limit: int = Query(100),
-    db: Session = Depends(get_db),
-) -> list[DriverResponse]:
+    after: str | None = Query(None, description="Курсор следующей страницы (X-Next-Cursor)"),
+    skip: int = Query(0, deprecated=True),
+    limit: int = Query(100, ge=1),
+    if_none_match: str | None = Header(None),
+    db: Session | AsyncSession = Depends(get_read_session),
+) -> Response:
     """
     Получение списка водителей с возможностью фильтрации по статусу.
 
     - **status**: Статус верификации (PENDING, VERIFIED, REJECTED)
-    - **skip**: Количество записей для пропуска (пагинация)
-    - **limit**: Максимальное количество записей
+    - **after**: Курсор из заголовка X-Next-Cursor предыдущей страницы
+    - **skip**: Количество записей для пропуска (устарело, используйте after)
+    - **limit**: Максимальное количество записей (не больше AUTOPILOT_MAX_PAGE_LIMIT)
+
+    Если страница заполнена целиком, курсор следующей страницы возвращается
+    в заголовке X-Next-Cursor. ETag - версия таблицы: с If-None-Match
+    неизменившийся список отдаётся как 304 без чтения строк.
+
+    Формат - по Accept: JSON, MessagePack (application/msgpack) или Arrow IPC
+    stream (application/vnd.apache.arrow.stream); сжатие br/gzip - по Accept-Encoding.
+    """
+    max_page_limit = request.app.state.settings.max_page_limit
+    if limit > max_page_limit:
+        raise HTTPException(
+            status_code=http_status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Parameter 'limit' must not exceed {max_page_limit}, use /drivers/export",
+        )
+    if after is not None and skip:
+        raise HTTPException(
+            status_code=http_status.HTTP_400_BAD_REQUEST,
+            detail="Parameters 'after' and 'skip' are mutually exclusive",
+        )
+    after_id = _parse_cursor(after)
+    representation = negotiate(request)
+
+    try:
+        # Версия читается до строк: страница может оказаться новее ETag, но не старше
+        version = await run_service(db, DriverService.get_table_version)
+        etag = make_etag("drivers", version, *representation.etag_parts)
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag, {"Vary": VARY})
+
+        # Быстрый путь: кортежи колонок сразу в JSON, без Driver/DriverResponse
+        if isinstance(db, AsyncSession):
+            page = await DriverService.get_driver_page_async(
+                db, status, skip, limit, after_id, version
+            )
+        else:
+            page = await run_in_threadpool(
+                DriverService.get_driver_page, db, status, skip, limit, after_id, version
+            )
+        # Страница из кэша могла быть прочитана до записи другого воркера: ETag - её версии
+        etag = make_etag("drivers", page.version, *representation.etag_parts)
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag, {"Vary": VARY})
+        rows = page.rows
+        response = await representation.response(
+            rows, {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+        )
+        if rows and len(rows) == limit:
+            response.headers[NEXT_CURSOR_HEADER] = encode_cursor(rows[-1][0])
+        return response
+    except Exception as e:
+        raise HTTPException(
+            status_code=http_status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Internal server error: {str(e)}",
+        ) from None
+
+
+EXPORT_MEDIA_TYPES = {
+    ExportFormat.NDJSON: "application/x-ndjson",
+    ExportFormat.CSV: "text/csv",
+}
+
+
+@router.get(
+    "/export",
+    response_class=StreamingResponse,
+    summary="Потоковая выгрузка водителей (NDJSON/CSV)",
+)
+async def export_drivers(
+    status: DriverStatus | None = Query(None),
+    after: str | None = Query(None, description="Курсор, с которого начать выгрузку"),
+    export_format: ExportFormat = Query(ExportFormat.NDJSON, alias="format"),
+    db: Session | AsyncSession = Depends(get_read_session),
+) -> StreamingResponse:
+    """
+    Выгрузка всей таблицы водителей потоком.
+
+    Строки читаются из БД пакетами (yield_per) и сразу отправляются клиенту,
+    поэтому память не зависит от размера таблицы. Фильтры - как у GET /drivers/.
+
+    - **status**: Статус верификации (PENDING, VERIFIED, REJECTED)
+    - **after**: Курсор X-Next-Cursor - выгрузка строк после него
+    - **format**: ndjson (по умолчанию) или csv
+    """
+    after_id = _parse_cursor(after)
+    encode = encode_csv if export_format == ExportFormat.CSV else encode_ndjson
+    header = csv_header() if export_format == ExportFormat.CSV else b""
+
+    def stream_sync(sync_db: Session) -> Iterator[bytes]:
+        yield header
+        for batch in DriverService.iter_driver_batches(sync_db, status, after_id):
+            yield encode(batch)
+
+    async def stream_async(async_db: AsyncSession) -> AsyncIterator[bytes]:
+        yield header
+        async for batch in DriverService.iter_driver_batches_async(async_db, status, after_id):
+            yield encode(batch)
+
+    return StreamingResponse(
+        stream_async(db) if isinstance(db, AsyncSession) else stream_sync(db),
+        media_type=EXPORT_MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="drivers.{export_format.value}"'},
+    )
+
+
+@router.get(
+    "/search",
+    response_model=list[DriverResponse],
+    summary="Поиск водителей по номеру прав",
+)
+async def search_drivers(
+    request: Request,
+    q: str = Query(min_length=1, max_length=20, description="Номер прав или его часть"),
+    after: str | None = Query(None, description="Курсор следующей страницы (X-Next-Cursor)"),
+    limit: int = Query(20, ge=1, le=100),
+    db: Session | AsyncSession = Depends(get_read_session),
+) -> Response:
+    """
+    Поиск по номеру водительских прав.
+
+    Результаты ранжируются: сначала точное совпадение, затем номера,
+    начинающиеся с q, затем содержащие q (подстрока - от 3 символов).
+    Курсор следующей страницы - в заголовке X-Next-Cursor.
+    """
+    position = None
+    if after is not None:
+        try:
+            position = decode_search_cursor(after)
+        except ValueError as e:
+            # Как _parse_cursor у списка и выгрузки
+            raise HTTPException(
+                status_code=http_status.HTTP_400_BAD_REQUEST, detail=str(e)
+            ) from None
+
+    rows, next_position = await run_service(db, DriverService.search_drivers, q, limit, position)
+    response = await negotiate(request).response(rows)
+    if next_position is not None:
+        response.headers[NEXT_CURSOR_HEADER] = encode_search_cursor(*next_position)
+    return response
+
+
+@router.post(
+    "/lookup",
+    response_model=DriverLookupResponse,
+    summary="Водители по списку user_id и номеров прав",
+)
+async def lookup_drivers(
+    lookup: DriverLookupRequest, db: Session | AsyncSession = Depends(get_read_session)
+) -> Response:
+    """
+    Точечный поиск: до тысяч user_id и/или номеров прав одним запросом.
+
+    Ответ - карты user_id -> водители и номер прав -> водитель; ключи без
+    водителей перечислены в missing_user_ids и missing_license_numbers.
+    """
+    rows = await run_service(
+        db, DriverService.lookup_drivers, lookup.user_ids, lookup.license_numbers
+    )
+    return Response(
+        content=encode_lookup(rows, lookup.user_ids, lookup.license_numbers),
+        media_type="application/json",
+    )
+
+
+@router.get("/stats", response_model=DriverStatsResponse, summary="Статистика водителей")
+async def get_driver_stats(
+    db: Session | AsyncSession = Depends(get_read_session),
+) -> DriverStatsResponse:
+    """
+    Число водителей по статусу верификации и по диапазонам стажа.
+
+    Читается из счётчиков, которые обновляются вместе с записью водителей,
+    поэтому не зависит от размера таблицы.
+    """
+    return await run_service(db, DriverService.get_stats)
+
+
+# Комментарий SSE раз в SSE_KEEPALIVE_SECONDS простоя: прокси не закрывают поток
+SSE_KEEPALIVE = b": keepalive\n\n"
+SSE_KEEPALIVE_SECONDS = 15.0
+
+
+@router.get(
+    "/changes",
+    response_model=DriverChangesPage,
+    summary="Лента изменений водителей (SSE или long-poll)",
+    responses={200: {"content": {"text/event-stream": {}}}},
+)
+async def get_driver_changes(
+    request: Request,
+    after: int = Query(0, ge=0, description="seq последнего полученного изменения"),
+    status: DriverStatus | None = Query(None, description="Только изменения с этим статусом"),
+    wait: float = Query(0, ge=0, le=60, description="Long-poll: ждать изменений до wait сек"),
+    timeout: float | None = Query(
+        None, gt=0, description="SSE: закрыть поток через timeout сек (по умолчанию - никогда)"
+    ),
+    limit: int = Query(100, ge=1, le=1000),
+    last_event_id: int | None = Header(None, ge=0),
+    db: Session | AsyncSession = Depends(get_session),
+) -> Response:
     """
+    Изменения водителей (создание, смена статуса) после seq = after.
+
+    С Accept: text/event-stream - поток Server-Sent Events: id события - seq,
+    при переподключении клиент присылает Last-Event-ID и получает только
+    пропущенное. Иначе - JSON-страница: если изменений нет, ответ ждёт их
+    до wait секунд. last_seq ответа - after для следующего запроса.
+
+    Если изменения после курсора уже очищены из журнала - 410 (в SSE - событие
+    reset) с last_seq: клиент перечитывает водителей и продолжает с last_seq.
+    """
+    settings = request.app.state.settings
+    position = last_event_id if last_event_id is not None else after
+
+    async def read_changes() -> Sequence[Row[Any]]:
+        try:
+            return await run_service(db, DriverService.get_changes, position, status, limit)
+        except DriverChangesPrunedError as e:
+            raise HTTPException(
+                status_code=http_status.HTTP_410_GONE,
+                detail={"message": str(e), "last_seq": e.last_seq},
+            ) from None
+
+    if "text/event-stream" not in request.headers.get("accept", ""):
+        version = driver_change_notifier.version
+        rows = await read_changes()
+        if not rows and wait:
+            await driver_change_notifier.wait(version, wait)
+            rows = await read_changes()
+        last_seq = rows[-1].seq if rows else position
+        return Response(content=encode_changes(rows, last_seq), media_type="application/json")
+
+    async def stream() -> AsyncIterator[bytes]:
+        nonlocal position
+        deadline = None if timeout is None else time.monotonic() + timeout
+        idle = 0.0
+        yield b"retry: 1000\n\n"
+        while deadline is None or time.monotonic() < deadline:
+            version = driver_change_notifier.version
+            try:
+                rows = await run_service(db, DriverService.get_changes, position, status, limit)
+            except DriverChangesPrunedError as e:
+                yield encode_sse_reset(e.last_seq)
+                return
+            if rows:
+                position = rows[-1].seq
+                idle = 0.0
+                yield encode_sse(rows)
+                continue
+            # Изменения из этого процесса будят сразу, из других воркеров - при опросе
+            interval = settings.changes_poll_interval_seconds
+            if deadline is not None:
+                interval = max(min(interval, deadline - time.monotonic()), 0)
+            if not await driver_change_notifier.wait(version, interval):
+                idle += interval
+                if idle >= SSE_KEEPALIVE_SECONDS:
+                    idle = 0.0
+                    yield SSE_KEEPALIVE
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+NDJSON_MEDIA_TYPES = ("application/x-ndjson", "application/ndjson", "application/jsonl")
+
+
+async def _iter_bulk_items(request: Request) -> AsyncIterator[Any]:
+    """Элементы тела запроса: JSON-массив целиком или NDJSON построчно по мере чтения"""
+    content_type = request.headers.get("content-type", "").split(";")[0].strip()
+    if content_type not in NDJSON_MEDIA_TYPES:
+        try:
+            items = json.loads(await request.body())
+        except ValueError:
+            raise HTTPException(
+                status_code=http_status.HTTP_400_BAD_REQUEST, detail="Invalid JSON body"
+            ) from None
+        if not isinstance(items, list):
+            raise HTTPException(
+                status_code=http_status.HTTP_400_BAD_REQUEST,
+                detail="Expected a JSON array of drivers",
+            )
+        for item in items:
+            yield item
+        return
+
+    buffer = b""
+    async for chunk in request.stream():
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            if line.strip():
+                yield _parse_ndjson_line(line)
+    if buffer.strip():
+        yield _parse_ndjson_line(buffer)
+
+
+def _parse_ndjson_line(line: bytes) -> Any:
     try:
-        drivers = DriverService.get_drivers(db, status, skip, limit)
-        # Конвертируем список Driver в список DriverResponse
-        return [
-            DriverResponse(
-                id=driver.id if driver.id is not None else 0,  # Запасной вариант
-                user_id=driver.user_id,
-                license_number=driver.license_number,
-                years_of_experience=driver.years_of_experience,
-                status=driver.status,
+        return json.loads(line)
+    except ValueError:
+        return line.decode(errors="replace")  # Строка не JSON - попадёт в отчёт как INVALID
+
+
+@router.post(
+    "/bulk",
+    response_model=BulkDriverReport,
+    summary="Массовое создание водителей",
+    dependencies=[Depends(track_write)],
+)
+async def bulk_create_drivers(
+    request: Request, db: Session | AsyncSession = Depends(get_session)
+) -> BulkDriverReport:
+    """
+    Массовый импорт водителей.
+
+    Тело - JSON-массив объектов DriverCreateRequest либо NDJSON
+    (Content-Type: application/x-ndjson, по объекту на строку; обрабатывается
+    потоково). Каждая строка валидируется отдельно, дубликаты license_number
+    (в БД и внутри импорта) попадают в отчёт как CONFLICT, невалидные - INVALID.
+    """
+    results: list[BulkDriverResult] = []
+    batch: list[DriverCreateRequest] = []
+    batch_indexes: list[int] = []
+    seen_licenses: set[str] = set()
+
+    async def flush() -> None:
+        try:
+            batch_results = await run_service(
+                db, DriverService.bulk_create_drivers, batch, seen_licenses
             )
-            for driver in drivers
-        ]
+        except Exception as e:
+            raise HTTPException(
+                status_code=http_status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Internal server error: {str(e)}",
+            ) from None
+        for result in batch_results:
+            result.index = batch_indexes[result.index]
+        results.extend(batch_results)
+        batch.clear()
+        batch_indexes.clear()
+
+    index = 0
+    async for item in _iter_bulk_items(request):
+        try:
+            batch.append(DriverCreateRequest.model_validate(item))
+            batch_indexes.append(index)
+        except ValidationError as e:
+            results.append(
+                BulkDriverResult(
+                    index=index,
+                    status=BulkDriverStatus.INVALID,
+                    license_number=item.get("license_number") if isinstance(item, dict) else None,
+                    detail="; ".join(
+                        f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors()
+                    ),
+                )
+            )
+        index += 1
+        if len(batch) >= BULK_BATCH_SIZE:
+            await flush()
+    if batch:
+        await flush()
+
+    results.sort(key=lambda result: result.index)
+    return BulkDriverReport(
+        created=sum(r.status == BulkDriverStatus.CREATED for r in results),
+        conflicts=sum(r.status == BulkDriverStatus.CONFLICT for r in results),
+        invalid=sum(r.status == BulkDriverStatus.INVALID for r in results),
+        results=results,
+    )
+
+
+@router.patch(
+    "/status",
+    response_model=StatusChangeReport,
+    summary="Массовая смена статуса водителей",
+    dependencies=[Depends(track_write)],
+)
+async def change_driver_statuses(
+    changes: list[DriverStatusChange], db: Session | AsyncSession = Depends(get_session)
+) -> StatusChangeReport:
+    """
+    Смена статуса нескольких водителей одним запросом.
+
+    Каждый элемент обрабатывается как PATCH /drivers/{id}/status; результат -
+    по элементу: UPDATED, CONFLICT (версия изменилась), NOT_FOUND или
+    INVALID (переход запрещён).
+    """
+    try:
+        results = await run_service(db, DriverService.change_statuses, changes)
+    except Exception as e:
+        raise HTTPException(
+            status_code=http_status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Internal server error: {str(e)}",
+        ) from None
+    return StatusChangeReport(
+        updated=sum(r.outcome == StatusChangeOutcome.UPDATED for r in results),
+        conflicts=sum(r.outcome == StatusChangeOutcome.CONFLICT for r in results),
+        not_found=sum(r.outcome == StatusChangeOutcome.NOT_FOUND for r in results),
+        invalid=sum(r.outcome == StatusChangeOutcome.INVALID for r in results),
+        results=results,
+    )
+
+
+@router.get(
+    "/{driver_id}",
+    response_model=DriverVersionedResponse,
+    summary="Получить водителя",
+    responses={304: {"description": "Не изменился с If-None-Match"}},
+)
+async def get_driver(
+    driver_id: int,
+    if_none_match: str | None = Header(None),
+    db: Session | AsyncSession = Depends(get_read_session),
+) -> Response:
+    """
+    Профиль водителя с версией строки.
+
+    ETag строится из id и version (меняется при каждой смене статуса);
+    с совпадающим If-None-Match ответ - 304 без тела.
+    """
+    row = await run_service(db, DriverService.get_driver_row, driver_id)
+    if row is None:
+        raise HTTPException(
+            status_code=http_status.HTTP_404_NOT_FOUND, detail=f"Driver {driver_id} not found"
+        )
+    etag = make_etag("driver", row.id, row.version)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    return Response(
+        content=encode_versioned_driver(row),
+        media_type="application/json",
+        headers={"ETag": etag, "Cache-Control": CACHE_CONTROL},
+    )
+
+
+@router.patch(
+    "/{driver_id}/status",
+    response_model=DriverVersionedResponse,
+    summary="Сменить статус водителя",
+    dependencies=[Depends(track_write)],
+)
+async def change_driver_status(
+    driver_id: int,
+    update_data: DriverUpdateRequest,
+    db: Session | AsyncSession = Depends(get_session),
+) -> DriverVersionedResponse:
+    """
+    Верификация или отклонение водителя.
+
+    - **status**: VERIFIED (нужен опыт от 1 года) или REJECTED
+    - **version**: версия из предыдущего ответа; если строка с тех пор
+      изменилась - 409 Conflict
+
+    Блокировки не берутся: конкурентное изменение той же строки тоже даёт 409.
+    """
+    try:
+        driver = await run_service(db, DriverService.change_status, driver_id, update_data)
+    except DriverNotFoundError as e:
+        raise HTTPException(status_code=http_status.HTTP_404_NOT_FOUND, detail=str(e)) from None
+    except DriverVersionConflictError as e:
+        raise HTTPException(status_code=http_status.HTTP_409_CONFLICT, detail=str(e)) from None
+    except ValueError as e:
+        raise HTTPException(status_code=http_status.HTTP_400_BAD_REQUEST, detail=str(e)) from None
     except Exception as e:
         raise HTTPException(
             status_code=http_status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Internal server error: {str(e)}",
         ) from None
+    return DriverVersionedResponse.model_validate(driver.model_dump())
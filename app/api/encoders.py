@@ -0,0 +1,162 @@
+import csv
+import importlib.util
+import io
+from collections.abc import Iterable, Sequence
+from typing import Any
+
+from pydantic_core import to_json
+
+from app.profiling import profiled
+
+# Поля DriverResponse в порядке DRIVER_COLUMNS сервиса
+DRIVER_FIELDS = ("id", "user_id", "license_number", "years_of_experience", "status")
+
+DriverRow = Sequence[Any]
+
+# Опциональные зависимости: без них форматы просто не предлагаются клиенту
+MSGPACK_AVAILABLE = importlib.util.find_spec("msgpack") is not None
+ARROW_AVAILABLE = importlib.util.find_spec("pyarrow") is not None
+
+
+def _row_values(row: DriverRow) -> tuple[Any, ...]:
+    driver_id, user_id, license_number, years_of_experience, status = row
+    return driver_id, user_id, license_number, years_of_experience, status.value
+
+
+def _row_dict(row: DriverRow) -> dict[str, Any]:
+    return dict(zip(DRIVER_FIELDS, _row_values(row), strict=True))
+
+
+@profiled("serialization")
+def encode_json_array(rows: Sequence[DriverRow]) -> bytes:
+    """
+    Строки DRIVER_COLUMNS сразу в JSON-массив объектов DriverResponse.
+
+    Типы колонок уже гарантированы схемой БД, поэтому повторная pydantic-
+    валидация (Driver -> DriverResponse -> response_model) не нужна.
+    """
+    return to_json([_row_dict(row) for row in rows])
+
+
+@profiled("serialization")
+def encode_msgpack(rows: Sequence[DriverRow]) -> bytes:
+    """Страница в MessagePack: тот же массив объектов DriverResponse, что и в JSON"""
+    import msgpack
+
+    return bytes(msgpack.packb([_row_dict(row) for row in rows]))
+
+
+@profiled("serialization")
+def encode_arrow(rows: Sequence[DriverRow]) -> bytes:
+    """
+    Страница в колоночном Arrow IPC stream (одна record batch): колонки
+    DRIVER_FIELDS, status - словарная кодировка.
+    """
+    import pyarrow as pa
+
+    columns = list(zip(*map(_row_values, rows), strict=True)) or [()] * len(DRIVER_FIELDS)
+    schema = pa.schema(
+        [
+            ("id", pa.int64()),
+            ("user_id", pa.int64()),
+            ("license_number", pa.string()),
+            ("years_of_experience", pa.int32()),
+            ("status", pa.dictionary(pa.int8(), pa.string())),
+        ]
+    )
+    batch = pa.record_batch(
+        [pa.array(values, type=field.type) for values, field in zip(columns, schema, strict=True)],
+        schema=schema,
+    )
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, schema) as writer:
+        writer.write_batch(batch)
+    return bytes(sink.getvalue().to_pybytes())
+
+
+@profiled("serialization")
+def encode_versioned_driver(row: DriverRow) -> bytes:
+    """Строка VERSIONED_DRIVER_COLUMNS в JSON DriverVersionedResponse"""
+    *driver, version = row
+    return to_json({**_row_dict(driver), "version": version})
+
+
+@profiled("serialization")
+def encode_lookup(
+    rows: Sequence[DriverRow], user_ids: Sequence[int], license_numbers: Sequence[str]
+) -> bytes:
+    """Найденные строки в JSON DriverLookupResponse: карты по запрошенным ключам"""
+    requested_users, requested_licenses = set(user_ids), set(license_numbers)
+    by_user_id: dict[int, list[dict[str, Any]]] = {}
+    by_license_number: dict[str, dict[str, Any]] = {}
+    for row in rows:
+        driver = _row_dict(row)
+        if driver["user_id"] in requested_users:
+            by_user_id.setdefault(driver["user_id"], []).append(driver)
+        if driver["license_number"] in requested_licenses:
+            by_license_number[driver["license_number"]] = driver
+    return to_json(
+        {
+            "by_user_id": by_user_id,
+            "by_license_number": by_license_number,
+            "missing_user_ids": [key for key in dict.fromkeys(user_ids) if key not in by_user_id],
+            "missing_license_numbers": [
+                key for key in dict.fromkeys(license_numbers) if key not in by_license_number
+            ],
+        }
+    )
+
+
+@profiled("serialization")
+def encode_ndjson(rows: Sequence[DriverRow]) -> bytes:
+    """Пакет строк в NDJSON (по объекту DriverResponse на строку)"""
+    return b"".join(to_json(_row_dict(row)) + b"\n" for row in rows)
+
+
+def _change_dict(row: Sequence[Any]) -> dict[str, Any]:
+    """Строка CHANGE_COLUMNS: seq, операция и снимок водителя (DriverChange)"""
+    seq, operation, *driver = row
+    return {"seq": seq, "operation": operation.value, "driver": _row_dict(driver)}
+
+
+@profiled("serialization")
+def encode_changes(rows: Sequence[Sequence[Any]], last_seq: int) -> bytes:
+    """Страница ленты изменений (long-poll) в JSON DriverChangesPage"""
+    return to_json({"changes": [_change_dict(row) for row in rows], "last_seq": last_seq})
+
+
+@profiled("serialization")
+def encode_sse(rows: Sequence[Sequence[Any]]) -> bytes:
+    """
+    Записи ленты изменений как события Server-Sent Events: id - seq
+    (браузер вернёт его в Last-Event-ID при переподключении), event - операция.
+    """
+    return b"".join(
+        b"id: %d\nevent: %s\ndata: %s\n\n"
+        % (change["seq"], change["operation"].encode(), to_json(change))
+        for change in map(_change_dict, rows)
+    )
+
+
+def csv_header() -> bytes:
+    return _csv_bytes([DRIVER_FIELDS])
+
+
+@profiled("serialization")
+def encode_csv(rows: Sequence[DriverRow]) -> bytes:
+    """Пакет строк в CSV"""
+    return _csv_bytes(_row_values(row) for row in rows)
+
+
+def _csv_bytes(records: Iterable[Sequence[Any]]) -> bytes:
+    buffer = io.StringIO()
+    csv.writer(buffer, lineterminator="\n").writerows(records)
+    return buffer.getvalue().encode()
+
+
+def encode_sse_reset(last_seq: int) -> bytes:
+    """
+    Событие reset: записи после курсора клиента удалены очисткой журнала.
+    Клиент перечитывает водителей и продолжает с id события (last_seq).
+    """
+    return b"id: %d\nevent: reset\ndata: %s\n\n" % (last_seq, to_json({"last_seq": last_seq}))
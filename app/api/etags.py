@@ -0,0 +1,29 @@
+from fastapi import Response
+from fastapi import status as http_status
+
+# Клиент хранит ответ, но перед использованием проверяет его через If-None-Match
+CACHE_CONTROL = "no-cache"
+
+
+def make_etag(*parts: object) -> str:
+    """Сильный ETag из версии данных (не из хэша тела): "drivers-42", "driver-7-3" """
+    return '"' + "-".join(str(part) for part in parts) + '"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """
+    Совпадает ли If-None-Match с etag: список через запятую или "*".
+    Для If-None-Match сравнение слабое (RFC 9110, 13.1.2) - префикс W/ не важен.
+    """
+    if if_none_match is None:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return etag in (tag.strip().removeprefix("W/") for tag in if_none_match.split(","))
+
+
+def not_modified(etag: str, headers: dict[str, str] | None = None) -> Response:
+    return Response(
+        status_code=http_status.HTTP_304_NOT_MODIFIED,
+        headers={"ETag": etag, "Cache-Control": CACHE_CONTROL, **(headers or {})},
+    )
@@ -0,0 +1,78 @@
+import time
+from collections.abc import Callable
+from typing import Any
+
+from fastapi import APIRouter, Response
+from starlette.routing import BaseRoute
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.metrics import (
+    DB_QUERIES_PER_REQUEST,
+    HTTP_REQUEST_DURATION,
+    RequestStats,
+    current_request_stats,
+    metrics,
+)
+
+PROMETHEUS_MEDIA_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+# Метка для запросов, не попавших ни в один маршрут (404): не плодим серии по URL
+UNMATCHED_ROUTE = "unmatched"
+
+router = APIRouter(tags=["metrics"])
+
+
+@router.get("/metrics", response_class=Response, summary="Метрики Prometheus")
+async def get_metrics() -> Response:
+    return Response(content=metrics.render(), media_type=PROMETHEUS_MEDIA_TYPE)
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware: латентность по шаблону маршрута и число SQL-выражений
+    на запрос. Чистый ASGI (не BaseHTTPMiddleware): потоковые ответы не
+    буферизуются, контекст запроса виден в threadpool и хуках SQLAlchemy.
+    """
+
+    def __init__(self, app: ASGIApp, routes: Callable[[], list[BaseRoute]]) -> None:
+        self.app = app
+        self._routes = routes
+        self._templates: dict[Any, str] | None = None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+        stats = RequestStats()
+        token = current_request_stats.set(stats)
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            current_request_stats.reset(token)
+            route = self._route_template(scope)
+            HTTP_REQUEST_DURATION.observe(
+                elapsed, method=scope["method"], route=route, status=str(status_code)
+            )
+            DB_QUERIES_PER_REQUEST.observe(stats.queries, route=route)
+
+    def _route_template(self, scope: Scope) -> str:
+        # Router кладёт endpoint совпавшего маршрута в scope
+        endpoint = scope.get("endpoint")
+        if endpoint is None:
+            return UNMATCHED_ROUTE
+        if self._templates is None:
+            self._templates = {
+                getattr(route, "endpoint", None): getattr(route, "path", "")
+                for route in self._routes()
+            }
+        return self._templates.get(endpoint, UNMATCHED_ROUTE)
@@ -0,0 +1,154 @@
+import gzip
+import importlib.util
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass
+
+from fastapi import Request, Response
+from fastapi.concurrency import run_in_threadpool
+
+from app.api.encoders import (
+    ARROW_AVAILABLE,
+    MSGPACK_AVAILABLE,
+    DriverRow,
+    encode_arrow,
+    encode_json_array,
+    encode_msgpack,
+)
+from app.profiling import profiled
+
+BROTLI_AVAILABLE = importlib.util.find_spec("brotli") is not None
+
+# Быстрые уровни для динамических ответов (см. benchmarks.bench_negotiation)
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 4
+# Страницы больше - кодируются и сжимаются в threadpool, не блокируя event loop
+THREADPOOL_MIN_ROWS = 1000
+
+VARY = "Accept, Accept-Encoding"
+
+
+@dataclass(frozen=True)
+class PageFormat:
+    name: str  # Часть ETag: у разных представлений разные сильные ETag
+    media_type: str
+    encode: Callable[[Sequence[DriverRow]], bytes]
+    aliases: tuple[str, ...] = ()
+
+
+JSON_FORMAT = PageFormat("json", "application/json", encode_json_array)
+# Порядок - предпочтение сервера при равном q (*/* - JSON)
+PAGE_FORMATS = [JSON_FORMAT]
+if MSGPACK_AVAILABLE:
+    PAGE_FORMATS.append(
+        PageFormat(
+            "msgpack",
+            "application/msgpack",
+            encode_msgpack,
+            aliases=("application/x-msgpack", "application/vnd.msgpack"),
+        )
+    )
+if ARROW_AVAILABLE:
+    PAGE_FORMATS.append(PageFormat("arrow", "application/vnd.apache.arrow.stream", encode_arrow))
+
+CONTENT_ENCODINGS = ["br", "gzip"] if BROTLI_AVAILABLE else ["gzip"]
+
+
+def parse_quality_list(header: str | None) -> dict[str, float]:
+    """Accept/Accept-Encoding: значение -> q (параметры кроме q отбрасываются)"""
+    qualities: dict[str, float] = {}
+    for item in (header or "").split(","):
+        value, *params = (part.strip() for part in item.split(";"))
+        if not value:
+            continue
+        q = 1.0
+        for param in params:
+            name, _, number = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    q = float(number)
+                except ValueError:
+                    q = 0.0
+        qualities[value.lower()] = q
+    return qualities
+
+
+def choose_format(accept: str | None) -> PageFormat:
+    """
+    Формат страницы по Accept с учётом q и масок (*/*, application/*).
+    Если ничего не подходит - JSON (RFC 9110 позволяет игнорировать Accept).
+    """
+    qualities = parse_quality_list(accept)
+    if not qualities:
+        return JSON_FORMAT
+
+    def quality(page_format: PageFormat) -> float:
+        for media_type in (page_format.media_type, *page_format.aliases):
+            if media_type in qualities:
+                return qualities[media_type]
+        major = page_format.media_type.split("/")[0]
+        return qualities.get(f"{major}/*", qualities.get("*/*", 0.0))
+
+    best = max(PAGE_FORMATS, key=quality)  # max берёт первый из равных
+    return best if quality(best) > 0 else JSON_FORMAT
+
+
+def choose_encoding(accept_encoding: str | None) -> str | None:
+    """br/gzip по Accept-Encoding или None (без сжатия)"""
+    qualities = parse_quality_list(accept_encoding)
+    wildcard = qualities.get("*", 0.0)
+    candidates = [(qualities.get(coding, wildcard), coding) for coding in CONTENT_ENCODINGS]
+    q, coding = max(candidates, key=lambda candidate: candidate[0])
+    return coding if q > 0 else None
+
+
+@profiled("compression")
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        import brotli
+
+        return bytes(brotli.compress(body, quality=BROTLI_QUALITY))
+    return gzip.compress(body, compresslevel=GZIP_LEVEL)
+
+
+@dataclass(frozen=True)
+class Representation:
+    """Выбранное представление страницы: формат и сжатие"""
+
+    page_format: PageFormat
+    encoding: str | None
+    min_compress_size: int
+
+    @property
+    def etag_parts(self) -> tuple[str, ...]:
+        """Суффикс ETag; JSON без сжатия - без суффикса"""
+        parts = (self.page_format.name, self.encoding or "identity")
+        return () if parts == ("json", "identity") else parts
+
+    def render(self, rows: Sequence[DriverRow]) -> tuple[bytes, str | None]:
+        """Тело и Content-Encoding; тело меньше min_compress_size не сжимается"""
+        body = self.page_format.encode(rows)
+        if self.encoding is None or len(body) < self.min_compress_size:
+            return body, None
+        return compress(body, self.encoding), self.encoding
+
+    async def response(
+        self, rows: Sequence[DriverRow], headers: dict[str, str] | None = None
+    ) -> Response:
+        if len(rows) >= THREADPOOL_MIN_ROWS:
+            body, encoding = await run_in_threadpool(self.render, rows)
+        else:
+            body, encoding = self.render(rows)
+        response = Response(content=body, media_type=self.page_format.media_type, headers=headers)
+        response.headers["Vary"] = VARY
+        if encoding is not None:
+            response.headers["Content-Encoding"] = encoding
+        return response
+
+
+def negotiate(request: Request) -> Representation:
+    """Представление страницы водителей по Accept и Accept-Encoding запроса"""
+    return Representation(
+        page_format=choose_format(request.headers.get("accept")),
+        encoding=choose_encoding(request.headers.get("accept-encoding")),
+        min_compress_size=request.app.state.settings.compression_min_size,
+    )
@@ -0,0 +1,59 @@
+import base64
+import binascii
+import json
+from typing import Any
+
+from app.services.driver_service import SEARCH_EXACT, SEARCH_PREFIX, SEARCH_SUBSTRING
+
+
+def _encode(payload: dict[str, Any]) -> str:
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def _decode(cursor: str) -> dict[str, Any]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (binascii.Error, ValueError):
+        raise ValueError("Invalid cursor") from None
+    if not isinstance(payload, dict):
+        raise ValueError("Invalid cursor")
+    return payload
+
+
+def _is_int(value: Any) -> bool:
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def encode_cursor(last_id: int) -> str:
+    """Непрозрачный курсор keyset-пагинации по DriverDB.id"""
+    return _encode({"id": last_id})
+
+
+def decode_cursor(cursor: str) -> int:
+    """Декодирование курсора; ValueError для повреждённого значения"""
+    last_id = _decode(cursor).get("id")
+    if not _is_int(last_id):
+        raise ValueError("Invalid cursor")
+    return last_id  # type: ignore[no-any-return]
+
+
+def encode_search_cursor(phase: int, key: str | int) -> str:
+    """Курсор поиска: этап ранжирования и последний ключ внутри этапа"""
+    return _encode({"phase": phase, "key": key})
+
+
+def decode_search_cursor(cursor: str) -> tuple[int, str | int]:
+    """
+    Декодирование курсора поиска; ValueError, если этап неизвестен или тип
+    ключа ему не соответствует (номер прав - точное совпадение и префикс,
+    id - подстрока), иначе сравнение ключа с колонкой падает в СУБД.
+    """
+    payload = _decode(cursor)
+    phase, key = payload.get("phase"), payload.get("key")
+    if phase in (SEARCH_EXACT, SEARCH_PREFIX) and _is_int(phase) and isinstance(key, str):
+        return phase, key
+    if phase == SEARCH_SUBSTRING and _is_int(phase) and _is_int(key):
+        return phase, key
+    raise ValueError("Invalid cursor")
@@ -0,0 +1,69 @@
+import json
+import logging
+import random
+import time
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config import Settings
+from app.profiling import RequestProfile, current_profile
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = b"x-profile"
+
+
+class ProfilingMiddleware:
+    """
+    ASGI middleware профилирования: запрос с заголовком X-Profile: 1 (при
+    profile_header_enabled) или выбранный с вероятностью profile_sample_rate
+    собирает RequestProfile - SQL-выражения с временем и числом строк, время
+    конвертации в Domain и сериализации. Профиль пишется в лог одной строкой
+    JSON; запросившему по заголовку - ещё и Server-Timing в ответе.
+    """
+
+    def __init__(self, app: ASGIApp, settings: Settings) -> None:
+        self.app = app
+        self.settings = settings
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        requested = self.settings.profile_header_enabled and any(
+            name == PROFILE_HEADER and value == b"1" for name, value in scope["headers"]
+        )
+        if not requested and random.random() >= self.settings.profile_sample_rate:
+            await self.app(scope, receive, send)
+            return
+
+        profile = RequestProfile()
+        token = current_profile.set(profile)
+        status_code = 500
+        handler_elapsed: float | None = None
+        started = time.perf_counter()
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code, handler_elapsed
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                # Обработчик - до начала ответа; потоковое тело в Server-Timing не входит
+                handler_elapsed = time.perf_counter() - started
+                if requested:
+                    headers = MutableHeaders(scope=message)
+                    headers["Server-Timing"] = profile.server_timing(handler_elapsed)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            current_profile.reset(token)
+            record = {
+                "method": scope["method"],
+                "path": scope["path"],
+                "status": status_code,
+                "handler_ms": None if handler_elapsed is None else round(handler_elapsed * 1000, 3),
+                **profile.as_dict(time.perf_counter() - started),
+            }
+            logger.info("Request profile %s", json.dumps(record, ensure_ascii=False))
@@ -0,0 +1,22 @@
+from collections.abc import Collection
+
+from starlette.types import Scope
+
+API_KEY_HEADER = b"x-api-key"
+
+
+def client_key(scope: Scope, api_keys: Collection[str]) -> str:
+    """
+    Ключ клиента: X-API-Key из api_keys (Settings.api_key_set), иначе IP.
+    Общий для лимита запросов (app.api.admission) и чтения своих записей
+    (app.database.session). Неизвестный ключ не доверяется: иначе клиент со
+    случайным ключом на каждый запрос получал бы новый бакет лимита.
+    """
+    for name, value in scope["headers"]:
+        if name == API_KEY_HEADER:
+            key = value.decode("latin-1")
+            if key in api_keys:
+                return "key:" + key
+            break
+    client = scope.get("client")
+    return "ip:" + (client[0] if client else "unknown")
@@ -0,0 +1,254 @@
+import logging
+import re
+import time
+from typing import Any
+
+from sqlalchemy import Engine, create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool, StaticPool
+
+from app.config import Settings
+from app.metrics import (
+    DB_QUERY_DURATION,
+    DB_QUERY_ERRORS,
+    DB_SLOW_QUERIES,
+    current_request_stats,
+)
+from app.profiling import QueryProfile, current_profile
+
+logger = logging.getLogger(__name__)
+
+_PRAGMA_VALUE = re.compile(r"^-?[A-Za-z0-9_]+$")
+# План запроса по диалекту; EXPLAIN без ANALYZE не выполняет выражение
+EXPLAIN_PREFIXES = {"sqlite": "EXPLAIN QUERY PLAN ", "postgresql": "EXPLAIN "}
+EXPLAINABLE_STATEMENTS = frozenset({"SELECT", "WITH", "INSERT", "UPDATE", "DELETE"})
+# PostgreSQL: ошибка внутри транзакции прерывает её целиком - EXPLAIN идёт в SAVEPOINT
+EXPLAIN_SAVEPOINT = "autopilot_explain"
+# Начало выражения - атрибут контекста выполнения: он живёт одно выражение,
+# в том числе упавшее, и не копится на соединении пула
+QUERY_STARTED_AT = "_autopilot_query_started_at"
+
+
+def _engine_kwargs(settings: Settings, url: str, queue_pool: type[QueuePool]) -> dict[str, Any]:
+    kwargs: dict[str, Any] = {"echo": settings.db_echo, "pool_pre_ping": settings.db_pool_pre_ping}
+    parsed = make_url(url)
+    if parsed.get_backend_name() == "sqlite":
+        kwargs["connect_args"] = {"check_same_thread": False}
+        if parsed.database in (None, "", ":memory:"):
+            # In-memory БД живёт в одном соединении
+            kwargs["poolclass"] = StaticPool
+            return kwargs
+        kwargs["poolclass"] = queue_pool
+    kwargs.update(
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_timeout=settings.db_pool_timeout,
+        pool_recycle=settings.db_pool_recycle,
+    )
+    return kwargs
+
+
+def _install_sqlite_pragmas(engine: Engine, settings: Settings) -> None:
+    if engine.dialect.name != "sqlite":
+        return
+    pragmas = settings.sqlite_pragmas()
+    for name, value in pragmas.items():
+        if not _PRAGMA_VALUE.match(str(value)):
+            raise ValueError(f"Invalid value for PRAGMA {name}: {value!r}")
+
+    @event.listens_for(engine, "connect")
+    def set_sqlite_pragmas(dbapi_connection: Any, connection_record: Any) -> None:
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name}={value}")
+        finally:
+            cursor.close()
+
+
+def _install_read_only(engine: Engine) -> None:
+    """Соединения пула чтения SQLite не пишут; после PRAGMA профиля (journal_mode)"""
+    if engine.dialect.name != "sqlite":
+        return
+
+    @event.listens_for(engine, "connect")
+    def set_query_only(dbapi_connection: Any, connection_record: Any) -> None:
+        cursor = dbapi_connection.cursor()
+        try:
+            cursor.execute("PRAGMA query_only=ON")
+        finally:
+            cursor.close()
+
+
+def _start_query_timer(
+    conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, executemany: bool
+) -> None:
+    if context is not None:
+        setattr(context, QUERY_STARTED_AT, time.perf_counter())
+
+
+def _install_query_timer(engine: Engine) -> None:
+    """Одна отметка начала выражения на движок, общая для всех хуков"""
+    if not event.contains(engine, "before_cursor_execute", _start_query_timer):
+        event.listen(engine, "before_cursor_execute", _start_query_timer)
+
+
+def query_elapsed(context: Any) -> float | None:
+    """Секунды с начала выражения или None, если начало не отмечено"""
+    started = getattr(context, QUERY_STARTED_AT, None)
+    return None if started is None else time.perf_counter() - started
+
+
+def install_query_metrics(engine: Engine) -> None:
+    """Время каждого SQL-выражения (и упавшего) и число выражений на HTTP-запрос"""
+    _install_query_timer(engine)
+
+    def observe(statement: str, context: Any) -> str | None:
+        elapsed = query_elapsed(context)
+        if elapsed is None:
+            return None
+        kind = statement.split(None, 1)[0].upper()
+        DB_QUERY_DURATION.observe(elapsed, statement=kind)
+        stats = current_request_stats.get()
+        if stats is not None:
+            stats.queries += 1
+        return kind
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def observe_query(
+        conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, executemany: bool
+    ) -> None:
+        observe(statement, context)
+
+    @event.listens_for(engine, "handle_error")
+    def observe_failed_query(exception_context: Any) -> None:
+        if exception_context.statement is None:
+            return
+        kind = observe(exception_context.statement, exception_context.execution_context)
+        if kind is not None:
+            DB_QUERY_ERRORS.inc(statement=kind)
+
+
+def explain_statement(
+    dbapi_connection: Any, dialect_name: str, statement: str, parameters: Any
+) -> str | None:
+    """
+    План выражения в текущем соединении (курсор DBAPI, мимо хуков SQLAlchemy).
+    Ошибка EXPLAIN пробрасывается, транзакция запроса остаётся рабочей.
+    """
+    prefix = EXPLAIN_PREFIXES.get(dialect_name)
+    if prefix is None or statement.split(None, 1)[0].upper() not in EXPLAINABLE_STATEMENTS:
+        return None
+    savepoint = dialect_name == "postgresql"
+    cursor = dbapi_connection.cursor()
+    try:
+        if savepoint:
+            cursor.execute(f"SAVEPOINT {EXPLAIN_SAVEPOINT}")
+        try:
+            cursor.execute(prefix + statement, parameters)
+            # SQLite: (id, parent, notused, detail), PostgreSQL: (строка плана,)
+            plan = "\n".join(str(row[-1]) for row in cursor.fetchall())
+        except Exception:
+            if savepoint:
+                cursor.execute(f"ROLLBACK TO SAVEPOINT {EXPLAIN_SAVEPOINT}")
+            raise
+        if savepoint:
+            cursor.execute(f"RELEASE SAVEPOINT {EXPLAIN_SAVEPOINT}")
+        return plan
+    finally:
+        cursor.close()
+
+
+def install_query_profiling(engine: Engine, slow_query_threshold: float) -> None:
+    """
+    SQL-выражения в профиль запроса (app.profiling) и журнал медленных выражений:
+    дольше slow_query_threshold секунд - WARNING с планом EXPLAIN; 0 - без журнала.
+    Упавшие выражения попадают в профиль с ошибкой.
+    """
+    _install_query_timer(engine)
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def profile_query(
+        conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, executemany: bool
+    ) -> None:
+        elapsed = query_elapsed(context)
+        if elapsed is None:
+            return
+        profile = current_profile.get()
+        slow = 0 < slow_query_threshold <= elapsed
+        if profile is None and not slow:
+            return
+        query = QueryProfile(statement, elapsed, cursor.rowcount if cursor.rowcount >= 0 else None)
+        if profile is not None:
+            profile.queries.append(query)
+        if not slow:
+            return
+        DB_SLOW_QUERIES.inc(statement=statement.split(None, 1)[0].upper())
+        if not executemany:
+            try:
+                query.plan = explain_statement(
+                    conn.connection.dbapi_connection, conn.dialect.name, statement, parameters
+                )
+            except Exception as e:
+                query.plan = f"EXPLAIN failed: {e}"
+        logger.warning(
+            "Slow query %.1f ms, rows=%s: %s\nPlan:\n%s",
+            elapsed * 1000,
+            query.rows,
+            statement,
+            query.plan,
+        )
+
+    @event.listens_for(engine, "handle_error")
+    def profile_failed_query(exception_context: Any) -> None:
+        profile = current_profile.get()
+        if profile is None or exception_context.statement is None:
+            return
+        elapsed = query_elapsed(exception_context.execution_context)
+        if elapsed is None:
+            return
+        error = exception_context.original_exception
+        profile.queries.append(
+            QueryProfile(
+                exception_context.statement, elapsed, None, error=f"{type(error).__name__}: {error}"
+            )
+        )
+
+
+def create_db_engine(settings: Settings) -> Engine:
+    """Синхронный движок: URL, пул и PRAGMA из настроек"""
+    engine = create_engine(
+        settings.database_url, **_engine_kwargs(settings, settings.database_url, QueuePool)
+    )
+    _install_sqlite_pragmas(engine, settings)
+    if settings.metrics_enabled:
+        install_query_metrics(engine)
+    if settings.profiling_enabled or settings.slow_query_threshold_ms > 0:
+        install_query_profiling(engine, settings.slow_query_threshold_ms / 1000)
+    return engine
+
+
+def create_async_db_engine(settings: Settings) -> AsyncEngine:
+    """Асинхронный движок (aiosqlite для SQLite) с теми же настройками пула и PRAGMA"""
+    url = settings.resolved_async_database_url
+    engine = create_async_engine(url, **_engine_kwargs(settings, url, AsyncAdaptedQueuePool))
+    _install_sqlite_pragmas(engine.sync_engine, settings)
+    if settings.metrics_enabled:
+        install_query_metrics(engine.sync_engine)
+    if settings.profiling_enabled or settings.slow_query_threshold_ms > 0:
+        install_query_profiling(engine.sync_engine, settings.slow_query_threshold_ms / 1000)
+    return engine
+
+
+def create_read_db_engine(settings: Settings) -> Engine:
+    """Движок пула чтения по settings.read_database_url"""
+    engine = create_db_engine(settings.read_settings())
+    _install_read_only(engine)
+    return engine
+
+
+def create_async_read_db_engine(settings: Settings) -> AsyncEngine:
+    engine = create_async_db_engine(settings.read_settings())
+    _install_read_only(engine.sync_engine)
+    return engine
@@ -0,0 +1,60 @@
+from pathlib import Path
+from typing import Any
+
+from alembic import command
+from alembic.autogenerate import compare_metadata
+from alembic.config import Config
+from alembic.migration import MigrationContext
+from sqlalchemy import Connection, Engine, inspect
+
+from app.database.session import Base
+from app.models.db.driver import DRIVER_SEARCH_TABLE, DRIVER_TRGM_INDEX
+
+MIGRATIONS_DIR = Path(__file__).parent / "migrations"
+# Ревизия схемы, которую создавал Base.metadata.create_all до появления миграций
+BASELINE_REVISION = "0001"
+
+
+def alembic_config(url: str | None = None) -> Config:
+    config = Config()
+    config.set_main_option("script_location", str(MIGRATIONS_DIR))
+    if url is not None:
+        config.set_main_option("sqlalchemy.url", url.replace("%", "%%"))
+    return config
+
+
+def upgrade_database(engine: Engine, revision: str = "head") -> None:
+    """
+    Применение миграций к БД движка.
+
+    БД без alembic_version (созданная create_all) сначала помечается ревизией:
+    head, если схема уже совпадает с моделями, иначе исходной BASELINE_REVISION.
+    """
+    with engine.begin() as connection:
+        config = alembic_config()
+        config.attributes["connection"] = connection
+        tables = inspect(connection).get_table_names()
+        if "drivers" in tables and "alembic_version" not in tables:
+            command.stamp(
+                config, "head" if schema_matches_models(connection) else BASELINE_REVISION
+            )
+        command.upgrade(config, revision)
+
+
+def include_name(name: str | None, type_: str, parent_names: Any) -> bool:
+    """Индексы поиска одного диалекта (FTS5-таблицы, pg_trgm) не описаны в Base.metadata"""
+    if type_ == "index":
+        return name != DRIVER_TRGM_INDEX
+    return not (type_ == "table" and name is not None and name.startswith(DRIVER_SEARCH_TABLE))
+
+
+def schema_matches_models(connection: Connection) -> bool:
+    """Нет расхождений между схемой БД и Base.metadata (autogenerate diff пуст)"""
+    context = MigrationContext.configure(connection, opts={"include_name": include_name})
+    return not compare_metadata(context, Base.metadata)
+
+
+if __name__ == "__main__":
+    from app.database.session import get_engine
+
+    upgrade_database(get_engine())
@@ -0,0 +1,52 @@
+from alembic import context
+from sqlalchemy import Connection, create_engine, pool
+
+from app.config import get_settings
+from app.database.migrate import include_name
+from app.database.session import Base
+from app.models.db import driver  # noqa: F401  - регистрация моделей в Base.metadata
+
+config = context.config
+target_metadata = Base.metadata
+
+
+def _database_url() -> str:
+    return config.get_main_option("sqlalchemy.url") or get_settings().database_url
+
+
+def _configure(connection: Connection | None = None) -> None:
+    context.configure(
+        connection=connection,
+        url=None if connection is not None else _database_url(),
+        target_metadata=target_metadata,
+        include_name=include_name,
+        render_as_batch=True,  # ALTER TABLE в SQLite через пересоздание таблицы
+        literal_binds=connection is None,
+    )
+
+
+def run_migrations_offline() -> None:
+    _configure()
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online() -> None:
+    connection = config.attributes.get("connection")
+    if connection is not None:
+        _configure(connection)
+        with context.begin_transaction():
+            context.run_migrations()
+        return
+
+    engine = create_engine(_database_url(), poolclass=pool.NullPool)
+    with engine.connect() as connection:
+        _configure(connection)
+        with context.begin_transaction():
+            context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
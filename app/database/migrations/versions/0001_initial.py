@@ -0,0 +1,40 @@
+"""Таблица drivers
+
+Revision ID: 0001
+Revises:
+Create Date: 2025-11-24 00:00:00
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "0001"
+down_revision: str | None = None
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "drivers",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("license_number", sa.String(), nullable=True),
+        sa.Column("years_of_experience", sa.Integer(), nullable=False),
+        sa.Column(
+            "status",
+            sa.Enum("PENDING", "VERIFIED", "REJECTED", name="driverstatusdb"),
+            nullable=True,
+        ),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_drivers_id", "drivers", ["id"])
+    op.create_index("ix_drivers_license_number", "drivers", ["license_number"], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_drivers_license_number", table_name="drivers")
+    op.drop_index("ix_drivers_id", table_name="drivers")
+    op.drop_table("drivers")
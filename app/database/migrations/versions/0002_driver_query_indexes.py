@@ -0,0 +1,26 @@
+"""Индексы под фильтр по статусу с пагинацией и поиск по user_id
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17 00:00:00
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+
+revision: str = "0002"
+down_revision: str | None = "0001"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    # WHERE status = ? AND id > ? ORDER BY id - поиск и порядок прямо по индексу
+    op.create_index("ix_drivers_status_id", "drivers", ["status", "id"])
+    op.create_index("ix_drivers_user_id", "drivers", ["user_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_drivers_user_id", table_name="drivers")
+    op.drop_index("ix_drivers_status_id", table_name="drivers")
@@ -0,0 +1,25 @@
+"""Колонка version для оптимистичной блокировки смены статуса
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17 00:00:00
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "0003"
+down_revision: str | None = "0002"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.add_column("drivers", sa.Column("version", sa.Integer(), nullable=False, server_default="1"))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("drivers") as batch_op:
+        batch_op.drop_column("version")
@@ -0,0 +1,51 @@
+"""Полнотекстовый индекс номеров прав (SQLite FTS5, trigram)
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17 00:00:00
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+
+revision: str = "0004"
+down_revision: str | None = "0003"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name != "sqlite":
+        return
+    op.execute(
+        "CREATE VIRTUAL TABLE drivers_search USING fts5("
+        "license_number, content='drivers', content_rowid='id', tokenize='trigram')"
+    )
+    op.execute(
+        "CREATE TRIGGER drivers_search_ai AFTER INSERT ON drivers BEGIN "
+        "INSERT INTO drivers_search(rowid, license_number) "
+        "VALUES (new.id, new.license_number); END"
+    )
+    op.execute(
+        "CREATE TRIGGER drivers_search_ad AFTER DELETE ON drivers BEGIN "
+        "INSERT INTO drivers_search(drivers_search, rowid, license_number) "
+        "VALUES ('delete', old.id, old.license_number); END"
+    )
+    op.execute(
+        "CREATE TRIGGER drivers_search_au AFTER UPDATE OF license_number ON drivers BEGIN "
+        "INSERT INTO drivers_search(drivers_search, rowid, license_number) "
+        "VALUES ('delete', old.id, old.license_number); "
+        "INSERT INTO drivers_search(rowid, license_number) "
+        "VALUES (new.id, new.license_number); END"
+    )
+    # Индекс по уже существующим строкам
+    op.execute("INSERT INTO drivers_search(drivers_search) VALUES ('rebuild')")
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != "sqlite":
+        return
+    for trigger in ("drivers_search_au", "drivers_search_ad", "drivers_search_ai"):
+        op.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+    op.execute("DROP TABLE IF EXISTS drivers_search")
@@ -0,0 +1,49 @@
+"""Счётчики водителей по статусу и стажу
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-17 00:00:00
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+revision: str = "0005"
+down_revision: str | None = "0004"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "driver_stats",
+        sa.Column(
+            "status",
+            # Тип driverstatusdb уже создан ревизией 0001
+            postgresql.ENUM(
+                "PENDING", "VERIFIED", "REJECTED", name="driverstatusdb", create_type=False
+            ),
+            nullable=False,
+        ),
+        sa.Column("experience_bucket", sa.Integer(), nullable=False),
+        sa.Column("count", sa.Integer(), server_default="0", nullable=False),
+        sa.PrimaryKeyConstraint("status", "experience_bucket"),
+    )
+    # Начальные значения по уже существующим строкам (границы - EXPERIENCE_BUCKETS)
+    op.execute(
+        "INSERT INTO driver_stats (status, experience_bucket, count) "
+        "SELECT status, CASE "
+        "WHEN years_of_experience >= 20 THEN 20 "
+        "WHEN years_of_experience >= 10 THEN 10 "
+        "WHEN years_of_experience >= 5 THEN 5 "
+        "WHEN years_of_experience >= 2 THEN 2 "
+        "ELSE 0 END AS bucket, count(*) "
+        "FROM drivers WHERE status IS NOT NULL GROUP BY status, bucket"
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("driver_stats")
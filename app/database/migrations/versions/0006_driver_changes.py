@@ -0,0 +1,50 @@
+"""Журнал изменений водителей
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-17 00:00:00
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+revision: str = "0006"
+down_revision: str | None = "0005"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "driver_changes",
+        sa.Column("seq", sa.Integer(), nullable=False),
+        sa.Column(
+            "operation",
+            sa.Enum("CREATED", "STATUS_CHANGED", name="driverchangeoperationdb"),
+            nullable=False,
+        ),
+        sa.Column("driver_id", sa.Integer(), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("license_number", sa.String(), nullable=False),
+        sa.Column("years_of_experience", sa.Integer(), nullable=False),
+        sa.Column(
+            "status",
+            # Тип driverstatusdb уже создан ревизией 0001
+            postgresql.ENUM(
+                "PENDING", "VERIFIED", "REJECTED", name="driverstatusdb", create_type=False
+            ),
+            nullable=False,
+        ),
+        sa.PrimaryKeyConstraint("seq"),
+        sqlite_autoincrement=True,
+    )
+    op.create_index("ix_driver_changes_status_seq", "driver_changes", ["status", "seq"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_driver_changes_status_seq", table_name="driver_changes")
+    op.drop_table("driver_changes")
+    sa.Enum(name="driverchangeoperationdb").drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,36 @@
+"""Trigram-индекс номеров прав для PostgreSQL (pg_trgm)
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-17 00:00:00
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+
+revision: str = "0007"
+down_revision: str | None = "0006"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    # В SQLite подстроку ищет FTS5-таблица ревизии 0004
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    # pg_trgm - contrib-расширение; без него подстрока ищется ILIKE без индекса
+    op.execute(
+        "DO $$ BEGIN "
+        "IF EXISTS (SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm') THEN "
+        "CREATE EXTENSION IF NOT EXISTS pg_trgm; "
+        "CREATE INDEX IF NOT EXISTS ix_drivers_license_number_trgm ON drivers "
+        "USING gin (license_number gin_trgm_ops); "
+        "END IF; END $$"
+    )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    op.execute("DROP INDEX IF EXISTS ix_drivers_license_number_trgm")
@@ -0,0 +1,69 @@
+"""Шарды счётчиков driver_stats
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-17 00:00:00
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+revision: str = "0008"
+down_revision: str | None = "0007"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+# Как в 0005: границы - EXPERIENCE_BUCKETS
+BUCKET = (
+    "CASE "
+    "WHEN years_of_experience >= 20 THEN 20 "
+    "WHEN years_of_experience >= 10 THEN 10 "
+    "WHEN years_of_experience >= 5 THEN 5 "
+    "WHEN years_of_experience >= 2 THEN 2 "
+    "ELSE 0 END"
+)
+
+
+def _create_stats_table(*shard_columns: sa.Column) -> None:
+    op.create_table(
+        "driver_stats",
+        sa.Column(
+            "status",
+            # Тип driverstatusdb уже создан ревизией 0001
+            postgresql.ENUM(
+                "PENDING", "VERIFIED", "REJECTED", name="driverstatusdb", create_type=False
+            ),
+            nullable=False,
+        ),
+        sa.Column("experience_bucket", sa.Integer(), nullable=False),
+        *shard_columns,
+        sa.Column("count", sa.Integer(), server_default="0", nullable=False),
+        sa.PrimaryKeyConstraint(
+            "status", "experience_bucket", *(column.name for column in shard_columns)
+        ),
+    )
+
+
+def upgrade() -> None:
+    # Счётчики выводятся из drivers: таблица пересоздаётся и заполняется заново
+    op.drop_table("driver_stats")
+    _create_stats_table(sa.Column("shard", sa.Integer(), nullable=False))
+    # Шард - id % STATS_SHARDS (16)
+    op.execute(
+        "INSERT INTO driver_stats (status, experience_bucket, shard, count) "
+        f"SELECT status, {BUCKET} AS bucket, id % 16 AS shard, count(*) "
+        "FROM drivers WHERE status IS NOT NULL GROUP BY status, bucket, shard"
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("driver_stats")
+    _create_stats_table()
+    op.execute(
+        "INSERT INTO driver_stats (status, experience_bucket, count) "
+        f"SELECT status, {BUCKET} AS bucket, count(*) "
+        "FROM drivers WHERE status IS NOT NULL GROUP BY status, bucket"
+    )
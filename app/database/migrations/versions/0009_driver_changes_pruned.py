@@ -0,0 +1,30 @@
+"""Граница очистки журнала изменений
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-17 00:00:00
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "0009"
+down_revision: str | None = "0008"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "driver_changes_pruned",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("pruned_seq", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.execute("INSERT INTO driver_changes_pruned (id, pruned_seq) VALUES (1, 0)")
+
+
+def downgrade() -> None:
+    op.drop_table("driver_changes_pruned")
@@ -1,19 +1,217 @@
-from collections.abc import Generator
+import os
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import AsyncGenerator, Generator
 
-from sqlalchemy import create_engine
+from fastapi import Depends, Request
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
 from sqlalchemy.orm import Session, declarative_base, sessionmaker
 
-SQLALCHEMY_DATABASE_URL = "sqlite:///./autopilot.db"
-
-engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+from app.clients import client_key
+from app.config import Settings, get_settings
+from app.database.engine import (
+    create_async_db_engine,
+    create_async_read_db_engine,
+    create_db_engine,
+    create_read_db_engine,
+)
 
 Base = declarative_base()  # Теперь импорт из sqlalchemy.orm
 
+# Движки создаются не при импорте, а в lifespan приложения (init_engines) или
+# лениво при первом обращении - импорт модуля не трогает диск и переживает fork
+SessionLocal = sessionmaker(autocommit=False, autoflush=False)
+# Пул чтения (settings.read_database_url): реплика или тот же файл SQLite только на чтение
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False)
+
+_settings: Settings | None = None
+_engine: Engine | None = None
+_read_engine: Engine | None = None
+# aiosqlite нужен только при AUTOPILOT_DB_ASYNC=1
+_async_engine: AsyncEngine | None = None
+_async_session_factory: async_sessionmaker[AsyncSession] | None = None
+_async_read_engine: AsyncEngine | None = None
+_async_read_session_factory: async_sessionmaker[AsyncSession] | None = None
+
+
+class RecentWrites:
+    """
+    Клиенты, писавшие в основную БД последние window секунд: их чтения идут
+    в основную БД, а не в отстающую реплику (read-your-writes). Учёт в памяти
+    воркера; давно не писавшие клиенты вытесняются (LRU).
+    """
+
+    def __init__(self, window: float = 5.0, max_clients: int = 10_000) -> None:
+        self.window = window
+        self.max_clients = max_clients
+        self._written_at: OrderedDict[str, float] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def mark(self, key: str) -> None:
+        with self._lock:
+            self._written_at.pop(key, None)
+            self._written_at[key] = time.monotonic()
+            if len(self._written_at) > self.max_clients:
+                self._written_at.popitem(last=False)
+
+    def __contains__(self, key: str) -> bool:
+        written_at = self._written_at.get(key)
+        return written_at is not None and time.monotonic() - written_at < self.window
+
+
+recent_writes = RecentWrites()
+
+
+def init_engines(settings: Settings) -> Engine:
+    """Синхронный движок по settings; асинхронный будет создан по ним же при первом запросе"""
+    global _settings, _engine, _read_engine, _async_engine, _async_session_factory
+    global _async_read_engine, _async_read_session_factory
+    _settings = settings
+    _engine = create_db_engine(settings)
+    _read_engine = create_read_db_engine(settings) if settings.read_database_url else None
+    _async_engine = None
+    _async_session_factory = None
+    _async_read_engine = None
+    _async_read_session_factory = None
+    SessionLocal.configure(bind=_engine)
+    ReadSessionLocal.configure(bind=_read_engine)
+    recent_writes.window = settings.read_your_writes_seconds
+    return _engine
+
+
+def get_engine() -> Engine:
+    if _engine is None:
+        return init_engines(get_settings())
+    return _engine
+
+
+def get_read_engine() -> Engine | None:
+    """Движок пула чтения; None - чтения идут в основную БД"""
+    get_engine()
+    return _read_engine
+
+
+async def dispose_engines() -> None:
+    """Закрытие пулов соединений (shutdown приложения)"""
+    global _engine, _read_engine, _async_engine, _async_session_factory
+    global _async_read_engine, _async_read_session_factory
+    for async_engine in (_async_engine, _async_read_engine):
+        if async_engine is not None:
+            await async_engine.dispose()
+    for engine in (_engine, _read_engine):
+        if engine is not None:
+            engine.dispose()
+    _engine = None
+    _read_engine = None
+    _async_engine = None
+    _async_session_factory = None
+    _async_read_engine = None
+    _async_read_session_factory = None
+
+
+def _reset_after_fork() -> None:
+    """Дочерний процесс не должен пользоваться соединениями пула родителя"""
+    for engine in (_engine, _read_engine):
+        if engine is not None:
+            engine.dispose(close=False)
+    for async_engine in (_async_engine, _async_read_engine):
+        if async_engine is not None:
+            async_engine.sync_engine.dispose(close=False)
+
+
+os.register_at_fork(after_in_child=_reset_after_fork)
+
 
 def get_db() -> Generator[Session, None, None]:
+    get_engine()
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+
+def get_async_engine() -> AsyncEngine:
+    global _async_engine, _async_session_factory
+    if _async_engine is None:
+        _async_engine = create_async_db_engine(_settings or get_settings())
+        _async_session_factory = async_sessionmaker(
+            _async_engine, autoflush=False, expire_on_commit=False
+        )
+    return _async_engine
+
+
+def _async_session() -> AsyncSession:
+    get_async_engine()
+    assert _async_session_factory is not None
+    return _async_session_factory()
+
+
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    async with _async_session() as db:
+        yield db
+
+
+async def get_session(
+    request: Request, db: Session = Depends(get_db)
+) -> AsyncGenerator[Session | AsyncSession, None]:
+    """
+    Сессия маршрутов: AsyncSession при db_async в настройках приложения
+    (request.app.state.settings), иначе синхронная db из get_db. Создание
+    неиспользуемой db не берёт соединение из пула.
+    """
+    if not request.app.state.settings.db_async:
+        yield db
+        return
+    async with _async_session() as async_db:
+        yield async_db
+
+
+def reads_from_primary(request: Request) -> bool:
+    """Чтение идёт в основную БД: пула чтения нет или клиент только что писал"""
+    if _read_engine is None:
+        return True
+    return client_key(request.scope, request.app.state.settings.api_key_set) in recent_writes
+
+
+def track_write(request: Request) -> None:
+    """Зависимость маршрутов записи: отмечает клиента для read-your-writes"""
+    if _read_engine is not None:
+        recent_writes.mark(client_key(request.scope, request.app.state.settings.api_key_set))
+
+
+def get_async_read_engine() -> AsyncEngine:
+    global _async_read_engine, _async_read_session_factory
+    if _async_read_engine is None:
+        _async_read_engine = create_async_read_db_engine(_settings or get_settings())
+        _async_read_session_factory = async_sessionmaker(
+            _async_read_engine, autoflush=False, expire_on_commit=False
+        )
+    return _async_read_engine
+
+
+async def get_read_session(
+    request: Request, db: Session | AsyncSession = Depends(get_session)
+) -> AsyncGenerator[Session | AsyncSession, None]:
+    """
+    Сессия маршрутов только на чтение: сессия пула чтения того же вида, что
+    и db (sync или async), или, по reads_from_primary, сама db.
+    """
+    if reads_from_primary(request):
+        yield db
+        return
+    if isinstance(db, AsyncSession):
+        get_async_read_engine()
+        assert _async_read_session_factory is not None
+        async with _async_read_session_factory() as async_read_db:
+            yield async_read_db
+        return
+    read_db = ReadSessionLocal()
+    try:
+        yield read_db
+    finally:
+        # Возврат соединения в пул - вне event loop, как у синхронной get_db
+        await run_in_threadpool(read_db.close)
@@ -1,35 +1,251 @@
-from fastapi import FastAPI
+import asyncio
+import contextlib
+import logging
+import os
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from typing import Any
 
-from app.api.drivers import router as drivers_router
-from app.database.session import Base, engine
+from fastapi import APIRouter, FastAPI
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.engine import make_url
 
-# Создание таблиц
-Base.metadata.create_all(bind=engine)
-
-app: FastAPI = FastAPI(
-    title="AutoPilot API",
-    description="API для сервиса поиска водителей для личного авто",
-    version="1.0.0",
+from app.config import ENV_PREFIX, Settings, get_settings
+from app.database.session import (
+    Base,
+    SessionLocal,
+    dispose_engines,
+    get_engine,
+    init_engines,
 )
+from app.metrics import metrics
+from app.services.cache import configure_driver_list_cache, driver_list_cache
+
+logger = logging.getLogger(__name__)
 
-# Подключение роутеров
-app.include_router(drivers_router)
+router = APIRouter()
 
 
-@app.get("/")
+@router.get("/")
 async def root() -> dict[str, str]:
     return {"message": "Welcome to AutoPilot API"}
 
 
-@app.get("/health")
+@router.get("/health")
 async def health_check() -> dict[str, str]:
     return {"status": "healthy"}
 
 
-def run_app() -> None:
+@router.get("/cache/stats")
+async def cache_stats() -> dict[str, int]:
+    """Счётчики кэша списков водителей: hits/misses/evictions/invalidations"""
+    return {**driver_list_cache.stats.as_dict(), "entries": len(driver_list_cache.backend)}
+
+
+def bootstrap_schema(settings: Settings) -> None:
+    """Подготовка схемы по settings.db_schema_bootstrap"""
+    if settings.db_schema_bootstrap == "none":
+        return
+    engine = get_engine()
+    if settings.db_schema_bootstrap == "migrate":
+        from app.database.migrate import upgrade_database
+
+        upgrade_database(engine)
+    else:
+        from app.models.db import driver  # noqa: F401  - регистрация моделей в Base.metadata
+
+        Base.metadata.create_all(bind=engine)
+
+
+def reconcile_stats() -> int:
+    """Сверка счётчиков статистики водителей в отдельной сессии"""
+    from app.services.driver_service import DriverService
+
+    get_engine()
+    with SessionLocal() as db:
+        return DriverService.reconcile_stats(db)
+
+
+async def reconcile_stats_periodically(interval: float) -> None:
+    """Фоновая сверка счётчиков раз в interval секунд (в каждом воркере)"""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await run_in_threadpool(reconcile_stats)
+        except Exception:
+            logger.exception("Driver stats reconciliation failed")
+
+
+def prune_changes(keep: int) -> int:
+    """Очистка журнала изменений в отдельной сессии"""
+    from app.services.driver_service import DriverService
+
+    get_engine()
+    with SessionLocal() as db:
+        return DriverService.prune_changes(db, keep)
+
+
+async def prune_changes_periodically(interval: float, keep: int) -> None:
+    """Фоновая очистка журнала раз в interval секунд (в каждом воркере)"""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await run_in_threadpool(prune_changes, keep)
+        except Exception:
+            logger.exception("Driver changes pruning failed")
+
+
+def create_app(settings: Settings | None = None) -> FastAPI:
+    """
+    Фабрика приложения без побочных эффектов: движок БД создаётся и схема
+    готовится в lifespan (при старте воркера), а не при импорте модуля.
+    """
+    settings = settings or get_settings()
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+        init_engines(settings)
+        # Общие для процесса метрики и кэш списков - по настройкам этого приложения
+        metrics.enabled = settings.metrics_enabled
+        configure_driver_list_cache(settings)
+        await run_in_threadpool(bootstrap_schema, settings)
+        app.state.create_batcher = None
+        if settings.create_batch_enabled:
+            from app.services.create_batcher import CreateBatcher
+
+            app.state.create_batcher = CreateBatcher(
+                SessionLocal,
+                max_rows=settings.create_batch_max_rows,
+                max_delay=settings.create_batch_max_delay_ms / 1000,
+                max_queue=settings.create_batch_queue_size,
+            )
+            app.state.create_batcher.start()
+        jobs = []
+        if settings.stats_reconcile_interval_seconds > 0:
+            jobs.append(
+                asyncio.create_task(
+                    reconcile_stats_periodically(settings.stats_reconcile_interval_seconds)
+                )
+            )
+        if settings.changes_retention_rows > 0 and settings.changes_prune_interval_seconds > 0:
+            jobs.append(
+                asyncio.create_task(
+                    prune_changes_periodically(
+                        settings.changes_prune_interval_seconds, settings.changes_retention_rows
+                    )
+                )
+            )
+        yield
+        for job in jobs:
+            job.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await job
+        if app.state.create_batcher is not None:
+            await app.state.create_batcher.stop()
+        await dispose_engines()
+
+    app = FastAPI(
+        title="AutoPilot API",
+        description="API для сервиса поиска водителей для личного авто",
+        version="1.0.0",
+        lifespan=lifespan,
+    )
+    app.state.settings = settings
+    app.state.create_batcher = None
+
+    # Роутеры импортируются при сборке приложения, а не при импорте app.main
+    from app.api.drivers import router as drivers_router
+
+    app.include_router(router)
+    app.include_router(drivers_router)
+
+    if settings.profiling_enabled:
+        from app.api.profiling import ProfilingMiddleware
+
+        # Самый внутренний: профилируются только допущенные запросы
+        app.add_middleware(ProfilingMiddleware, settings=settings)
+    admission_limits = (
+        settings.rate_limit_per_second,
+        settings.max_in_flight_requests,
+        settings.max_expensive_requests,
+        settings.max_streaming_requests,
+    )
+    if any(limit > 0 for limit in admission_limits):
+        from app.api.admission import AdmissionMiddleware
+
+        # Внутри MetricsMiddleware: отказы 429/503 тоже попадают в латентность
+        app.add_middleware(AdmissionMiddleware, settings=settings)
+    if settings.metrics_enabled:
+        from app.api.metrics import MetricsMiddleware
+        from app.api.metrics import router as metrics_router
+
+        app.include_router(metrics_router)
+        app.add_middleware(MetricsMiddleware, routes=lambda: app.routes)
+    return app
+
+
+def __getattr__(name: str) -> Any:
+    # app.main:app для uvicorn и тестов создаётся при первом обращении
+    if name == "app":
+        global app
+        app = create_app()
+        return app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def worker_environment(settings: Settings) -> dict[str, str]:
+    """
+    Окружение воркеров при workers > 1: каждый воркер создаёт приложение
+    заново (create_app()) и читает настройки из окружения, поэтому
+    экспортируются все поля settings.
+
+    Схема готовится один раз в родительском процессе, а не в lifespan каждого
+    воркера. Файл SQLite переводится в WAL: читатели разных процессов не ждут
+    писателя, а писатели встают в очередь через busy_timeout вместо ошибки
+    database is locked.
+    """
+    env = {**settings.to_env(), "AUTOPILOT_DB_SCHEMA_BOOTSTRAP": "none"}
+    url = make_url(settings.database_url)
+    if url.get_backend_name() == "sqlite":
+        if url.database in (None, "", ":memory:"):
+            raise ValueError("In-memory SQLite cannot be shared between worker processes")
+        if str(settings.sqlite_pragmas().get("journal_mode", "")).upper() != "WAL":
+            env["AUTOPILOT_SQLITE_JOURNAL_MODE"] = "WAL"
+    return env
+
+
+def run_app(settings: Settings | None = None) -> None:
+    """
+    Запуск uvicorn с settings (по умолчанию - из окружения). Один воркер
+    обслуживает приложение create_app(settings); при workers > 1 настройки
+    передаются процессам через окружение (worker_environment), каждый создаёт
+    свой движок в lifespan. SIGTERM дожидается незавершённых запросов до
+    shutdown_timeout_seconds.
+    """
     import uvicorn
 
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    settings = settings or get_settings()
+    app: FastAPI | str
+    if settings.workers > 1:
+        # Поля, равные None, не должны подхватываться из окружения родителя
+        for name in Settings.model_fields:
+            os.environ.pop(ENV_PREFIX + name.upper(), None)
+        os.environ.update(worker_environment(settings))
+        init_engines(settings)
+        bootstrap_schema(settings)
+        get_engine().dispose()
+        app = "app.main:create_app"
+    else:
+        app = create_app(settings)
+
+    uvicorn.run(
+        app,
+        factory=settings.workers > 1,
+        host=settings.host,
+        port=settings.port,
+        workers=settings.workers,
+        timeout_graceful_shutdown=settings.shutdown_timeout_seconds,
+    )
 
 
 if __name__ == "__main__":
@@ -0,0 +1,263 @@
+import asyncio
+import functools
+import threading
+import time
+from bisect import bisect_left
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, TypeVar
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+# Границы по умолчанию как у prometheus_client
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 7.5, 10.0)
+QUERY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.5, 1.0)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+BATCH_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: tuple[str, ...], values: tuple[str, ...]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{n}="{_escape(v)}"' for n, v in zip(names, values, strict=True))
+    return "{" + pairs + "}"
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if value == int(value) else repr(value)
+
+
+class Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._lock = threading.Lock()
+
+    def _label_values(self, labels: dict[str, str]) -> tuple[str, ...]:
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def render(self) -> list[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> None:
+        super().__init__(name, documentation, labelnames)
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._label_values(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(self._label_values(labels), 0.0)
+
+    def render(self) -> list[str]:
+        lines = super().render()
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                labels = _format_labels(self.labelnames, key)
+                lines.append(f"{self.name}{labels} {_format_value(value)}")
+        return lines
+
+
+@dataclass
+class _HistogramSeries:
+    counts: list[int]  # По корзинам, не накопительно; последняя - +Inf
+    total: float = 0.0
+    count: int = 0
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.buckets = buckets
+        self._series: dict[tuple[str, ...], _HistogramSeries] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._label_values(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = _HistogramSeries([0] * (len(self.buckets) + 1))
+            series.counts[index] += 1
+            series.total += value
+            series.count += 1
+
+    @contextmanager
+    def time(self, **labels: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def count(self, **labels: str) -> int:
+        series = self._series.get(self._label_values(labels))
+        return series.count if series is not None else 0
+
+    def render(self) -> list[str]:
+        lines = super().render()
+        with self._lock:
+            for key, series in sorted(self._series.items()):
+                cumulative = 0
+                bounds = [*map(_format_value, self.buckets), "+Inf"]
+                for bound, bucket_count in zip(bounds, series.counts, strict=True):
+                    cumulative += bucket_count
+                    labels = _format_labels((*self.labelnames, "le"), (*key, bound))
+                    lines.append(f"{self.name}_bucket{labels} {cumulative}")
+                labels = _format_labels(self.labelnames, key)
+                lines.append(f"{self.name}_sum{labels} {_format_value(series.total)}")
+                lines.append(f"{self.name}_count{labels} {series.count}")
+        return lines
+
+
+class MetricsRegistry:
+    """
+    Метрики процесса в формате Prometheus (без prometheus_client).
+
+    При enabled=False middleware и хуки SQLAlchemy не устанавливаются, а
+    обёртка timed() только проверяет флаг. Флаг выставляет lifespan
+    приложения по settings.metrics_enabled.
+    """
+
+    def __init__(self, enabled: bool = True) -> None:
+        self.enabled = enabled
+        self._metrics: dict[str, Metric] = {}
+
+    def counter(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def _register(self, metric: Any) -> Any:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        """Текстовый формат Prometheus (text/plain; version=0.0.4)"""
+        lines = [line for metric in self._metrics.values() for line in metric.render()]
+        return "\n".join(lines) + "\n"
+
+
+metrics = MetricsRegistry()
+
+HTTP_REQUEST_DURATION = metrics.histogram(
+    "autopilot_http_request_duration_seconds",
+    "HTTP request latency by route template",
+    ("method", "route", "status"),
+)
+DB_QUERY_DURATION = metrics.histogram(
+    "autopilot_db_query_duration_seconds",
+    "SQL statement execution time",
+    ("statement",),
+    QUERY_BUCKETS,
+)
+DB_QUERY_ERRORS = metrics.counter(
+    "autopilot_db_query_errors_total",
+    "SQL statements that raised a database error",
+    ("statement",),
+)
+DB_SLOW_QUERIES = metrics.counter(
+    "autopilot_db_slow_queries_total",
+    "SQL statements slower than the slow query threshold",
+    ("statement",),
+)
+DB_QUERIES_PER_REQUEST = metrics.histogram(
+    "autopilot_db_queries_per_request",
+    "Number of SQL statements executed per HTTP request",
+    ("route",),
+    COUNT_BUCKETS,
+)
+SERVICE_DURATION = metrics.histogram(
+    "autopilot_service_duration_seconds",
+    "DriverService operation latency",
+    ("operation",),
+)
+DRIVERS_CREATED = metrics.counter("autopilot_drivers_created_total", "Drivers created")
+ADMISSION_DECISIONS = metrics.counter(
+    "autopilot_admission_decisions_total",
+    "Requests admitted or rejected by admission control",
+    ("decision",),
+)
+ADMISSION_IN_FLIGHT = metrics.histogram(
+    "autopilot_admission_in_flight",
+    "Requests in progress (including this one) at admission",
+    (),
+    COUNT_BUCKETS,
+)
+CREATE_BATCH_SIZE = metrics.histogram(
+    "autopilot_create_batch_size",
+    "POST /drivers/ requests written per group commit",
+    (),
+    BATCH_BUCKETS,
+)
+
+
+@dataclass
+class RequestStats:
+    queries: int = 0
+
+
+# Счётчик запросов к БД текущего HTTP-запроса. Объект изменяемый: копия контекста
+# в threadpool (run_in_threadpool) видит тот же RequestStats.
+current_request_stats: ContextVar[RequestStats | None] = ContextVar(
+    "current_request_stats", default=None
+)
+
+
+def timed(operation: str) -> Callable[[F], F]:
+    """Декоратор: время выполнения (sync или async) в SERVICE_DURATION"""
+
+    def decorator(func: F) -> F:
+        if asyncio.iscoroutinefunction(func):
+
+            @functools.wraps(func)
+            async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+                if not metrics.enabled:
+                    return await func(*args, **kwargs)
+                with SERVICE_DURATION.time(operation=operation):
+                    return await func(*args, **kwargs)
+
+            return async_wrapper  # type: ignore[return-value]
+
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            if not metrics.enabled:
+                return func(*args, **kwargs)
+            with SERVICE_DURATION.time(operation=operation):
+                return func(*args, **kwargs)
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorator
@@ -1,6 +1,6 @@
 import enum
 
-from sqlalchemy import Column, Enum, Integer, String
+from sqlalchemy import DDL, Column, Enum, Index, Integer, String, event
 
 from app.database.session import Base
 
@@ -11,11 +11,136 @@ class DriverStatusDB(enum.Enum):
     REJECTED = "REJECTED"
 
 
+class DriverChangeOperationDB(enum.Enum):
+    CREATED = "created"
+    STATUS_CHANGED = "status_changed"
+
+
 class DriverDB(Base):
     __tablename__ = "drivers"
 
     id: Column[int] = Column(Integer, primary_key=True, index=True)
-    user_id: Column[int] = Column(Integer, nullable=False)
+    user_id: Column[int] = Column(Integer, nullable=False, index=True)
     license_number: Column[str] = Column(String, unique=True, index=True)
     years_of_experience: Column[int] = Column(Integer, nullable=False)
     status: Column[DriverStatusDB] = Column(Enum(DriverStatusDB), default=DriverStatusDB.PENDING)
+    # Увеличивается при каждой смене статуса: UPDATE ... WHERE version = ?
+    version: Column[int] = Column(Integer, nullable=False, default=1, server_default="1")
+
+    __table_args__ = (
+        # Фильтр по статусу + keyset-пагинация: WHERE status = ? AND id > ? ORDER BY id
+        Index("ix_drivers_status_id", "status", "id"),
+    )
+
+
+class DriverStatsDB(Base):
+    """
+    Счётчики водителей по статусу и диапазону стажа (GET /drivers/stats).
+
+    Обновляются в той же транзакции, что и запись в drivers; сверяются с
+    GROUP BY по drivers периодически (DriverService.reconcile_stats). Ячейка
+    разбита на STATS_SHARDS строк по id водителя: конкурентные записи
+    блокируют разные строки, чтение суммирует шарды.
+    """
+
+    __tablename__ = "driver_stats"
+
+    status: Column[DriverStatusDB] = Column(Enum(DriverStatusDB), primary_key=True)
+    # Нижняя граница диапазона стажа из EXPERIENCE_BUCKETS
+    experience_bucket: Column[int] = Column(Integer, primary_key=True)
+    # id водителя % STATS_SHARDS
+    shard: Column[int] = Column(Integer, primary_key=True)
+    count: Column[int] = Column(Integer, nullable=False, default=0, server_default="0")
+
+
+class DriverChangeDB(Base):
+    """
+    Журнал изменений водителей (GET /drivers/changes), только добавление.
+
+    Пишется в транзакции изменения drivers; строка - снимок водителя после
+    изменения. seq не переиспользуется (AUTOINCREMENT, последовательность
+    PostgreSQL) и становится видимым в порядке возрастания: писатели журнала
+    встают в очередь до commit (DriverRepository.lock_change_log).
+    """
+
+    __tablename__ = "driver_changes"
+
+    seq: Column[int] = Column(Integer, primary_key=True)
+    operation: Column[DriverChangeOperationDB] = Column(
+        Enum(DriverChangeOperationDB), nullable=False
+    )
+    driver_id: Column[int] = Column(Integer, nullable=False)
+    user_id: Column[int] = Column(Integer, nullable=False)
+    license_number: Column[str] = Column(String, nullable=False)
+    years_of_experience: Column[int] = Column(Integer, nullable=False)
+    status: Column[DriverStatusDB] = Column(Enum(DriverStatusDB), nullable=False)
+
+    __table_args__ = (
+        # Лента с фильтром по статусу: WHERE status = ? AND seq > ? ORDER BY seq
+        Index("ix_driver_changes_status_seq", "status", "seq"),
+        {"sqlite_autoincrement": True},
+    )
+
+
+class DriverChangesPrunedDB(Base):
+    """
+    Граница очистки журнала driver_changes (DriverService.prune_changes): записи
+    с seq <= pruned_seq удалены. Одна строка; курсор ленты ниже границы - 410.
+    """
+
+    __tablename__ = "driver_changes_pruned"
+
+    id: Column[int] = Column(Integer, primary_key=True)
+    pruned_seq: Column[int] = Column(Integer, nullable=False, default=0)
+
+
+event.listen(
+    DriverChangesPrunedDB.__table__,
+    "after_create",
+    DDL("INSERT INTO driver_changes_pruned (id, pruned_seq) VALUES (1, 0)"),
+)
+
+
+# Поиск по подстроке номера прав: внешняя FTS5-таблица (trigram) поверх drivers,
+# синхронизируется триггерами. Только SQLite; в миграциях - ревизия 0004.
+DRIVER_SEARCH_TABLE = "drivers_search"
+DRIVER_SEARCH_DDL = (
+    f"CREATE VIRTUAL TABLE {DRIVER_SEARCH_TABLE} USING fts5("
+    "license_number, content='drivers', content_rowid='id', tokenize='trigram')",
+    f"CREATE TRIGGER drivers_search_ai AFTER INSERT ON drivers BEGIN "
+    f"INSERT INTO {DRIVER_SEARCH_TABLE}(rowid, license_number) "
+    "VALUES (new.id, new.license_number); END",
+    f"CREATE TRIGGER drivers_search_ad AFTER DELETE ON drivers BEGIN "
+    f"INSERT INTO {DRIVER_SEARCH_TABLE}({DRIVER_SEARCH_TABLE}, rowid, license_number) "
+    "VALUES ('delete', old.id, old.license_number); END",
+    f"CREATE TRIGGER drivers_search_au AFTER UPDATE OF license_number ON drivers BEGIN "
+    f"INSERT INTO {DRIVER_SEARCH_TABLE}({DRIVER_SEARCH_TABLE}, rowid, license_number) "
+    "VALUES ('delete', old.id, old.license_number); "
+    f"INSERT INTO {DRIVER_SEARCH_TABLE}(rowid, license_number) "
+    "VALUES (new.id, new.license_number); END",
+)
+
+for _statement in DRIVER_SEARCH_DDL:
+    event.listen(DriverDB.__table__, "after_create", DDL(_statement).execute_if(dialect="sqlite"))
+event.listen(
+    DriverDB.__table__,
+    "before_drop",
+    DDL(f"DROP TABLE IF EXISTS {DRIVER_SEARCH_TABLE}").execute_if(dialect="sqlite"),
+)
+
+# PostgreSQL: подстрока номера прав - ILIKE по GIN-индексу pg_trgm (аналог FTS5 trigram).
+# pg_trgm - contrib-расширение: без него индекс не создаётся, ILIKE читает всю таблицу.
+# Не описан в Base.metadata (индекс только одного диалекта); в миграциях - ревизия 0007.
+DRIVER_TRGM_INDEX = "ix_drivers_license_number_trgm"
+DRIVER_TRGM_DDL = (
+    "DO $$ BEGIN "
+    "IF EXISTS (SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm') THEN "
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm; "
+    f"CREATE INDEX IF NOT EXISTS {DRIVER_TRGM_INDEX} ON drivers "
+    "USING gin (license_number gin_trgm_ops); "
+    "END IF; END $$"
+)
+
+event.listen(
+    DriverDB.__table__, "after_create", DDL(DRIVER_TRGM_DDL).execute_if(dialect="postgresql")
+)
@@ -17,6 +17,7 @@ class Driver(BaseModel):
     license_number: str
     years_of_experience: int
     status: DriverStatus = DriverStatus.PENDING
+    version: int | None = None  # Версия строки для оптимистичной блокировки
 
     def verify(self) -> None:
         """Business logic: верификация водителя"""
@@ -27,3 +28,12 @@ class Driver(BaseModel):
     def reject(self) -> None:
         """Business logic: отклонение водителя"""
         self.status = DriverStatus.REJECTED
+
+    def change_status(self, status: DriverStatus) -> None:
+        """Business logic: переход в status по правилам verify/reject"""
+        if status == DriverStatus.VERIFIED:
+            self.verify()
+        elif status == DriverStatus.REJECTED:
+            self.reject()
+        else:
+            raise ValueError(f"Transition to {status.value} is not allowed")
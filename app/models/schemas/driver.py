@@ -1,4 +1,7 @@
-from pydantic import BaseModel, ConfigDict, Field  # Добавляем ConfigDict
+from enum import Enum
+from typing import Annotated
+
+from pydantic import BaseModel, ConfigDict, Field, model_validator  # Добавляем ConfigDict
 
 from app.models.domain.driver import DriverStatus
 
@@ -12,8 +15,21 @@ class DriverCreateRequest(BaseModel):
     )
 
 
+class OnConflict(str, Enum):
+    """Поведение POST /drivers/ при занятом license_number"""
+
+    ERROR = "error"
+    RETURN_EXISTING = "return"
+
+
 class DriverUpdateRequest(BaseModel):
     status: DriverStatus
+    # Версия, которую видел клиент; без неё сравнивается версия, прочитанная сервером
+    version: int | None = Field(None, ge=1)
+
+
+class DriverStatusChange(DriverUpdateRequest):
+    id: int = Field(gt=0)
 
 
 # Схемы для ответов (Response)
@@ -25,3 +41,111 @@ class DriverResponse(BaseModel):
     status: DriverStatus
 
     model_config = ConfigDict(from_attributes=True)
+
+
+class DriverVersionedResponse(DriverResponse):
+    version: int
+
+
+# Схемы массового импорта (POST /drivers/bulk)
+class BulkDriverStatus(str, Enum):
+    CREATED = "CREATED"
+    CONFLICT = "CONFLICT"
+    INVALID = "INVALID"
+
+
+class BulkDriverResult(BaseModel):
+    index: int  # Позиция строки во входных данных
+    status: BulkDriverStatus
+    id: int | None = None
+    license_number: str | None = None
+    detail: str | None = None
+
+
+class BulkDriverReport(BaseModel):
+    created: int
+    conflicts: int
+    invalid: int
+    results: list[BulkDriverResult]
+
+
+class ExportFormat(str, Enum):
+    NDJSON = "ndjson"
+    CSV = "csv"
+
+
+# Схемы массовой смены статуса (PATCH /drivers/status)
+class StatusChangeOutcome(str, Enum):
+    UPDATED = "UPDATED"
+    CONFLICT = "CONFLICT"  # Версия изменилась конкурентно
+    NOT_FOUND = "NOT_FOUND"
+    INVALID = "INVALID"  # Переход запрещён правилами Driver
+
+
+class StatusChangeResult(BaseModel):
+    index: int
+    id: int
+    outcome: StatusChangeOutcome
+    driver: DriverVersionedResponse | None = None
+    detail: str | None = None
+
+
+class StatusChangeReport(BaseModel):
+    updated: int
+    conflicts: int
+    not_found: int
+    invalid: int
+    results: list[StatusChangeResult]
+
+
+# Статистика GET /drivers/stats
+class DriverStatsResponse(BaseModel):
+    total: int
+    by_status: dict[DriverStatus, int]
+    # Диапазон стажа ("0-1", "2-4", ..., "20+") -> число водителей
+    by_experience: dict[str, int]
+
+
+# Лента изменений GET /drivers/changes
+class DriverChangeOperation(str, Enum):
+    CREATED = "created"
+    STATUS_CHANGED = "status_changed"
+
+
+class DriverChange(BaseModel):
+    seq: int  # Монотонный номер изменения - позиция для возобновления ленты
+    operation: DriverChangeOperation
+    driver: DriverResponse  # Снимок водителя после изменения
+
+
+class DriverChangesPage(BaseModel):
+    changes: list[DriverChange]
+    last_seq: int  # Передаётся как after в следующем запросе
+
+
+# Точечный поиск POST /drivers/lookup
+LOOKUP_MAX_KEYS = 5000
+
+
+class DriverLookupRequest(BaseModel):
+    user_ids: list[Annotated[int, Field(gt=0)]] = Field(
+        default_factory=list, max_length=LOOKUP_MAX_KEYS
+    )
+    license_numbers: list[Annotated[str, Field(min_length=1, max_length=20)]] = Field(
+        default_factory=list, max_length=LOOKUP_MAX_KEYS
+    )
+
+    @model_validator(mode="after")
+    def check_keys(self) -> "DriverLookupRequest":
+        if not self.user_ids and not self.license_numbers:
+            raise ValueError("user_ids or license_numbers must not be empty")
+        return self
+
+
+class DriverLookupResponse(BaseModel):
+    # user_id не уникален: у пользователя может быть несколько водителей (по id)
+    by_user_id: dict[int, list[DriverResponse]]
+    by_license_number: dict[str, DriverResponse]
+    # Запрошенные ключи без водителей (в порядке запроса)
+    missing_user_ids: list[int]
+    missing_license_numbers: list[str]
@@ -0,0 +1,92 @@
+import functools
+import time
+from collections.abc import Callable
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, TypeVar
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+@dataclass
+class QueryProfile:
+    statement: str
+    duration: float
+    rows: int | None  # rowcount драйвера; для SELECT в SQLite неизвестен
+    plan: str | None = None  # EXPLAIN медленного запроса
+    error: str | None = None  # Ошибка БД, если выражение упало
+
+
+@dataclass
+class RequestProfile:
+    """Разбивка времени одного HTTP-запроса: SQL-выражения и фазы обработки"""
+
+    queries: list[QueryProfile] = field(default_factory=list)
+    # Фаза -> [секунды, вызовы]
+    phases: dict[str, list[float]] = field(default_factory=dict)
+
+    def add_phase(self, name: str, elapsed: float) -> None:
+        totals = self.phases.setdefault(name, [0.0, 0])
+        totals[0] += elapsed
+        totals[1] += 1
+
+    @property
+    def db_time(self) -> float:
+        return sum(query.duration for query in self.queries)
+
+    def server_timing(self, total: float) -> str:
+        """Значение заголовка Server-Timing: SQL, фазы и полное время, мс"""
+        entries = [f'db;dur={self.db_time * 1000:.3f};desc="{len(self.queries)} queries"']
+        entries += [
+            f"{name};dur={elapsed * 1000:.3f}" for name, (elapsed, _) in self.phases.items()
+        ]
+        entries.append(f"total;dur={total * 1000:.3f}")
+        return ", ".join(entries)
+
+    def as_dict(self, total: float) -> dict[str, Any]:
+        return {
+            "total_ms": round(total * 1000, 3),
+            "db_ms": round(self.db_time * 1000, 3),
+            "phases": {
+                name: {"ms": round(elapsed * 1000, 3), "calls": int(calls)}
+                for name, (elapsed, calls) in self.phases.items()
+            },
+            "queries": [
+                {
+                    "statement": query.statement,
+                    "ms": round(query.duration * 1000, 3),
+                    "rows": query.rows,
+                    **({"plan": query.plan} if query.plan is not None else {}),
+                    **({"error": query.error} if query.error is not None else {}),
+                }
+                for query in self.queries
+            ],
+        }
+
+
+# Профиль текущего HTTP-запроса (None - запрос не профилируется). Как и
+# current_request_stats, объект изменяемый и виден из threadpool.
+current_profile: ContextVar[RequestProfile | None] = ContextVar("current_profile", default=None)
+
+
+def profiled(phase: str) -> Callable[[F], F]:
+    """
+    Декоратор: время вызовов функции в фазе phase профиля запроса.
+    Без профиля - прямой вызов после одного ContextVar.get().
+    """
+
+    def decorator(func: F) -> F:
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            profile = current_profile.get()
+            if profile is None:
+                return func(*args, **kwargs)
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                profile.add_phase(phase, time.perf_counter() - started)
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorator
@@ -0,0 +1,245 @@
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from collections.abc import Callable, Hashable, Sequence
+from dataclasses import asdict, dataclass
+from typing import Any
+
+from app.config import Settings, get_settings
+from app.models.domain.driver import DriverStatus
+
+# Строка страницы: кортеж колонок (id, user_id, license_number, years_of_experience, status)
+DriverRow = Sequence[Any]
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0  # Вытеснение по размеру и по истечению TTL
+    invalidations: int = 0  # Удаление записей при записи в БД
+
+    def as_dict(self) -> dict[str, int]:
+        return asdict(self)
+
+
+class CacheBackend(ABC):
+    """Интерфейс хранилища кэша (in-process LRU, Redis и т.п.)"""
+
+    stats: CacheStats
+
+    @abstractmethod
+    def get(self, key: Hashable) -> Any | None:
+        """Значение или None (промах)"""
+
+    @abstractmethod
+    def peek(self, key: Hashable) -> Any | None:
+        """Значение без учёта в статистике и без продления LRU"""
+
+    @abstractmethod
+    def set(self, key: Hashable, value: Any) -> None: ...
+
+    @abstractmethod
+    def delete(self, key: Hashable) -> None: ...
+
+    @abstractmethod
+    def keys(self) -> list[Hashable]: ...
+
+    @abstractmethod
+    def clear(self) -> None: ...
+
+    def __len__(self) -> int:
+        return len(self.keys())
+
+
+class LRUCache(CacheBackend):
+    """Потокобезопасный LRU-кэш с ограничением размера и TTL"""
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 30.0) -> None:
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.stats = CacheStats()
+        self._data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Any | None:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                self.stats.misses += 1
+                return None
+            expires_at, value = item
+            if expires_at < time.monotonic():
+                del self._data[key]
+                self.stats.evictions += 1
+                self.stats.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.stats.hits += 1
+            return value
+
+    def peek(self, key: Hashable) -> Any | None:
+        with self._lock:
+            item = self._data.get(key)
+            return item[1] if item is not None else None
+
+    def set(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                self.stats.evictions += 1
+
+    def delete(self, key: Hashable) -> None:
+        with self._lock:
+            if self._data.pop(key, None) is not None:
+                self.stats.invalidations += 1
+
+    def keys(self) -> list[Hashable]:
+        with self._lock:
+            return list(self._data)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+
+@dataclass(frozen=True)
+class DriverPageKey:
+    """Ключ страницы списка: фильтр + параметры пагинации"""
+
+    status: DriverStatus | None
+    skip: int
+    limit: int
+    after_id: int | None
+
+    def page_affected_by(self, page: "CachedDriverPage", driver_id: int) -> bool:
+        """
+        Меняет ли появление/изменение водителя driver_id содержимое страницы.
+
+        Полная страница покрывает диапазон id до last_id, поэтому водитель с
+        большим id её не затрагивает; неполная (последняя) страница открыта
+        справа. Keyset-страница не видит id <= after_id, а OFFSET-страница
+        сдвигается от любого изменения левее её конца.
+        """
+        if self.after_id is not None and driver_id <= self.after_id:
+            return False
+        return not page.full or driver_id <= page.last_id
+
+
+@dataclass(frozen=True)
+class CachedDriverPage:
+    rows: tuple[DriverRow, ...]
+    full: bool
+    last_id: int
+    # Версия таблицы (DriverService.get_table_version), прочитанная до строк
+    version: int | None = None
+
+
+class DriverListCache:
+    """
+    Read-through кэш страниц DriverService.get_driver_page (строки колонок,
+    из которых строятся и domain-модели, и JSON-ответ).
+
+    Инвалидация точечная: create_driver и смена статуса удаляют только
+    страницы с подходящим фильтром status, содержимое которых меняется.
+    Счётчик поколений не даёт запросу, начатому до записи, положить в кэш
+    устаревшую страницу. Записи других воркеров видны по TTL: страница хранит
+    версию таблицы, при которой прочитана, и ETag ответа строится по ней.
+    """
+
+    def __init__(self, backend: CacheBackend, enabled: bool = True) -> None:
+        self.backend = backend
+        self.enabled = enabled
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    @property
+    def stats(self) -> CacheStats:
+        return self.backend.stats
+
+    @property
+    def generation(self) -> int:
+        return self._generation
+
+    def load(
+        self,
+        key: DriverPageKey,
+        loader: Callable[[], Sequence[DriverRow]],
+        version: int | None = None,
+    ) -> CachedDriverPage:
+        """Страница из кэша или loader(); version - версия таблицы, прочитанная до loader"""
+        page = self.lookup(key, version)
+        if page is None:
+            generation = self.generation
+            page = self.store(key, loader(), generation, version)
+        return page
+
+    def lookup(self, key: DriverPageKey, version: int | None = None) -> CachedDriverPage | None:
+        """С version подходит только страница с известной версией"""
+        if not self.enabled:
+            return None
+        page = self.backend.get(key)
+        if page is None or (version is not None and page.version is None):
+            return None
+        return page
+
+    def store(
+        self,
+        key: DriverPageKey,
+        rows: Sequence[DriverRow],
+        generation: int,
+        version: int | None = None,
+    ) -> CachedDriverPage:
+        """Сохранение страницы, если с момента generation не было инвалидаций"""
+        page = CachedDriverPage(
+            rows=tuple(rows),
+            full=len(rows) >= key.limit,
+            last_id=rows[-1][0] if rows else 0,
+            version=version,
+        )
+        if not self.enabled:
+            return page
+        with self._lock:
+            if generation == self._generation:
+                self.backend.set(key, page)
+        return page
+
+    def invalidate(self, driver_id: int, statuses: set[DriverStatus]) -> None:
+        """Водитель driver_id создан или сменил статус (старый и новый в statuses)"""
+        if not self.enabled:
+            return
+        with self._lock:
+            self._generation += 1
+            for key in self.backend.keys():
+                if not isinstance(key, DriverPageKey):
+                    continue
+                if key.status is not None and key.status not in statuses:
+                    continue
+                page = self.backend.peek(key)
+                if page is not None and key.page_affected_by(page, driver_id):
+                    self.backend.delete(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self.backend.clear()
+
+
+def _build_backend(settings: Settings) -> LRUCache:
+    return LRUCache(max_entries=settings.cache_max_entries, ttl_seconds=settings.cache_ttl_seconds)
+
+
+# До старта приложения - по окружению; lifespan перенастраивает по настройкам приложения
+driver_list_cache = DriverListCache(
+    _build_backend(get_settings()), enabled=get_settings().cache_enabled
+)
+
+
+def configure_driver_list_cache(settings: Settings) -> None:
+    """Параметры кэша списков из настроек приложения; закэшированные страницы сбрасываются"""
+    driver_list_cache.enabled = settings.cache_enabled
+    driver_list_cache.backend = _build_backend(settings)
+    driver_list_cache.clear()
@@ -0,0 +1,48 @@
+import asyncio
+import threading
+
+
+class ChangeNotifier:
+    """
+    Пробуждение ожидающих ленты изменений после commit в этом процессе.
+
+    notify() вызывается из потоков threadpool, ожидающие - корутины в event
+    loop. version растёт с каждым notify(): запомнив её до чтения журнала,
+    ожидающий не пропустит изменение между чтением и wait(). Изменения из
+    других воркеров приходят только при следующем опросе (по таймауту).
+    """
+
+    def __init__(self) -> None:
+        self.version = 0
+        self._lock = threading.Lock()
+        self._waiters: set[tuple[asyncio.AbstractEventLoop, asyncio.Event]] = set()
+
+    def notify(self) -> None:
+        with self._lock:
+            self.version += 1
+            waiters = list(self._waiters)
+        for loop, event in waiters:
+            try:
+                loop.call_soon_threadsafe(event.set)
+            except RuntimeError:
+                pass  # Loop уже закрыт
+
+    async def wait(self, version: int, timeout: float) -> bool:
+        """Ждать notify() после version не дольше timeout; True - было изменение"""
+        waiter = (asyncio.get_running_loop(), asyncio.Event())
+        with self._lock:
+            if self.version != version:
+                return True
+            self._waiters.add(waiter)
+        try:
+            await asyncio.wait_for(waiter[1].wait(), timeout)
+            return True
+        except TimeoutError:
+            return False
+        finally:
+            with self._lock:
+                self._waiters.discard(waiter)
+
+
+# Общий для процесса: DriverService уведомляет, GET /drivers/changes ждёт
+driver_change_notifier = ChangeNotifier()
@@ -0,0 +1,167 @@
+import asyncio
+import contextlib
+import logging
+from collections.abc import Callable, Sequence
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.metrics import CREATE_BATCH_SIZE
+from app.models.domain.driver import Driver, DriverStatus
+from app.models.schemas.driver import BulkDriverResult, BulkDriverStatus, DriverCreateRequest
+from app.services.driver_service import DriverService
+
+logger = logging.getLogger(__name__)
+
+PendingCreate = tuple[DriverCreateRequest, "asyncio.Future[Driver]"]
+
+
+class CreateQueueFullError(Exception):
+    """Очередь группового создания заполнена: клиент повторяет позже (503)"""
+
+
+class CreateBatcher:
+    """
+    Групповой commit для POST /drivers/.
+
+    Конкурентные запросы создания копятся в asyncio-очереди и пишутся одной
+    транзакцией DriverService.bulk_create_drivers: пачка закрывается через
+    max_delay после первого запроса или на max_rows запросах. Пока пачка
+    пишется в threadpool, очередь набирает следующую - под нагрузкой одна
+    транзакция (и один fsync) приходится на много запросов. Каждый запрос
+    получает своего водителя или IntegrityError для дубликата.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        max_rows: int = 500,
+        max_delay: float = 0.005,
+        max_queue: int = 10_000,
+    ) -> None:
+        self.session_factory = session_factory
+        self.max_rows = max_rows
+        self.max_delay = max_delay
+        self._queue: asyncio.Queue[PendingCreate] = asyncio.Queue(max_queue)
+        self._task: asyncio.Task[None] | None = None
+        self._writing: asyncio.Task[None] | None = None
+        # Собираемая пачка: уже вынута из очереди, но ещё не отдана в _write
+        self._collecting: list[PendingCreate] = []
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """
+        Остановка: текущая пачка дописывается, недособранная и оставшиеся в
+        очереди - последней.
+        """
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+        if self._writing is not None:
+            await self._writing
+        batch, self._collecting = self._collecting, []
+        while not self._queue.empty():
+            batch.append(self._queue.get_nowait())
+        if batch:
+            await self._write(batch)
+
+    async def submit(self, driver_data: DriverCreateRequest) -> Driver:
+        """Поставить создание в очередь и дождаться commit его пачки"""
+        future: asyncio.Future[Driver] = asyncio.get_running_loop().create_future()
+        try:
+            self._queue.put_nowait((driver_data, future))
+        except asyncio.QueueFull:
+            raise CreateQueueFullError("Driver creation queue is full") from None
+        return await future
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = self._collecting
+            batch.append(await self._queue.get())
+            deadline = loop.time() + self.max_delay
+            while len(batch) < self.max_rows:
+                if self._queue.empty():
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                    except TimeoutError:
+                        break
+                else:
+                    batch.append(self._queue.get_nowait())
+            self._collecting = []
+            # shield: отмена при остановке не бросает пачку на середине
+            self._writing = asyncio.ensure_future(self._write(batch))
+            await asyncio.shield(self._writing)
+            self._writing = None
+
+    async def _write(self, batch: list[PendingCreate]) -> None:
+        # Клиенты, отключившиеся до commit, не создают водителей
+        pending = [(driver_data, future) for driver_data, future in batch if not future.done()]
+        if not pending:
+            return
+        CREATE_BATCH_SIZE.observe(len(pending))
+        try:
+            results = await run_in_threadpool(
+                self._create, [driver_data for driver_data, _ in pending]
+            )
+        except Exception as e:
+            # Ошибка пачки не относится к конкретному запросу: каждый пишется
+            # отдельно и получает своего водителя или свою ошибку
+            logger.error(f"Error creating driver batch, retrying one by one: {str(e)}")
+            outcomes = await run_in_threadpool(
+                self._create_each, [driver_data for driver_data, _ in pending]
+            )
+            for (_, future), outcome in zip(pending, outcomes, strict=True):
+                if future.done():
+                    continue
+                if isinstance(outcome, Exception):
+                    future.set_exception(outcome)
+                else:
+                    future.set_result(outcome)
+            return
+        for (driver_data, future), result in zip(pending, results, strict=True):
+            if future.done():
+                continue
+            if result.status == BulkDriverStatus.CREATED:
+                future.set_result(
+                    Driver(
+                        id=result.id,
+                        user_id=driver_data.user_id,
+                        license_number=driver_data.license_number,
+                        years_of_experience=driver_data.years_of_experience,
+                        status=DriverStatus.PENDING,
+                    )
+                )
+            else:
+                future.set_exception(
+                    IntegrityError(
+                        "INSERT INTO drivers",
+                        {"license_number": driver_data.license_number},
+                        Exception(result.detail),
+                    )
+                )
+
+    def _create(self, drivers_data: Sequence[DriverCreateRequest]) -> list[BulkDriverResult]:
+        """Одна пачка - bulk_create_drivers в своей сессии; результаты по порядку запросов"""
+        with self.session_factory() as db:
+            results = DriverService.bulk_create_drivers(db, drivers_data)
+        return sorted(results, key=lambda result: result.index)
+
+    def _create_each(self, drivers_data: Sequence[DriverCreateRequest]) -> list[Driver | Exception]:
+        """Запасной путь после сбоя пачки: create_driver на каждый запрос в своей транзакции"""
+        outcomes: list[Driver | Exception] = []
+        for driver_data in drivers_data:
+            try:
+                with self.session_factory() as db:
+                    outcomes.append(DriverService.create_driver(db, driver_data))
+            except Exception as e:
+                outcomes.append(e)
+        return outcomes
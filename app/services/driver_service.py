@@ -1,84 +1,938 @@
 import logging
+from collections import Counter
+from collections.abc import AsyncIterator, Iterator, Sequence
+from typing import Any, cast
 
+from sqlalchemy import (
+    Row,
+    Select,
+    and_,
+    delete,
+    func,
+    insert,
+    select,
+    update,
+)
+from sqlalchemy.engine import CursorResult
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
+from sqlalchemy.sql.dml import ReturningInsert
 
-from app.models.db.driver import DriverDB, DriverStatusDB
+from app.metrics import DRIVERS_CREATED, timed
+from app.models.db.driver import (
+    DriverChangeDB,
+    DriverChangeOperationDB,
+    DriverChangesPrunedDB,
+    DriverDB,
+    DriverStatsDB,
+    DriverStatusDB,
+)
 from app.models.domain.driver import Driver, DriverStatus
-from app.models.schemas.driver import DriverCreateRequest
+from app.models.schemas.driver import (
+    BulkDriverResult,
+    BulkDriverStatus,
+    DriverCreateRequest,
+    DriverStatsResponse,
+    DriverStatusChange,
+    DriverUpdateRequest,
+    DriverVersionedResponse,
+    StatusChangeOutcome,
+    StatusChangeResult,
+)
+from app.profiling import profiled
+from app.services.cache import CachedDriverPage, DriverPageKey, DriverRow, driver_list_cache
+from app.services.change_feed import driver_change_notifier
+from app.services.driver_stats import (
+    EXPERIENCE_BUCKETS,
+    StatsDelta,
+    actual_counts_query,
+    created_delta,
+    delta_parameters,
+    experience_bucket,
+    experience_bucket_label,
+    stats_shard,
+    upsert_statement,
+)
+from app.services.repository import get_repository
 
 logger = logging.getLogger(__name__)
 
+# Размер пакета массовой вставки: одна транзакция и один executemany на пакет
+BULK_BATCH_SIZE = 500
+# Ключей в одном SELECT ... IN точечного поиска (не больше лимита параметров СУБД)
+LOOKUP_CHUNK_SIZE = 5000
+# Размер пакета потоковой выгрузки (yield_per): ограничивает память экспорта
+EXPORT_BATCH_SIZE = 1000
+
+# Колонки быстрого пути чтения (списки, выгрузка) - без ORM-объектов и domain-моделей
+DRIVER_COLUMNS = (
+    DriverDB.id,
+    DriverDB.user_id,
+    DriverDB.license_number,
+    DriverDB.years_of_experience,
+    DriverDB.status,
+)
+
+# Колонки ленты изменений: seq, операция и снимок водителя в порядке DRIVER_COLUMNS
+CHANGE_COLUMNS = (
+    DriverChangeDB.seq,
+    DriverChangeDB.operation,
+    DriverChangeDB.driver_id,
+    DriverChangeDB.user_id,
+    DriverChangeDB.license_number,
+    DriverChangeDB.years_of_experience,
+    DriverChangeDB.status,
+)
+
+# Этапы ранжирования поиска: точное совпадение, префикс, подстрока (trigram-индекс)
+SEARCH_EXACT, SEARCH_PREFIX, SEARCH_SUBSTRING = 0, 1, 2
+# Позиция страницы поиска: этап и последний ключ внутри него
+SearchPosition = tuple[int, str | int]
+# Trigram-индекс находит подстроки от 3 символов
+SEARCH_MIN_SUBSTRING = 3
+# Больше любого символа в UTF-8: license_number < query + PREFIX_SENTINEL - префиксный диапазон
+PREFIX_SENTINEL = "\U0010ffff"
+
+# Колонки строки с версией (смена статуса с оптимистичной блокировкой)
+VERSIONED_DRIVER_COLUMNS = (*DRIVER_COLUMNS, DriverDB.version)
+
+
+class DriverNotFoundError(LookupError):
+    pass
+
+
+class DriverVersionConflictError(Exception):
+    """Строка изменена конкурентно: версия не совпала с ожидаемой"""
+
+
+class DriverChangesPrunedError(Exception):
+    """Курсор ленты ниже границы очистки журнала: нужна полная пересинхронизация"""
+
+    def __init__(self, after_seq: int, last_seq: int) -> None:
+        super().__init__(f"Changes after seq {after_seq} were pruned")
+        self.last_seq = last_seq
+
 
 class DriverService:
     @staticmethod
+    @timed("create_driver")
     def create_driver(db: Session, driver_data: DriverCreateRequest) -> Driver:
-        """Создание водителя с конвертацией между слоями"""
+        """
+        Создание водителя одним INSERT ... RETURNING.
+
+        Дубликат license_number ловит уникальный индекс: IntegrityError
+        пробрасывается (роутер отвечает 409), без предварительного SELECT.
+        """
         try:
-            # Проверяем, нет ли уже водителя с таким номером прав
-            existing_driver = (
-                db.query(DriverDB)
-                .filter(DriverDB.license_number == driver_data.license_number)
-                .first()
+            row = db.execute(DriverService._insert_statement(driver_data)).one()
+            DriverService._record_created(db, [row])
+            db.commit()
+
+            DRIVERS_CREATED.inc()
+            driver_change_notifier.notify()
+
+            # DB -> Domain
+            driver = DriverService._row_to_domain(row)
+            DriverService._invalidate_listings(driver)
+            return driver
+
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Error creating driver: {str(e)}")
+            raise
+
+    @staticmethod
+    @timed("get_or_create_driver")
+    def get_or_create_driver(db: Session, driver_data: DriverCreateRequest) -> tuple[Driver, bool]:
+        """
+        Идемпотентное создание: (водитель, создан ли он сейчас).
+
+        INSERT ... ON CONFLICT DO NOTHING RETURNING; только при конфликте -
+        второй запрос за существующей записью. Существующий водитель
+        возвращается, если принадлежит тому же user_id, иначе - IntegrityError.
+        """
+        try:
+            stmt = DriverService._insert_or_ignore_statement(db, driver_data)
+            row = db.execute(stmt).one_or_none()
+            if row is not None:
+                DriverService._record_created(db, [row])
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Error creating driver: {str(e)}")
+            raise
+
+        if row is not None:
+            DRIVERS_CREATED.inc()
+            driver_change_notifier.notify()
+            driver = DriverService._row_to_domain(row)
+            DriverService._invalidate_listings(driver)
+            return driver, True
+
+        existing = db.execute(
+            select(*DRIVER_COLUMNS).where(DriverDB.license_number == driver_data.license_number)
+        ).one()
+        if existing.user_id != driver_data.user_id:
+            raise IntegrityError(
+                "INSERT INTO drivers",
+                {"license_number": driver_data.license_number},
+                Exception("license_number belongs to another user"),
             )
+        return DriverService._row_to_domain(existing), False
 
-            if existing_driver:
-                raise ValueError(
-                    f"Driver with license number {driver_data.license_number} already exists"
+    @staticmethod
+    @timed("get_drivers")
+    def get_drivers(
+        db: Session,
+        status: DriverStatus | None = None,
+        skip: int = 0,
+        limit: int = 100,
+        after_id: int | None = None,
+    ) -> list[Driver]:
+        """
+        Получение списка водителей с фильтрацией.
+
+        after_id включает keyset-пагинацию (WHERE id > after_id), skip - устаревший
+        OFFSET, который заставляет SQLite читать и отбрасывать skip строк.
+        """
+        rows = DriverService.get_driver_rows(db, status, skip, limit, after_id)
+        # Строки -> Domain конвертация
+        return [DriverService._row_to_domain(row) for row in rows]
+
+    @staticmethod
+    @timed("get_driver_rows")
+    def get_driver_rows(
+        db: Session,
+        status: DriverStatus | None = None,
+        skip: int = 0,
+        limit: int = 100,
+        after_id: int | None = None,
+    ) -> Sequence[DriverRow]:
+        """
+        Быстрый путь чтения: кортежи DRIVER_COLUMNS без ORM-объектов и
+        domain-моделей (их сериализует app.api.encoders). Фильтры - как у get_drivers.
+        """
+        return DriverService.get_driver_page(db, status, skip, limit, after_id).rows
+
+    @staticmethod
+    @timed("get_driver_page")
+    def get_driver_page(
+        db: Session,
+        status: DriverStatus | None = None,
+        skip: int = 0,
+        limit: int = 100,
+        after_id: int | None = None,
+        table_version: int | None = None,
+    ) -> CachedDriverPage:
+        """
+        Строки get_driver_rows вместе с версией таблицы, при которой они прочитаны.
+        table_version - версия, прочитанная до строк (для ETag ответа).
+        """
+        try:
+            # Read-through кэш страниц (инвалидируется при записи)
+            return driver_list_cache.load(
+                DriverPageKey(status, skip, limit, after_id),
+                lambda: DriverService._query_driver_rows(db, status, skip, limit, after_id),
+                table_version,
+            )
+
+        except Exception as e:
+            logger.error(f"Error getting drivers: {str(e)}")
+            raise
+
+    @staticmethod
+    def _query_driver_rows(
+        db: Session,
+        status: DriverStatus | None,
+        skip: int,
+        limit: int,
+        after_id: int | None,
+    ) -> list[DriverRow]:
+        query = db.query(*DRIVER_COLUMNS)
+
+        if status:
+            # Конвертируем Pydantic enum в SQLAlchemy enum
+            db_status = DriverStatusDB[status.value]
+            query = query.filter(DriverDB.status == db_status)
+
+        query = query.order_by(DriverDB.id)
+        if after_id is not None:
+            return query.filter(DriverDB.id > after_id).limit(limit).all()
+        return query.offset(skip).limit(limit).all()
+
+    @staticmethod
+    @timed("get_table_version")
+    def get_table_version(db: Session) -> int:
+        """
+        Версия таблицы drivers - seq последней записи журнала изменений.
+
+        Растёт при каждом создании и смене статуса; чтение - одна строка по
+        первичному ключу, без обращения к drivers (ETag списков). MAX(seq) не
+        опережает закоммиченные данные: seq становятся видимыми по порядку
+        (lock_change_log), а prune_changes не удаляет последнюю запись.
+        """
+        return db.scalar(select(func.max(DriverChangeDB.seq))) or 0
+
+    @staticmethod
+    @timed("get_driver")
+    def get_driver_row(db: Session, driver_id: int) -> Row[Any] | None:
+        """Строка VERSIONED_DRIVER_COLUMNS водителя или None"""
+        return db.execute(
+            select(*VERSIONED_DRIVER_COLUMNS).where(DriverDB.id == driver_id)
+        ).one_or_none()
+
+    @staticmethod
+    @timed("lookup_drivers")
+    def lookup_drivers(
+        db: Session, user_ids: Sequence[int], license_numbers: Sequence[str]
+    ) -> list[DriverRow]:
+        """
+        Водители по списку user_id и списку номеров прав.
+
+        На каждый вид ключей - один SELECT ... IN по индексу колонки; длинный
+        список делится на части по LOOKUP_CHUNK_SIZE и лимиту параметров СУБД.
+        Строки без повторов, по возрастанию id.
+        """
+        chunk_size = min(LOOKUP_CHUNK_SIZE, get_repository(db).max_parameters())
+        rows: dict[int, DriverRow] = {}
+        for column, keys in (
+            (DriverDB.user_id, user_ids),
+            (DriverDB.license_number, license_numbers),
+        ):
+            unique = sorted(set(keys))
+            for start in range(0, len(unique), chunk_size):
+                stmt = select(*DRIVER_COLUMNS).where(column.in_(unique[start : start + chunk_size]))
+                rows.update((row.id, row) for row in db.execute(stmt))
+        return [rows[driver_id] for driver_id in sorted(rows)]
+
+    @staticmethod
+    @timed("search_drivers")
+    def search_drivers(
+        db: Session, query: str, limit: int = 20, after: SearchPosition | None = None
+    ) -> tuple[list[DriverRow], SearchPosition | None]:
+        """
+        Поиск по номеру прав с ранжированием: точное совпадение, затем номера
+        с этим префиксом (по алфавиту), затем содержащие query (по id).
+
+        Каждый этап читается в порядке своего индекса (уникальный индекс
+        license_number, trigram-индекс хранилища для подстроки), поэтому страница не
+        сортирует все совпадения. Возвращает строки и позицию следующей страницы.
+        """
+        phase, key = after if after is not None else (SEARCH_EXACT, None)
+        rows: list[DriverRow] = []
+        while phase <= SEARCH_SUBSTRING:
+            remaining = limit - len(rows)
+            stmt = DriverService._search_phase(db, phase, query, key)
+            batch = db.execute(stmt.limit(remaining)).all() if stmt is not None else []
+            rows.extend(batch)
+            if len(batch) == remaining:
+                last = batch[-1]
+                return rows, (phase, last.id if phase == SEARCH_SUBSTRING else last.license_number)
+            phase, key = phase + 1, None
+        return rows, None
+
+    @staticmethod
+    def _search_phase(
+        db: Session, phase: int, query: str, key: str | int | None
+    ) -> Select[Any] | None:
+        in_prefix = and_(
+            DriverDB.license_number >= query, DriverDB.license_number < query + PREFIX_SENTINEL
+        )
+        if phase == SEARCH_EXACT:
+            # Точное совпадение - одна строка; после неё этап пройден
+            if key is not None:
+                return None
+            return select(*DRIVER_COLUMNS).where(DriverDB.license_number == query)
+        # Ключ этапа префикса - номер прав, этапа подстроки - id водителя
+        if phase == SEARCH_PREFIX:
+            if isinstance(key, int):
+                raise ValueError("Invalid cursor")
+            return (
+                select(*DRIVER_COLUMNS)
+                .where(in_prefix, DriverDB.license_number > (query if key is None else key))
+                .order_by(DriverDB.license_number)
+            )
+        if isinstance(key, str):
+            raise ValueError("Invalid cursor")
+        if len(query) < SEARCH_MIN_SUBSTRING:
+            return None
+        return get_repository(db).substring_search(DRIVER_COLUMNS, query, in_prefix, key)
+
+    @staticmethod
+    @timed("bulk_create_drivers")
+    def bulk_create_drivers(
+        db: Session,
+        drivers_data: Sequence[DriverCreateRequest],
+        seen_licenses: set[str] | None = None,
+    ) -> list[BulkDriverResult]:
+        """
+        Массовое создание водителей пакетами по BULK_BATCH_SIZE.
+
+        На пакет - один SELECT ... IN по license_number, один executemany INSERT
+        и один commit. seen_licenses хранит номера, уже встреченные в этом импорте
+        (для потоковой обработки несколькими вызовами). index в результатах -
+        позиция в drivers_data.
+        """
+        seen = seen_licenses if seen_licenses is not None else set()
+        results: list[BulkDriverResult] = []
+        for start in range(0, len(drivers_data), BULK_BATCH_SIZE):
+            batch = list(enumerate(drivers_data[start : start + BULK_BATCH_SIZE], start))
+            try:
+                try:
+                    batch_results = DriverService._insert_batch(db, batch, seen)
+                except IntegrityError:
+                    # Конкурентная вставка между SELECT и INSERT - повторяем с новой проверкой
+                    db.rollback()
+                    batch_results = DriverService._insert_batch(db, batch, seen)
+            except Exception as e:
+                # В том числе повторная IntegrityError - сессия не остаётся в сбойной транзакции
+                db.rollback()
+                logger.error(f"Error bulk creating drivers: {str(e)}")
+                raise
+            results.extend(batch_results)
+        return results
+
+    @staticmethod
+    def _insert_batch(
+        db: Session, batch: list[tuple[int, DriverCreateRequest]], seen: set[str]
+    ) -> list[BulkDriverResult]:
+        licenses = [driver_data.license_number for _, driver_data in batch]
+        existing = set(
+            db.scalars(select(DriverDB.license_number).where(DriverDB.license_number.in_(licenses)))
+        )
+
+        results: list[BulkDriverResult] = []
+        to_insert: list[tuple[int, DriverCreateRequest]] = []
+        batch_seen: set[str] = set()
+        for index, driver_data in batch:
+            license_number = driver_data.license_number
+            if license_number in existing or license_number in seen or license_number in batch_seen:
+                results.append(
+                    BulkDriverResult(
+                        index=index,
+                        status=BulkDriverStatus.CONFLICT,
+                        license_number=license_number,
+                        detail="Driver with this license number already exists",
+                    )
                 )
+                continue
+            batch_seen.add(license_number)
+            to_insert.append((index, driver_data))
+
+        if to_insert:
+            ids = get_repository(db).insert_drivers(
+                db,
+                [
+                    {
+                        "user_id": driver_data.user_id,
+                        "license_number": driver_data.license_number,
+                        "years_of_experience": driver_data.years_of_experience,
+                        "status": DriverStatusDB.PENDING,
+                    }
+                    for _, driver_data in to_insert
+                ],
+            )
+            DriverService._record_created(
+                db,
+                [
+                    (
+                        driver_id,
+                        driver_data.user_id,
+                        driver_data.license_number,
+                        driver_data.years_of_experience,
+                        DriverStatusDB.PENDING,
+                    )
+                    for (_, driver_data), driver_id in zip(to_insert, ids, strict=True)
+                ],
+            )
+            db.commit()
+            DRIVERS_CREATED.inc(len(ids))
+            driver_change_notifier.notify()
+            driver_list_cache.invalidate(max(ids), {DriverStatus.PENDING})
+            results.extend(
+                BulkDriverResult(
+                    index=index,
+                    status=BulkDriverStatus.CREATED,
+                    id=driver_id,
+                    license_number=driver_data.license_number,
+                )
+                for (index, driver_data), driver_id in zip(to_insert, ids, strict=True)
+            )
+        seen.update(batch_seen)
+        return results
 
-            # Pydantic -> Domain
-            domain_driver = Driver(
-                user_id=driver_data.user_id,
-                license_number=driver_data.license_number,
-                years_of_experience=driver_data.years_of_experience,
+    @staticmethod
+    @timed("change_status")
+    def change_status(db: Session, driver_id: int, update_data: DriverUpdateRequest) -> Driver:
+        """
+        Смена статуса по правилам Driver.verify()/reject().
+
+        Без блокировок: один условный UPDATE ... WHERE id = ? AND version = ?.
+        Если версия уже другая (конкурентное изменение или устаревшая версия
+        клиента) - DriverVersionConflictError, нет водителя - DriverNotFoundError,
+        запрещённый переход - ValueError.
+        """
+        try:
+            current = db.execute(
+                select(*VERSIONED_DRIVER_COLUMNS).where(DriverDB.id == driver_id)
+            ).one_or_none()
+            if current is None:
+                raise DriverNotFoundError(f"Driver {driver_id} not found")
+            row = DriverService._apply_status_change(db, current, update_data)
+            DriverService._log_changes(db, DriverChangeOperationDB.STATUS_CHANGED, [row])
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        driver_change_notifier.notify()
+        driver = DriverService._row_to_domain(row)
+        DriverService._invalidate_listings(driver, DriverStatus(current.status.value))
+        return driver
+
+    @staticmethod
+    @timed("change_statuses")
+    def change_statuses(
+        db: Session, changes: Sequence[DriverStatusChange]
+    ) -> list[StatusChangeResult]:
+        """
+        Массовая смена статуса: пакетами по BULK_BATCH_SIZE, на пакет - один
+        SELECT ... IN и один commit. Каждое изменение - отдельный условный UPDATE,
+        результат по каждому элементу (index - позиция в changes).
+        """
+        results: list[StatusChangeResult] = []
+        for start in range(0, len(changes), BULK_BATCH_SIZE):
+            batch = changes[start : start + BULK_BATCH_SIZE]
+            # (новая строка, прежний статус) - журнал и сброс кэша списков
+            updated: list[tuple[Row[Any], DriverStatus]] = []
+            try:
+                current = {
+                    row.id: row
+                    for row in db.execute(
+                        select(*VERSIONED_DRIVER_COLUMNS).where(
+                            DriverDB.id.in_({change.id for change in batch})
+                        )
+                    )
+                }
+                for index, change in enumerate(batch, start):
+                    results.append(DriverService._change_one(db, index, change, current, updated))
+                # Журнал - одной вставкой в конце пакета (после неё - только commit)
+                if updated:
+                    DriverService._log_changes(
+                        db, DriverChangeOperationDB.STATUS_CHANGED, [row for row, _ in updated]
+                    )
+                db.commit()
+                driver_change_notifier.notify()
+            except Exception as e:
+                db.rollback()
+                logger.error(f"Error changing driver statuses: {str(e)}")
+                raise
+            for row, old_status in updated:
+                DriverService._invalidate_listings(DriverService._row_to_domain(row), old_status)
+        return results
+
+    @staticmethod
+    def _change_one(
+        db: Session,
+        index: int,
+        change: DriverStatusChange,
+        current: dict[int, Row[Any]],
+        updated: list[tuple[Row[Any], DriverStatus]],
+    ) -> StatusChangeResult:
+        row = current.get(change.id)
+        if row is None:
+            return StatusChangeResult(
+                index=index, id=change.id, outcome=StatusChangeOutcome.NOT_FOUND
+            )
+        try:
+            new_row = DriverService._apply_status_change(db, row, change)
+        except ValueError as e:
+            outcome, detail = StatusChangeOutcome.INVALID, str(e)
+        except DriverVersionConflictError as e:
+            outcome, detail = StatusChangeOutcome.CONFLICT, str(e)
+        else:
+            # Повтор того же id в пакете видит уже новую версию
+            current[change.id] = new_row
+            driver = DriverService._row_to_domain(new_row)
+            updated.append((new_row, DriverStatus(row.status.value)))
+            return StatusChangeResult(
+                index=index,
+                id=change.id,
+                outcome=StatusChangeOutcome.UPDATED,
+                driver=DriverVersionedResponse.model_validate(driver.model_dump()),
             )
+        return StatusChangeResult(index=index, id=change.id, outcome=outcome, detail=detail)
 
-            # Domain -> DB (конвертируем статус)
-            db_driver = DriverDB(
-                user_id=domain_driver.user_id,
-                license_number=domain_driver.license_number,
-                years_of_experience=domain_driver.years_of_experience,
-                status=DriverStatusDB[domain_driver.status.value],  # Конвертируем правильно
+    @staticmethod
+    def _apply_status_change(
+        db: Session, current: Row[Any], update_data: DriverUpdateRequest
+    ) -> Row[Any]:
+        """
+        Переход по правилам Domain, условный UPDATE и счётчики (без журнала и
+        commit) - новая строка
+        """
+        driver = DriverService._row_to_domain(current)
+        old_status = driver.status
+        expected_version = (
+            update_data.version if update_data.version is not None else current.version
+        )
+        if expected_version != current.version:
+            raise DriverVersionConflictError(
+                f"Driver {driver.id} has version {current.version}, expected {expected_version}"
             )
 
-            db.add(db_driver)
+        driver.change_status(update_data.status)
+
+        row = db.execute(
+            update(DriverDB)
+            .where(DriverDB.id == driver.id, DriverDB.version == expected_version)
+            .values(status=DriverStatusDB[driver.status.value], version=DriverDB.version + 1)
+            .returning(*VERSIONED_DRIVER_COLUMNS)
+            .execution_options(synchronize_session=False)
+        ).one_or_none()
+        if row is None:
+            raise DriverVersionConflictError(f"Driver {driver.id} was modified concurrently")
+
+        bucket = experience_bucket(driver.years_of_experience)
+        shard = stats_shard(row.id)
+        delta: StatsDelta = Counter()
+        delta[(DriverStatusDB[old_status.value], bucket, shard)] -= 1
+        delta[(row.status, bucket, shard)] += 1
+        DriverService._record_stats(db, delta)
+        return row
+
+    @staticmethod
+    @timed("get_stats")
+    def get_stats(db: Session) -> DriverStatsResponse:
+        """
+        Число водителей по статусу и диапазону стажа из счётчиков driver_stats
+        (сумма шардов): чтение не зависит от размера drivers (не больше
+        статусов x диапазонов x STATS_SHARDS строк).
+        """
+        by_status = dict.fromkeys(DriverStatus, 0)
+        by_experience = {experience_bucket_label(bound): 0 for bound in EXPERIENCE_BUCKETS}
+        rows = db.execute(
+            select(DriverStatsDB.status, DriverStatsDB.experience_bucket, DriverStatsDB.count)
+        )
+        for status, bucket, count in rows:
+            by_status[DriverStatus(status.value)] += count
+            by_experience[experience_bucket_label(bucket)] += count
+        return DriverStatsResponse(
+            total=sum(by_status.values()), by_status=by_status, by_experience=by_experience
+        )
+
+    @staticmethod
+    @timed("reconcile_stats")
+    def reconcile_stats(db: Session) -> int:
+        """
+        Сверка счётчиков с GROUP BY по drivers: в одной транзакции счётчики
+        удаляются и вставляются пересчитанными (по шардам). Возвращает число
+        ячеек (статус, диапазон), сумма которых расходилась.
+        """
+        try:
+            stored: Counter[tuple[DriverStatusDB, int]] = Counter()
+            for status, bucket, count in db.execute(
+                delete(DriverStatsDB).returning(
+                    DriverStatsDB.status, DriverStatsDB.experience_bucket, DriverStatsDB.count
+                )
+            ):
+                stored[(status, bucket)] += count
+            rows = db.execute(actual_counts_query()).all()
+            actual: Counter[tuple[DriverStatusDB, int]] = Counter()
+            for status, bucket, _, count in rows:
+                actual[(status, bucket)] += count
+            if rows:
+                db.execute(
+                    insert(DriverStatsDB),
+                    [
+                        {
+                            "status": status,
+                            "experience_bucket": bucket,
+                            "shard": shard,
+                            "count": count,
+                        }
+                        for status, bucket, shard, count in rows
+                    ],
+                )
             db.commit()
-            db.refresh(db_driver)
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Error reconciling driver stats: {str(e)}")
+            raise
 
-            # DB -> Domain
-            return DriverService._db_to_domain(db_driver)
+        drift = sum(
+            1 for key in stored.keys() | actual.keys() if stored.get(key, 0) != actual.get(key, 0)
+        )
+        if drift:
+            logger.warning(f"Driver stats drifted in {drift} cells, counters rebuilt")
+        return drift
+
+    @staticmethod
+    @timed("get_changes")
+    def get_changes(
+        db: Session, after_seq: int = 0, status: DriverStatus | None = None, limit: int = 100
+    ) -> Sequence[Row[Any]]:
+        """
+        Записи журнала изменений с seq > after_seq в порядке seq.
 
+        Транзакция завершается сразу после чтения: поток изменений опрашивает
+        журнал долго и не должен держать соединение и снимок SQLite между опросами.
+        Если часть записей после after_seq уже удалена prune_changes -
+        DriverChangesPrunedError с текущим seq для пересинхронизации.
+        """
+        stmt = select(*CHANGE_COLUMNS).where(DriverChangeDB.seq > after_seq)
+        if status is not None:
+            stmt = stmt.where(DriverChangeDB.status == DriverStatusDB[status.value])
+        rows = db.execute(stmt.order_by(DriverChangeDB.seq).limit(limit)).all()
+        # Граница читается после записей: очистка, закоммиченная между двумя
+        # запросами (READ COMMITTED), не спрячет удалённые записи
+        pruned_seq = db.scalar(select(DriverChangesPrunedDB.pruned_seq)) or 0
+        last_seq = None
+        if after_seq < pruned_seq:
+            last_seq = db.scalar(select(func.max(DriverChangeDB.seq))) or pruned_seq
+        db.commit()
+        if last_seq is not None:
+            raise DriverChangesPrunedError(after_seq, last_seq)
+        return rows
+
+    @staticmethod
+    @timed("prune_changes")
+    def prune_changes(db: Session, keep: int) -> int:
+        """
+        Удаление журнала изменений, кроме keep последних записей; возвращает
+        число удалённых. Последняя запись остаётся всегда: MAX(seq) - версия
+        таблицы для ETag - не уменьшается.
+        """
+        try:
+            pruned_seq = db.scalar(
+                select(DriverChangeDB.seq)
+                .order_by(DriverChangeDB.seq.desc())
+                .offset(max(keep, 1))
+                .limit(1)
+            )
+            if pruned_seq is None:
+                db.commit()
+                return 0
+            deleted = cast(
+                CursorResult[Any],
+                db.execute(delete(DriverChangeDB).where(DriverChangeDB.seq <= pruned_seq)),
+            )
+            db.execute(
+                update(DriverChangesPrunedDB)
+                .where(DriverChangesPrunedDB.pruned_seq < pruned_seq)
+                .values(pruned_seq=pruned_seq)
+            )
+            db.commit()
         except Exception as e:
             db.rollback()
-            logger.error(f"Error creating driver: {str(e)}")
+            logger.error(f"Error pruning driver changes: {str(e)}")
             raise
+        return deleted.rowcount
 
     @staticmethod
-    def get_drivers(
+    def iter_driver_batches(
         db: Session,
         status: DriverStatus | None = None,
+        after_id: int | None = None,
+        batch_size: int = EXPORT_BATCH_SIZE,
+    ) -> Iterator[Sequence[Row[Any]]]:
+        """Потоковое чтение кортежей DRIVER_COLUMNS пакетами по batch_size строк"""
+        stmt = DriverService._rows_query(status, after_id)
+        yield from get_repository(db).stream(db, stmt, batch_size)
+
+    @staticmethod
+    async def iter_driver_batches_async(
+        db: AsyncSession,
+        status: DriverStatus | None = None,
+        after_id: int | None = None,
+        batch_size: int = EXPORT_BATCH_SIZE,
+    ) -> AsyncIterator[Sequence[Row[Any]]]:
+        """Потоковое чтение через AsyncSession.stream"""
+        stmt = DriverService._rows_query(status, after_id)
+        result = await db.stream(stmt.execution_options(yield_per=batch_size))
+        async for partition in result.partitions():
+            yield partition
+
+    @staticmethod
+    def _rows_query(status: DriverStatus | None, after_id: int | None) -> Select[Any]:
+        stmt = select(*DRIVER_COLUMNS).order_by(DriverDB.id)
+        if status:
+            stmt = stmt.where(DriverDB.status == DriverStatusDB[status.value])
+        if after_id is not None:
+            stmt = stmt.where(DriverDB.id > after_id)
+        return stmt
+
+    @staticmethod
+    @timed("create_driver_async")
+    async def create_driver_async(db: AsyncSession, driver_data: DriverCreateRequest) -> Driver:
+        """Создание водителя через AsyncSession (не блокирует event loop)"""
+        try:
+            row = (await db.execute(DriverService._insert_statement(driver_data))).one()
+            await db.run_sync(DriverService._record_created, [row])
+            await db.commit()
+            DRIVERS_CREATED.inc()
+            driver_change_notifier.notify()
+
+            driver = DriverService._row_to_domain(row)
+            DriverService._invalidate_listings(driver)
+            return driver
+
+        except Exception as e:
+            await db.rollback()
+            logger.error(f"Error creating driver: {str(e)}")
+            raise
+
+    @staticmethod
+    @timed("get_drivers_async")
+    async def get_drivers_async(
+        db: AsyncSession,
+        status: DriverStatus | None = None,
         skip: int = 0,
         limit: int = 100,
+        after_id: int | None = None,
     ) -> list[Driver]:
-        """Получение списка водителей с фильтрацией"""
-        try:
-            query = db.query(DriverDB)
+        """Получение списка водителей через AsyncSession"""
+        rows = await DriverService.get_driver_rows_async(db, status, skip, limit, after_id)
+        return [DriverService._row_to_domain(row) for row in rows]
 
-            if status:
-                # Конвертируем Pydantic enum в SQLAlchemy enum
-                db_status = DriverStatusDB[status.value]
-                query = query.filter(DriverDB.status == db_status)
+    @staticmethod
+    @timed("get_driver_rows_async")
+    async def get_driver_rows_async(
+        db: AsyncSession,
+        status: DriverStatus | None = None,
+        skip: int = 0,
+        limit: int = 100,
+        after_id: int | None = None,
+    ) -> Sequence[DriverRow]:
+        """Быстрый путь чтения через AsyncSession"""
+        page = await DriverService.get_driver_page_async(db, status, skip, limit, after_id)
+        return page.rows
 
-            db_drivers = query.offset(skip).limit(limit).all()
+    @staticmethod
+    @timed("get_driver_page_async")
+    async def get_driver_page_async(
+        db: AsyncSession,
+        status: DriverStatus | None = None,
+        skip: int = 0,
+        limit: int = 100,
+        after_id: int | None = None,
+        table_version: int | None = None,
+    ) -> CachedDriverPage:
+        """get_driver_page через AsyncSession"""
+        cache_key = DriverPageKey(status, skip, limit, after_id)
+        cached = driver_list_cache.lookup(cache_key, table_version)
+        if cached is not None:
+            return cached
+        generation = driver_list_cache.generation
+        try:
+            stmt = DriverService._rows_query(status, after_id)
+            if after_id is None:
+                stmt = stmt.offset(skip)
 
-            # DB -> Domain конвертация
-            return [DriverService._db_to_domain(driver) for driver in db_drivers]
+            rows = (await db.execute(stmt.limit(limit))).all()
+
+            return driver_list_cache.store(cache_key, rows, generation, table_version)
 
         except Exception as e:
             logger.error(f"Error getting drivers: {str(e)}")
             raise
 
     @staticmethod
+    def _record_created(db: Session, rows: Sequence[DriverRow]) -> None:
+        """Счётчики статистики и журнал изменений для новых строк DRIVER_COLUMNS (без commit)"""
+        DriverService._record_stats(db, created_delta((row[0], row[4], row[3]) for row in rows))
+        DriverService._log_changes(db, DriverChangeOperationDB.CREATED, rows)
+
+    @staticmethod
+    def _log_changes(
+        db: Session, operation: DriverChangeOperationDB, rows: Sequence[DriverRow]
+    ) -> None:
+        """
+        Запись в журнал driver_changes в текущей транзакции (без commit) -
+        последняя запись транзакции: до commit писатели журнала стоят в очереди.
+        """
+        get_repository(db).lock_change_log(db)
+        db.execute(
+            insert(DriverChangeDB),
+            [
+                {
+                    "operation": operation,
+                    "driver_id": row[0],
+                    "user_id": row[1],
+                    "license_number": row[2],
+                    "years_of_experience": row[3],
+                    "status": row[4],
+                }
+                for row in rows
+            ],
+        )
+
+    @staticmethod
+    def _record_stats(db: Session, delta: StatsDelta) -> None:
+        """Изменение счётчиков driver_stats в текущей транзакции (без commit)"""
+        parameters = delta_parameters(delta)
+        if parameters:
+            db.execute(upsert_statement(get_repository(db).dialect_insert), parameters)
+
+    @staticmethod
+    def _invalidate_listings(driver: Driver, *statuses: DriverStatus) -> None:
+        """Сброс закэшированных страниц, которые затрагивает запись водителя"""
+        if driver.id is not None:
+            driver_list_cache.invalidate(driver.id, {driver.status, *statuses})
+
+    @staticmethod
+    def _insert_statement(driver_data: DriverCreateRequest) -> ReturningInsert[Any]:
+        """INSERT ... RETURNING DRIVER_COLUMNS"""
+        values = DriverService._insert_values(driver_data)
+        return insert(DriverDB).values(values).returning(*DRIVER_COLUMNS)
+
+    @staticmethod
+    def _insert_or_ignore_statement(
+        db: Session, driver_data: DriverCreateRequest
+    ) -> ReturningInsert[Any]:
+        """INSERT ... ON CONFLICT (license_number) DO NOTHING RETURNING DRIVER_COLUMNS"""
+        return (
+            get_repository(db)
+            .dialect_insert(DriverDB)
+            .values(DriverService._insert_values(driver_data))
+            .on_conflict_do_nothing(index_elements=[DriverDB.license_number])
+            .returning(*DRIVER_COLUMNS)
+        )
+
+    @staticmethod
+    def _insert_values(driver_data: DriverCreateRequest) -> dict[str, Any]:
+        """Конвертация запроса в значения колонок через Domain"""
+        # Pydantic -> Domain
+        domain_driver = Driver(
+            user_id=driver_data.user_id,
+            license_number=driver_data.license_number,
+            years_of_experience=driver_data.years_of_experience,
+        )
+
+        # Domain -> DB (конвертируем статус)
+        return {
+            "user_id": domain_driver.user_id,
+            "license_number": domain_driver.license_number,
+            "years_of_experience": domain_driver.years_of_experience,
+            "status": DriverStatusDB[domain_driver.status.value],
+        }
+
+    @staticmethod
+    @profiled("conversion")
+    def _row_to_domain(row: DriverRow) -> Driver:
+        """Конвертация строки DRIVER_COLUMNS (или VERSIONED_DRIVER_COLUMNS) в Domain модель"""
+        driver_id, user_id, license_number, years_of_experience, status, *version = row
+        return Driver(
+            id=driver_id,
+            user_id=user_id,
+            license_number=license_number,
+            years_of_experience=years_of_experience,
+            status=DriverStatus(status.value),
+            version=version[0] if version else None,
+        )
+
+    @staticmethod
+    @profiled("conversion")
     def _db_to_domain(db_driver: DriverDB) -> Driver:
         """Конвертация DB модели в Domain модель"""
         return Driver(
@@ -88,12 +942,3 @@ class DriverService:
             years_of_experience=db_driver.years_of_experience,  # type: ignore
             status=DriverStatus(db_driver.status.value),
         )
-
-
-# тут можно добавить метрики логирование
-# metrics.counter('drivers_created_total').inc()
-# metrics.histogram('driver_creation_duration_seconds').observe(duration)
-# Логи: создание/получение водителей, ошибки валидации
-# Метрики: количество созданных водителей, время выполнения операций
-# logger.info(f"Driver created: {driver_data.license_number}")
-# metrics.counter('drivers_created').inc()
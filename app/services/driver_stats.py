@@ -0,0 +1,89 @@
+from collections import Counter
+from collections.abc import Callable, Iterable
+from typing import Any
+
+from sqlalchemy import ColumnElement, case, func, select
+
+from app.models.db.driver import DriverDB, DriverStatsDB, DriverStatusDB
+
+# Нижние границы диапазонов стажа: 0-1, 2-4, 5-9, 10-19, 20+
+EXPERIENCE_BUCKETS = (0, 2, 5, 10, 20)
+# Строк на ячейку (статус, диапазон): в PostgreSQL конкурентные создания ждут
+# блокировку одной строки счётчика только при совпадении id % STATS_SHARDS
+STATS_SHARDS = 16
+
+# Изменение счётчиков: (статус, диапазон стажа, шард) -> +/- число водителей
+StatsDelta = Counter[tuple[DriverStatusDB, int, int]]
+
+
+def experience_bucket(years_of_experience: int) -> int:
+    """Нижняя граница диапазона, в который попадает стаж"""
+    return max(bound for bound in EXPERIENCE_BUCKETS if bound <= max(years_of_experience, 0))
+
+
+def stats_shard(driver_id: int) -> int:
+    """Строка счётчика ячейки для водителя: создание и смены статуса - в одном шарде"""
+    return driver_id % STATS_SHARDS
+
+
+def experience_bucket_label(bound: int) -> str:
+    index = EXPERIENCE_BUCKETS.index(bound)
+    if index == len(EXPERIENCE_BUCKETS) - 1:
+        return f"{bound}+"
+    return f"{bound}-{EXPERIENCE_BUCKETS[index + 1] - 1}"
+
+
+def experience_bucket_expr() -> ColumnElement[int]:
+    """experience_bucket() в SQL - для GROUP BY по drivers"""
+    return case(
+        *(
+            (DriverDB.years_of_experience >= bound, bound)
+            for bound in reversed(EXPERIENCE_BUCKETS[1:])
+        ),
+        else_=EXPERIENCE_BUCKETS[0],
+    )
+
+
+def created_delta(rows: Iterable[tuple[int, DriverStatusDB, int]]) -> StatsDelta:
+    """Счётчики для новых водителей: (id, статус, стаж) каждой строки"""
+    return Counter(
+        (status, experience_bucket(years), stats_shard(driver_id))
+        for driver_id, status, years in rows
+    )
+
+
+def upsert_statement(dialect_insert: Callable[[Any], Any]) -> Any:
+    """
+    INSERT ... ON CONFLICT DO UPDATE SET count = count + excluded.count.
+
+    Выполняется executemany с параметрами delta_parameters() в транзакции
+    изменения drivers - счётчики фиксируются вместе с ней. dialect_insert -
+    DriverRepository.dialect_insert.
+    """
+    stmt = dialect_insert(DriverStatsDB)
+    return stmt.on_conflict_do_update(
+        index_elements=[DriverStatsDB.status, DriverStatsDB.experience_bucket, DriverStatsDB.shard],
+        set_={"count": DriverStatsDB.count + stmt.excluded.count},
+    )
+
+
+def delta_parameters(delta: StatsDelta) -> list[dict[str, Any]]:
+    return [
+        {"status": status, "experience_bucket": bucket, "shard": shard, "count": count}
+        # Постоянный порядок строк - одинаковый порядок блокировок у конкурентных транзакций
+        for (status, bucket, shard), count in sorted(
+            delta.items(), key=lambda item: (item[0][0].value, *item[0][1:])
+        )
+        if count
+    ]
+
+
+def actual_counts_query() -> Any:
+    """GROUP BY по drivers - эталон для сверки счётчиков: (статус, диапазон, шард, число)"""
+    bucket = experience_bucket_expr()
+    shard = DriverDB.id % STATS_SHARDS
+    return (
+        select(DriverDB.status, bucket, shard, func.count())
+        .where(DriverDB.status.is_not(None))
+        .group_by(DriverDB.status, bucket, shard)
+    )
@@ -0,0 +1,191 @@
+import sqlite3
+from abc import ABC, abstractmethod
+from collections.abc import Iterator, Sequence
+from typing import Any
+
+from sqlalchemy import ColumnElement, Row, Select, column, func, insert, select, table, text
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+from sqlalchemy.util import await_only
+
+from app.models.db.driver import DRIVER_SEARCH_TABLE, DriverDB
+
+# Колонки, которые заполняет массовая вставка (остальные - значения по умолчанию)
+INSERT_COLUMNS = ("user_id", "license_number", "years_of_experience", "status")
+
+drivers_search = table(DRIVER_SEARCH_TABLE, column("rowid"), column("license_number"))
+
+
+class DriverRepository(ABC):
+    """
+    Операции над drivers, которые зависят от СУБД.
+
+    Остальные запросы DriverService - общий SQL. Реализация выбирается по
+    диалекту URL из AUTOPILOT_DATABASE_URL (get_repository).
+    """
+
+    @abstractmethod
+    def dialect_insert(self, model: Any) -> Any:
+        """INSERT с ON CONFLICT (insert() диалекта)"""
+
+    @abstractmethod
+    def insert_drivers(self, db: Session, values: Sequence[dict[str, Any]]) -> list[int]:
+        """Массовая вставка строк INSERT_COLUMNS (без commit); id в порядке values"""
+
+    @abstractmethod
+    def substring_search(
+        self, columns: Sequence[Any], query: str, exclude: ColumnElement[bool], after: int | None
+    ) -> Select[Any]:
+        """
+        Водители, чей license_number содержит query (без exclude), по возрастанию
+        ключа после after. Ключ - первая колонка выборки (id водителя).
+        """
+
+    @abstractmethod
+    def max_parameters(self) -> int:
+        """Сколько параметров можно связать в одном запросе (длина IN-списка)"""
+
+    @abstractmethod
+    def lock_change_log(self, db: Session) -> None:
+        """
+        Очередь писателей driver_changes до конца транзакции: seq выдаётся в
+        порядке commit, и читатель ленты after=seq не пропускает строку,
+        закоммиченную позже строки с большим seq. Вызывается последним
+        перед commit - после неё транзакция не ждёт других блокировок.
+        """
+
+    def stream(
+        self, db: Session, stmt: Select[Any], batch_size: int
+    ) -> Iterator[Sequence[Row[Any]]]:
+        """Потоковое чтение пакетами по batch_size строк"""
+        result = db.execute(stmt.execution_options(yield_per=batch_size))
+        yield from result.partitions()
+
+
+class SQLiteDriverRepository(DriverRepository):
+    """SQLite: executemany INSERT ... RETURNING, FTS5 trigram для подстроки"""
+
+    def dialect_insert(self, model: Any) -> Any:
+        return sqlite_insert(model)
+
+    def max_parameters(self) -> int:
+        # SQLITE_MAX_VARIABLE_NUMBER по умолчанию: 999 до SQLite 3.32, затем 32766
+        return 32766 if sqlite3.sqlite_version_info >= (3, 32, 0) else 999
+
+    def lock_change_log(self, db: Session) -> None:
+        # Пишущая транзакция SQLite одна на файл и держит блокировку с первой записи до commit
+        pass
+
+    def insert_drivers(self, db: Session, values: Sequence[dict[str, Any]]) -> list[int]:
+        stmt = insert(DriverDB).returning(DriverDB.id, sort_by_parameter_order=True)
+        return list(db.scalars(stmt, list(values)))
+
+    def substring_search(
+        self, columns: Sequence[Any], query: str, exclude: ColumnElement[bool], after: int | None
+    ) -> Select[Any]:
+        # Фраза FTS5: подстрока целиком, кавычки внутри удваиваются
+        phrase = '"' + query.replace('"', '""') + '"'
+        stmt = (
+            select(*columns)
+            .select_from(drivers_search)
+            .join(DriverDB, DriverDB.id == drivers_search.c.rowid)
+            .where(drivers_search.c.license_number.op("MATCH")(phrase), ~exclude)
+            .order_by(drivers_search.c.rowid)
+        )
+        return stmt if after is None else stmt.where(drivers_search.c.rowid > after)
+
+
+class PostgresDriverRepository(DriverRepository):
+    """
+    PostgreSQL: массовая вставка через COPY во временную таблицу и один
+    INSERT ... SELECT, подстрока - ILIKE по GIN-индексу pg_trgm (миграция 0007),
+    потоковое чтение - серверный курсор (yield_per включает stream_results).
+    """
+
+    # Временная таблица живёт в соединении, строки - до конца транзакции
+    STAGING_TABLE = "drivers_staging"
+    # Ключ advisory-блокировки писателей журнала driver_changes
+    CHANGE_LOG_LOCK_KEY = 0x64726976
+
+    def lock_change_log(self, db: Session) -> None:
+        # Снимается на commit/rollback; без неё seq из последовательности выдаётся
+        # при INSERT, и транзакции фиксируются не в порядке seq
+        db.execute(select(func.pg_advisory_xact_lock(self.CHANGE_LOG_LOCK_KEY)))
+
+    def dialect_insert(self, model: Any) -> Any:
+        return postgresql_insert(model)
+
+    def max_parameters(self) -> int:
+        # Число параметров в протоколе - int16
+        return 32767
+
+    def insert_drivers(self, db: Session, values: Sequence[dict[str, Any]]) -> list[int]:
+        db.execute(
+            text(
+                f"CREATE TEMP TABLE IF NOT EXISTS {self.STAGING_TABLE} "
+                "(user_id integer, license_number varchar, years_of_experience integer, "
+                "status varchar) ON COMMIT DELETE ROWS"
+            )
+        )
+        records = [
+            (row["user_id"], row["license_number"], row["years_of_experience"], row["status"].name)
+            for row in values
+        ]
+        self._copy(db, records)
+        # Порядок RETURNING не гарантирован - id сопоставляются по license_number
+        result = db.execute(
+            text(
+                f"INSERT INTO drivers ({', '.join(INSERT_COLUMNS)}) "
+                "SELECT user_id, license_number, years_of_experience, "
+                f"status::driverstatusdb FROM {self.STAGING_TABLE} "
+                "RETURNING license_number, id"
+            )
+        )
+        ids = dict(result.tuples().all())
+        db.execute(text(f"DELETE FROM {self.STAGING_TABLE}"))
+        return [ids[row["license_number"]] for row in values]
+
+    def _copy(self, db: Session, records: list[tuple[Any, ...]]) -> None:
+        """COPY в staging-таблицу средствами драйвера (asyncpg или psycopg)"""
+        driver_connection = db.connection().connection.driver_connection
+        if hasattr(driver_connection, "copy_records_to_table"):
+            # asyncpg: Session работает внутри AsyncSession.run_sync (greenlet)
+            await_only(
+                driver_connection.copy_records_to_table(
+                    self.STAGING_TABLE, records=records, columns=INSERT_COLUMNS
+                )
+            )
+            return
+        with driver_connection.cursor() as cursor:
+            with cursor.copy(
+                f"COPY {self.STAGING_TABLE} ({', '.join(INSERT_COLUMNS)}) FROM STDIN"
+            ) as copy:
+                for record in records:
+                    copy.write_row(record)
+
+    def substring_search(
+        self, columns: Sequence[Any], query: str, exclude: ColumnElement[bool], after: int | None
+    ) -> Select[Any]:
+        escaped = query.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        stmt = (
+            select(*columns)
+            .where(DriverDB.license_number.ilike(f"%{escaped}%", escape="\\"), ~exclude)
+            .order_by(DriverDB.id)
+        )
+        return stmt if after is None else stmt.where(DriverDB.id > after)
+
+
+REPOSITORIES: dict[str, DriverRepository] = {
+    "sqlite": SQLiteDriverRepository(),
+    "postgresql": PostgresDriverRepository(),
+}
+
+
+def get_repository(db: Session) -> DriverRepository:
+    """Реализация для диалекта, к которому привязана сессия"""
+    dialect_name = db.get_bind().dialect.name
+    try:
+        return REPOSITORIES[dialect_name]
+    except KeyError:
+        raise ValueError(f"Unsupported database dialect: {dialect_name}") from None
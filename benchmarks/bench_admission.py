@@ -0,0 +1,109 @@
+"""
+Допуск запросов под перегрузкой: без ограничений vs лимит дорогих и сброс нагрузки.
+
+--clients клиентов листают страницы GET /drivers/, --exporters одновременно
+выгружают таблицу через /drivers/export. Без допуска выгрузки делят воркер и
+БД с дешёвыми запросами и растят их хвост задержки; с допуском лишние выгрузки
+сразу получают 503 (и повторяют позже), а страницы отвечают быстро.
+Запуск: python -m benchmarks.bench_admission --rows 100000 --clients 16 --exporters 8
+"""
+
+import argparse
+import asyncio
+import time
+from collections import Counter
+from collections.abc import Generator
+
+import httpx
+from sqlalchemy.orm import Session
+
+from app.config import Settings
+from app.database.session import get_db
+from app.main import create_app
+from benchmarks.common import BenchDatabase, percentiles, print_table, temp_database
+
+MODES = {
+    "off": {"max_expensive_requests": 0, "max_in_flight_requests": 0},
+    "admission": {"max_expensive_requests": 2, "max_in_flight_requests": 64},
+}
+
+
+async def _pages(
+    client: httpx.AsyncClient, deadline: float, samples: list[float], statuses: Counter[str]
+) -> None:
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        response = await client.get("/drivers/", params={"limit": 50})
+        samples.append(time.perf_counter() - started)
+        statuses[f"page {response.status_code}"] += 1
+
+
+async def _exports(client: httpx.AsyncClient, deadline: float, statuses: Counter[str]) -> None:
+    while time.perf_counter() < deadline:
+        response = await client.get("/drivers/export")
+        statuses[f"export {response.status_code}"] += 1
+        if response.status_code == 503:
+            await asyncio.sleep(0.05)
+
+
+async def run(
+    bench_db: BenchDatabase, clients: int, exporters: int, duration: float
+) -> list[dict[str, object]]:
+    def override_get_db() -> Generator[Session, None, None]:
+        db = bench_db.session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    results = []
+    for mode, limits in MODES.items():
+        app = create_app(
+            Settings(
+                database_url=bench_db.url,
+                db_schema_bootstrap="none",
+                metrics_enabled=False,
+                **limits,
+            )
+        )
+        app.dependency_overrides[get_db] = override_get_db
+        samples: list[float] = []
+        statuses: Counter[str] = Counter()
+        transport = httpx.ASGITransport(app=app)  # type: ignore[arg-type]
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://bench", timeout=None
+        ) as client:
+            deadline = time.perf_counter() + duration
+            await asyncio.gather(
+                *(_pages(client, deadline, samples, statuses) for _ in range(clients)),
+                *(_exports(client, deadline, statuses) for _ in range(exporters)),
+            )
+        results.append(
+            {
+                "mode": mode,
+                "pages/s": len(samples) / duration,
+                **percentiles(samples),
+                "exports": statuses["export 200"],
+                "rejected": statuses["export 503"] + statuses["page 503"],
+            }
+        )
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--exporters", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=10.0)
+    args = parser.parse_args()
+
+    with temp_database(args.rows) as bench_db:
+        results = asyncio.run(run(bench_db, args.clients, args.exporters, args.duration))
+    print_table(
+        f"pages under export load, {args.rows} rows, {args.exporters} exporters (page ms)", results
+    )
+
+
+if __name__ == "__main__":
+    main()
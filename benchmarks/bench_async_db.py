@@ -0,0 +1,129 @@
+"""
+Задержки конкурентных запросов: блокирующий sync-путь vs threadpool vs AsyncSession.
+
+Запуск: python -m benchmarks.bench_async_db --rows 200000 --concurrency 16
+
+Режимы:
+- blocking   - синхронный DriverService прямо в event loop (поведение до async-пути)
+- threadpool - синхронный DriverService в threadpool (AUTOPILOT_DB_ASYNC=0)
+- async      - DriverService.*_async поверх AsyncSession/aiosqlite (AUTOPILOT_DB_ASYNC=1)
+
+Параллельно с тяжёлыми GET /drivers/ зонд засыпает на 5 мс и меряет, насколько
+позже он проснулся (lag event loop), затем опрашивает /health.
+"""
+
+import argparse
+import asyncio
+import time
+from collections.abc import AsyncGenerator, Generator
+from typing import Any
+
+import httpx
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session
+
+from app.api import drivers as drivers_api
+from app.database.session import get_db
+from app.main import app
+from app.services.cache import driver_list_cache
+from benchmarks.common import BenchDatabase, percentiles, print_table, temp_database
+
+MODES = ("blocking", "threadpool", "async")
+
+
+async def _inline(func: Any, *args: Any) -> Any:
+    return func(*args)
+
+
+async def run_mode(
+    mode: str, bench_db: BenchDatabase, concurrency: int, requests: int, skip: int
+) -> dict[str, object]:
+    async_engine = create_async_engine(bench_db.async_url)
+    async_factory = async_sessionmaker(async_engine, expire_on_commit=False)
+
+    def sync_db() -> Generator[Session, None, None]:
+        db = bench_db.session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    async def async_db() -> AsyncGenerator[AsyncSession, None]:
+        async with async_factory() as db:
+            yield db
+
+    app.dependency_overrides[get_db] = async_db if mode == "async" else sync_db
+    original_threadpool = drivers_api.run_in_threadpool
+    if mode == "blocking":
+        drivers_api.run_in_threadpool = _inline  # type: ignore[assignment]
+
+    list_latencies: list[float] = []
+    probe_latencies: list[float] = []
+    loop_lags: list[float] = []
+    done = asyncio.Event()
+
+    transport = httpx.ASGITransport(app=app)  # type: ignore[arg-type]
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+
+        async def worker() -> None:
+            for _ in range(requests):
+                started = time.perf_counter()
+                response = await client.get("/drivers/", params={"skip": skip, "limit": 100})
+                response.raise_for_status()
+                list_latencies.append(time.perf_counter() - started)
+
+        async def probe() -> None:
+            while not done.is_set():
+                started = time.perf_counter()
+                await client.get("/health")
+                probe_latencies.append(time.perf_counter() - started)
+                started = time.perf_counter()
+                await asyncio.sleep(0.005)
+                loop_lags.append(time.perf_counter() - started - 0.005)
+
+        probe_task = asyncio.create_task(probe())
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+        done.set()
+        await probe_task
+
+    drivers_api.run_in_threadpool = original_threadpool  # type: ignore[assignment]
+    app.dependency_overrides.clear()
+    await async_engine.dispose()
+
+    lists = percentiles(list_latencies)
+    probes = percentiles(probe_latencies)
+    lags = percentiles(loop_lags)
+    return {
+        "mode": mode,
+        "rps": len(list_latencies) / elapsed,
+        "list_p50_ms": lists["p50"],
+        "list_p99_ms": lists["p99"],
+        "health_p99_ms": probes["p99"],
+        "loop_lag_p99_ms": lags["p99"],
+        "loop_lag_max_ms": lags["max"],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=10, help="запросов на клиента")
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES))
+    args = parser.parse_args()
+    driver_list_cache.enabled = False  # Меряем запросы к БД, а не попадания в кэш
+
+    with temp_database(args.rows) as bench_db:
+        results = [
+            asyncio.run(
+                run_mode(mode, bench_db, args.concurrency, args.requests, skip=args.rows // 2)
+            )
+            for mode in args.modes
+        ]
+    print_table(f"GET /drivers/ x{args.concurrency} clients, {args.rows} rows", results)
+
+
+if __name__ == "__main__":
+    main()
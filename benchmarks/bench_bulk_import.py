@@ -0,0 +1,84 @@
+"""
+Пропускная способность импорта: N x POST /drivers/ vs POST /drivers/bulk (JSON и NDJSON).
+
+Запуск: python -m benchmarks.bench_bulk_import --rows 5000
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from collections.abc import Generator
+
+import httpx
+from sqlalchemy import delete
+from sqlalchemy.orm import Session
+
+from app.database.session import get_db
+from app.main import app
+from app.models.db.driver import DriverDB
+from benchmarks.common import BenchDatabase, print_table, temp_database
+
+
+def _payload(rows: int) -> list[dict[str, object]]:
+    return [
+        {"user_id": i + 1, "license_number": f"IMP{i:010d}", "years_of_experience": i % 40}
+        for i in range(rows)
+    ]
+
+
+async def run(bench_db: BenchDatabase, rows: int) -> list[dict[str, object]]:
+    def override_get_db() -> Generator[Session, None, None]:
+        db = bench_db.session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    payload = _payload(rows)
+    ndjson = "\n".join(json.dumps(row) for row in payload).encode()
+    results = []
+
+    transport = httpx.ASGITransport(app=app)  # type: ignore[arg-type]
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://bench", timeout=None
+    ) as client:
+        for mode in ("single", "bulk-json", "bulk-ndjson"):
+            with bench_db.engine.begin() as conn:
+                conn.execute(delete(DriverDB))
+
+            started = time.perf_counter()
+            if mode == "single":
+                for row in payload:
+                    response = await client.post("/drivers/", json=row)
+                    assert response.status_code == 201, response.text
+            elif mode == "bulk-json":
+                response = await client.post("/drivers/bulk", json=payload)
+                assert response.json()["created"] == rows
+            else:
+                response = await client.post(
+                    "/drivers/bulk",
+                    content=ndjson,
+                    headers={"Content-Type": "application/x-ndjson"},
+                )
+                assert response.json()["created"] == rows
+            elapsed = time.perf_counter() - started
+            results.append({"mode": mode, "seconds": elapsed, "rows_per_sec": rows / elapsed})
+
+    app.dependency_overrides.clear()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=5000)
+    args = parser.parse_args()
+
+    with temp_database() as bench_db:
+        results = asyncio.run(run(bench_db, args.rows))
+    print_table(f"import of {args.rows} drivers", results)
+
+
+if __name__ == "__main__":
+    main()
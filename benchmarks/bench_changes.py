@@ -0,0 +1,129 @@
+"""
+Обнаружение новых верифицированных водителей: опрос списка vs лента изменений.
+
+"listing" - потребитель на каждом опросе проходит GET /drivers/?status=VERIFIED
+целиком (keyset-страницами) и ищет новые id; "changes" - читает только журнал
+после своего seq. Отдельно - задержка доставки: от commit смены статуса до
+пробуждения ожидающего потребителя (ChangeNotifier, без периодического опроса).
+
+Запуск: python -m benchmarks.bench_changes --rows 100000 --polls 20 --per-poll 10
+"""
+
+import argparse
+import asyncio
+import threading
+import time
+
+from sqlalchemy import select
+
+from app.models.db.driver import DriverDB, DriverStatusDB
+from app.models.domain.driver import DriverStatus
+from app.models.schemas.driver import DriverUpdateRequest
+from app.services.cache import driver_list_cache
+from app.services.change_feed import driver_change_notifier
+from app.services.driver_service import DriverService
+from benchmarks.common import BenchDatabase, percentiles, print_table, temp_database
+
+VERIFY = DriverUpdateRequest(status=DriverStatus.VERIFIED)
+
+
+def _pending_ids(bench_db: BenchDatabase, count: int) -> list[int]:
+    with bench_db.session_factory() as db:
+        stmt = (
+            select(DriverDB.id)
+            .where(DriverDB.status == DriverStatusDB.PENDING, DriverDB.years_of_experience > 0)
+            .limit(count)
+        )
+        return list(db.scalars(stmt))
+
+
+def _verify(bench_db: BenchDatabase, ids: list[int]) -> None:
+    with bench_db.session_factory() as db:
+        for driver_id in ids:
+            DriverService.change_status(db, driver_id, VERIFY)
+
+
+def discovery(
+    bench_db: BenchDatabase, polls: int, per_poll: int, limit: int
+) -> list[dict[str, object]]:
+    pending = _pending_ids(bench_db, polls * per_poll)
+    samples: dict[str, list[float]] = {"listing": [], "changes": []}
+    with bench_db.session_factory() as db:
+        seen = {
+            driver.id
+            for driver in DriverService.get_drivers(db, DriverStatus.VERIFIED, limit=10**9)
+        }
+        seq = 0
+        for poll in range(polls):
+            _verify(bench_db, pending[poll * per_poll : (poll + 1) * per_poll])
+
+            started = time.perf_counter()
+            after_id, found = None, 0
+            while True:
+                page = DriverService.get_driver_rows(
+                    db, DriverStatus.VERIFIED, limit=limit, after_id=after_id
+                )
+                found += sum(1 for row in page if row[0] not in seen)
+                seen.update(row[0] for row in page)
+                if len(page) < limit:
+                    break
+                after_id = page[-1][0]
+            samples["listing"].append(time.perf_counter() - started)
+
+            started = time.perf_counter()
+            changes = DriverService.get_changes(db, seq, DriverStatus.VERIFIED, limit)
+            seq = changes[-1].seq if changes else seq
+            samples["changes"].append(time.perf_counter() - started)
+            assert found == len(changes) == per_poll
+    return [{"mode": mode, **percentiles(values)} for mode, values in samples.items()]
+
+
+async def delivery(bench_db: BenchDatabase, events: int) -> dict[str, object]:
+    ids = _pending_ids(bench_db, events)
+    committed: dict[int, float] = {}
+    latencies: list[float] = []
+
+    def writer() -> None:
+        for driver_id in ids:
+            time.sleep(0.01)
+            _verify(bench_db, [driver_id])
+            committed[driver_id] = time.perf_counter()
+
+    with bench_db.session_factory() as db:
+        seq = DriverService.get_changes(db, 0, None, 10**9)[-1].seq
+        thread = threading.Thread(target=writer)
+        thread.start()
+        while len(latencies) < events:
+            version = driver_change_notifier.version
+            changes = await asyncio.to_thread(DriverService.get_changes, db, seq)
+            received = time.perf_counter()
+            for change in changes:
+                # Время commit записывается после возврата change_status - берём не раньше него
+                while change.driver_id not in committed:
+                    await asyncio.sleep(0)
+                latencies.append(max(received - committed[change.driver_id], 0.0))
+            if changes:
+                seq = changes[-1].seq
+            else:
+                await driver_change_notifier.wait(version, 1.0)
+        thread.join()
+    return {"mode": "notify-wakeup", **percentiles(latencies)}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--polls", type=int, default=20)
+    parser.add_argument("--per-poll", type=int, default=10, help="новых верификаций на опрос")
+    parser.add_argument("--limit", type=int, default=100)
+    args = parser.parse_args()
+    driver_list_cache.enabled = False  # Меряем запросы к БД, а не попадания в кэш
+
+    with temp_database(args.rows) as bench_db:
+        results = discovery(bench_db, args.polls, args.per_poll, args.limit)
+        results.append(asyncio.run(delivery(bench_db, args.polls)))
+    print_table(f"discovering {args.per_poll} new verifications, {args.rows} rows (ms)", results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Создание водителей: SELECT + INSERT + commit + refresh vs один INSERT ... RETURNING.
+
+Каждый поток-клиент работает со своей сессией, как обработчик в threadpool.
+Запуск: python -m benchmarks.bench_create --rows 2000 --threads 4
+"""
+
+import argparse
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy import delete
+from sqlalchemy.orm import Session
+
+from app.models.db.driver import DriverDB, DriverStatusDB
+from app.models.schemas.driver import DriverCreateRequest
+from app.services.cache import driver_list_cache
+from app.services.driver_service import DriverService
+from benchmarks.common import BenchDatabase, print_table, temp_database
+
+
+def legacy_create(db: Session, data: DriverCreateRequest) -> None:
+    """Прежний путь: проверка дубликата, INSERT, commit и повторное чтение строки"""
+    existing = db.query(DriverDB).filter(DriverDB.license_number == data.license_number).first()
+    if existing:
+        raise ValueError("duplicate")
+    driver = DriverDB(
+        user_id=data.user_id,
+        license_number=data.license_number,
+        years_of_experience=data.years_of_experience,
+        status=DriverStatusDB.PENDING,
+    )
+    db.add(driver)
+    db.commit()
+    db.refresh(driver)
+
+
+def _run(
+    bench_db: BenchDatabase,
+    create: Callable[[Session, DriverCreateRequest], object],
+    rows: int,
+    threads: int,
+) -> float:
+    def worker(part: int) -> None:
+        with bench_db.session_factory() as db:
+            for i in range(part, rows, threads):
+                create(
+                    db,
+                    DriverCreateRequest(
+                        user_id=i + 1, license_number=f"NEW{i:010d}", years_of_experience=1
+                    ),
+                )
+
+    with bench_db.engine.begin() as conn:
+        conn.execute(delete(DriverDB))
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(worker, range(threads)))
+    return time.perf_counter() - started
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=2000)
+    parser.add_argument("--threads", type=int, default=4)
+    args = parser.parse_args()
+
+    driver_list_cache.enabled = False
+    results = []
+    with temp_database() as bench_db:
+        for mode, create in (
+            ("select+insert+refresh", legacy_create),
+            ("insert-returning", DriverService.create_driver),
+        ):
+            elapsed = _run(bench_db, create, args.rows, args.threads)
+            results.append(
+                {"mode": mode, "seconds": elapsed, "creates_per_sec": args.rows / elapsed}
+            )
+    print_table(f"{args.rows} creates, {args.threads} threads", results)
+
+
+if __name__ == "__main__":
+    main()
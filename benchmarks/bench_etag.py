@@ -0,0 +1,75 @@
+"""
+Условные GET: полный ответ vs 304 по If-None-Match (GET /drivers/ и GET /drivers/{id}).
+
+304 не читает строки и не сериализует тело: только версия таблицы (max seq
+журнала изменений) или версия строки водителя.
+Запуск: python -m benchmarks.bench_etag --rows 100000 --limit 100 1000 --repeat 50
+"""
+
+import argparse
+import asyncio
+import time
+from collections.abc import Generator
+
+from sqlalchemy.orm import Session
+
+from app.database.session import get_db
+from app.main import app
+from app.services.cache import driver_list_cache
+from benchmarks.common import BenchDatabase, asgi_drain, percentiles, print_table, temp_database
+
+
+async def _measure(
+    path: str, query: str, headers: dict[str, str], repeat: int, expected: int
+) -> list[float]:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        status, _ = await asgi_drain(app, path, query, headers)
+        samples.append(time.perf_counter() - started)
+        assert status == expected, status
+    return samples
+
+
+async def run(bench_db: BenchDatabase, limits: list[int], repeat: int) -> list[dict[str, object]]:
+    def override_get_db() -> Generator[Session, None, None]:
+        db = bench_db.session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    # ETag текущей версии: версия таблицы 0 (журнал пуст), строки - version 1
+    targets = [
+        (f"list limit={limit}", "/drivers/", f"limit={limit}", '"drivers-0"') for limit in limits
+    ]
+    targets.append(("get by id", "/drivers/1", "", '"driver-1-1"'))
+
+    results = []
+    for name, path, query, etag in targets:
+        for mode, headers, expected in (
+            ("200", {}, 200),
+            ("304", {"If-None-Match": etag}, 304),
+        ):
+            stats = percentiles(await _measure(path, query, headers, repeat, expected))
+            results.append({"request": name, "status": mode, **stats})
+    app.dependency_overrides.clear()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--limit", type=int, nargs="+", default=[100, 1000])
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+    driver_list_cache.enabled = False  # Меряем запросы к БД, а не попадания в кэш
+
+    with temp_database(args.rows) as bench_db:
+        results = asyncio.run(run(bench_db, args.limit, args.repeat))
+    print_table(f"conditional GET, {args.rows} rows (ms)", results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Память и скорость выгрузки: GET /drivers/?limit=N vs потоковый GET /drivers/export.
+
+Запуск: python -m benchmarks.bench_export --rows 10000 100000
+"""
+
+import argparse
+import asyncio
+import time
+import tracemalloc
+from collections.abc import Generator
+
+from sqlalchemy.orm import Session
+
+from app.database.session import get_db
+from app.main import app
+from benchmarks.common import BenchDatabase, asgi_drain, print_table, temp_database
+
+
+async def measure(bench_db: BenchDatabase, rows: int, mode: str) -> dict[str, object]:
+    def override_get_db() -> Generator[Session, None, None]:
+        db = bench_db.session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    path, query = {
+        "list": ("/drivers/", f"limit={rows}"),
+        "export-ndjson": ("/drivers/export", ""),
+        "export-csv": ("/drivers/export", "format=csv"),
+    }[mode]
+
+    tracemalloc.start()
+    started = time.perf_counter()
+    status, received = await asgi_drain(app, path, query)
+    assert status == 200, status
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    app.dependency_overrides.clear()
+
+    return {
+        "rows": rows,
+        "mode": mode,
+        "seconds": elapsed,
+        "rows_per_sec": rows / elapsed,
+        "bytes": received,
+        "peak_mem_mb": peak / 2**20,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000])
+    args = parser.parse_args()
+
+    results = []
+    for rows in args.rows:
+        with temp_database(rows) as bench_db:
+            for mode in ("list", "export-ndjson", "export-csv"):
+                results.append(asyncio.run(measure(bench_db, rows, mode)))
+    print_table("full table export", results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Групповой commit POST /drivers/: commit на каждый запрос vs очередь CreateBatcher.
+
+--concurrency клиентов создают водителей без пауз (всплеск регистраций);
+печатаются созданий/с, commit/с и задержка запроса. В режиме group одна
+транзакция (и один fsync) приходится на все запросы, накопленные за max_delay.
+Запуск: python -m benchmarks.bench_group_commit --requests 2000 --concurrency 16 64
+"""
+
+import argparse
+import asyncio
+import itertools
+import time
+from collections.abc import Generator
+
+import httpx
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.database.session import get_db
+from app.main import app
+from app.services.create_batcher import CreateBatcher
+from benchmarks.common import BenchDatabase, percentiles, print_table, temp_database
+
+
+async def _client(
+    client: httpx.AsyncClient, numbers: "itertools.count[int]", total: int, samples: list[float]
+) -> None:
+    while (i := next(numbers)) < total:
+        payload = {"user_id": i + 1, "license_number": f"GRP{i:010d}", "years_of_experience": 3}
+        started = time.perf_counter()
+        response = await client.post("/drivers/", json=payload)
+        samples.append(time.perf_counter() - started)
+        assert response.status_code == 201, response.text
+
+
+async def run(
+    bench_db: BenchDatabase, requests: int, concurrency: list[int], max_delay_ms: float
+) -> list[dict[str, object]]:
+    def override_get_db() -> Generator[Session, None, None]:
+        db = bench_db.session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    commits = 0
+
+    def count_commit(conn: object) -> None:
+        nonlocal commits
+        commits += 1
+
+    app.dependency_overrides[get_db] = override_get_db
+    event.listen(bench_db.engine, "commit", count_commit)
+    results = []
+    transport = httpx.ASGITransport(app=app)  # type: ignore[arg-type]
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for clients, mode in itertools.product(concurrency, ("per-request", "group")):
+            batcher = None
+            if mode == "group":
+                batcher = CreateBatcher(bench_db.session_factory, max_delay=max_delay_ms / 1000)
+                batcher.start()
+            app.state.create_batcher = batcher
+            samples: list[float] = []
+            commits = 0
+            # Каждый прогон - свой диапазон номеров прав
+            offset = len(results) * requests
+            numbers = itertools.count(offset)
+            started = time.perf_counter()
+            await asyncio.gather(
+                *(_client(client, numbers, offset + requests, samples) for _ in range(clients))
+            )
+            elapsed = time.perf_counter() - started
+            if batcher is not None:
+                await batcher.stop()
+            results.append(
+                {
+                    "clients": clients,
+                    "mode": mode,
+                    "creates/s": requests / elapsed,
+                    "commits/s": commits / elapsed,
+                    **percentiles(samples),
+                }
+            )
+    app.state.create_batcher = None
+    event.remove(bench_db.engine, "commit", count_commit)
+    app.dependency_overrides.clear()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[16, 64])
+    parser.add_argument("--max-delay-ms", type=float, default=5.0)
+    args = parser.parse_args()
+
+    with temp_database() as bench_db:
+        results = asyncio.run(run(bench_db, args.requests, args.concurrency, args.max_delay_ms))
+    print_table(f"POST /drivers/ burst, {args.requests} requests (latency ms)", results)
+
+
+if __name__ == "__main__":
+    main()
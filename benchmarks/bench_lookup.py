@@ -0,0 +1,74 @@
+"""
+Точечный поиск: один POST /drivers/lookup на N user_id vs N запросов по одному ключу.
+
+Пакетный запрос - один SELECT ... IN по индексу user_id и один HTTP-ответ;
+N отдельных запросов платят за HTTP, сессию и SELECT на каждый ключ.
+Запуск: python -m benchmarks.bench_lookup --rows 100000 --keys 10 100 1000 --repeat 20
+"""
+
+import argparse
+import asyncio
+import random
+import time
+from collections.abc import Generator
+
+import httpx
+from sqlalchemy.orm import Session
+
+from app.database.session import get_db
+from app.main import app
+from benchmarks.common import BenchDatabase, percentiles, print_table, temp_database
+
+
+async def _batch(client: httpx.AsyncClient, user_ids: list[int]) -> None:
+    response = await client.post("/drivers/lookup", json={"user_ids": user_ids})
+    assert response.status_code == 200, response.text
+
+
+async def _individual(client: httpx.AsyncClient, user_ids: list[int]) -> None:
+    for user_id in user_ids:
+        response = await client.post("/drivers/lookup", json={"user_ids": [user_id]})
+        assert response.status_code == 200, response.text
+
+
+async def run(
+    bench_db: BenchDatabase, rows: int, keys: list[int], repeat: int
+) -> list[dict[str, object]]:
+    def override_get_db() -> Generator[Session, None, None]:
+        db = bench_db.session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    results = []
+    transport = httpx.ASGITransport(app=app)  # type: ignore[arg-type]
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for count in keys:
+            user_ids = random.Random(count).sample(range(1, rows + 1), count)
+            for mode, call in (("batch", _batch), ("individual", _individual)):
+                samples = []
+                for _ in range(repeat):
+                    started = time.perf_counter()
+                    await call(client, user_ids)
+                    samples.append(time.perf_counter() - started)
+                results.append({"keys": count, "mode": mode, **percentiles(samples)})
+    app.dependency_overrides.clear()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--keys", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    with temp_database(args.rows) as bench_db:
+        results = asyncio.run(run(bench_db, args.rows, args.keys, args.repeat))
+    print_table(f"driver lookup, {args.rows} rows, {args.repeat} runs (ms)", results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Представления страницы водителей: время кодирования и байты в ответе.
+
+Запуск: python -m benchmarks.bench_negotiation --rows 1000 100000 --repeat 5
+
+Для каждого формата (JSON, MessagePack, Arrow IPC) - без сжатия, gzip и br
+(уровни из app.api.negotiation). Форматы без установленной зависимости
+пропускаются.
+"""
+
+import argparse
+import time
+from collections.abc import Callable, Sequence
+
+from sqlalchemy import select
+
+from app.api.encoders import DriverRow
+from app.api.negotiation import CONTENT_ENCODINGS, PAGE_FORMATS, compress
+from app.services.driver_service import DRIVER_COLUMNS
+from benchmarks.common import print_table, temp_database
+
+
+def best_of(repeat: int, func: Callable[[], bytes]) -> tuple[float, bytes]:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        body = func()
+        timings.append(time.perf_counter() - started)
+    return min(timings), body
+
+
+def measure(rows: Sequence[DriverRow], repeat: int) -> list[dict[str, object]]:
+    results: list[dict[str, object]] = []
+    for page_format in PAGE_FORMATS:
+        encode_s, body = best_of(repeat, lambda fmt=page_format: fmt.encode(rows))
+        results.append(
+            {
+                "rows": len(rows),
+                "format": page_format.name,
+                "encoding": "identity",
+                "encode_ms": encode_s * 1000,
+                "bytes": len(body),
+            }
+        )
+        for encoding in CONTENT_ENCODINGS:
+            compress_s, compressed = best_of(
+                repeat, lambda body=body, encoding=encoding: compress(body, encoding)
+            )
+            results.append(
+                {
+                    "rows": len(rows),
+                    "format": page_format.name,
+                    "encoding": encoding,
+                    "encode_ms": (encode_s + compress_s) * 1000,
+                    "bytes": len(compressed),
+                }
+            )
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, nargs="+", default=[1000, 100_000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    results = []
+    with temp_database(max(args.rows)) as bench_db, bench_db.session_factory() as db:
+        for count in args.rows:
+            rows = db.execute(select(*DRIVER_COLUMNS).limit(count)).all()
+            results.extend(measure(rows, args.repeat))
+    print_table("page representations", results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Задержка глубокой страницы: OFFSET (skip/limit) vs keyset-курсор (after).
+
+Запуск: python -m benchmarks.bench_pagination --rows 1000000 --page 1000
+"""
+
+import argparse
+import time
+
+from app.models.domain.driver import DriverStatus
+from app.services.cache import driver_list_cache
+from app.services.driver_service import DriverService
+from benchmarks.common import percentiles, print_table, temp_database
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--page", type=int, default=1000, help="номер страницы (с 1)")
+    parser.add_argument("--limit", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    driver_list_cache.enabled = False  # Меряем запросы к БД, а не попадания в кэш
+
+    results = []
+    with temp_database(args.rows) as bench_db:
+        for status in (None, DriverStatus.VERIFIED):
+            # Курсор страницы N - id последней строки страницы N-1 (получаем заранее)
+            with bench_db.session_factory() as db:
+                previous = DriverService.get_drivers(
+                    db, status, skip=(args.page - 1) * args.limit - 1, limit=1
+                )
+            after_id = previous[0].id
+
+            for mode in ("offset", "keyset"):
+                samples = []
+                for _ in range(args.repeat):
+                    with bench_db.session_factory() as db:
+                        started = time.perf_counter()
+                        if mode == "offset":
+                            page = DriverService.get_drivers(
+                                db, status, skip=(args.page - 1) * args.limit, limit=args.limit
+                            )
+                        else:
+                            page = DriverService.get_drivers(
+                                db, status, limit=args.limit, after_id=after_id
+                            )
+                        samples.append(time.perf_counter() - started)
+                stats = percentiles(samples)
+                results.append(
+                    {
+                        "mode": mode,
+                        "status": status.value if status else "-",
+                        "first_id": page[0].id,
+                        "p50_ms": stats["p50"],
+                        "p95_ms": stats["p95"],
+                    }
+                )
+
+    print_table(f"page {args.page} x {args.limit}, {args.rows} rows", results)
+
+
+if __name__ == "__main__":
+    main()
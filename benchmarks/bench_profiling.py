@@ -0,0 +1,91 @@
+"""
+Цена профилирования: GET /drivers/ без профилирования, с включённым, но не
+выбранным запросом, и с профилем каждого запроса (X-Profile: 1).
+
+В конце печатается разбивка одного профилированного запроса (Server-Timing).
+Запуск: python -m benchmarks.bench_profiling --rows 100000 --limit 100 --requests 2000
+"""
+
+import argparse
+import asyncio
+import logging
+import time
+from collections.abc import Generator
+
+import httpx
+from sqlalchemy.orm import Session
+
+from app.api.pagination import encode_cursor
+from app.config import Settings
+from app.database.engine import install_query_profiling
+from app.database.session import get_db
+from app.main import create_app
+from app.services.cache import driver_list_cache
+from benchmarks.common import BenchDatabase, percentiles, print_table, temp_database
+
+MODES = {
+    "off": ({}, {}),
+    "enabled": ({"profile_header_enabled": True}, {}),
+    "profiled": ({"profile_header_enabled": True}, {"X-Profile": "1"}),
+}
+
+
+async def run(
+    bench_db: BenchDatabase, rows: int, limit: int, requests: int
+) -> tuple[list[dict[str, object]], str]:
+    def override_get_db() -> Generator[Session, None, None]:
+        db = bench_db.session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    # Как create_db_engine при включённом профилировании; без профиля хуки почти бесплатны
+    install_query_profiling(bench_db.engine, 0)
+    # Профили пишутся в лог: форматирование JSON входит в цену, вывод - нет
+    logging.getLogger("app.api.profiling").setLevel(logging.INFO)
+    logging.getLogger("app.api.profiling").propagate = False
+
+    results = []
+    server_timing = ""
+    for mode, (overrides, headers) in MODES.items():
+        app = create_app(
+            Settings(
+                database_url=bench_db.url,
+                db_schema_bootstrap="none",
+                metrics_enabled=False,
+                **overrides,
+            )
+        )
+        app.dependency_overrides[get_db] = override_get_db
+        samples = []
+        transport = httpx.ASGITransport(app=app)  # type: ignore[arg-type]
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            for i in range(requests):
+                # Каждая страница читается из БД, а не из кэша списков
+                driver_list_cache.clear()
+                params = {"limit": limit, "after": encode_cursor(i * limit % rows)}
+                started = time.perf_counter()
+                response = await client.get("/drivers/", params=params, headers=headers)
+                samples.append(time.perf_counter() - started)
+                assert response.status_code == 200, response.text
+                server_timing = response.headers.get("Server-Timing", server_timing)
+        results.append({"mode": mode, **percentiles(samples)})
+    return results, server_timing
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--limit", type=int, default=100)
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args()
+
+    with temp_database(args.rows) as bench_db:
+        results, server_timing = asyncio.run(run(bench_db, args.rows, args.limit, args.requests))
+    print_table(f"GET /drivers/?limit={args.limit}, {args.requests} requests (ms)", results)
+    print(f"Server-Timing: {server_timing}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Смешанная нагрузка чтение/запись: все запросы в основной пул vs чтения в пул чтения.
+
+--writers клиентов создают водителей (POST /drivers/), --readers листают
+страницы GET /drivers/ со случайным курсором; кэш списков выключен, чтобы
+каждое чтение шло в БД. Пул чтения - тот же файл SQLite в WAL с отдельными
+соединениями: записи не занимают соединения читателей, и наоборот.
+Запуск: python -m benchmarks.bench_read_replica --rows 100000 --writers 4 --readers 16
+"""
+
+import argparse
+import asyncio
+import itertools
+import random
+import time
+
+import httpx
+
+from app.api.pagination import encode_cursor
+from app.config import Settings
+from app.database.session import dispose_engines, init_engines
+from app.main import create_app
+from app.services.cache import driver_list_cache
+from benchmarks.common import BenchDatabase, percentiles, print_table, temp_database
+
+
+async def _writer(
+    client: httpx.AsyncClient,
+    numbers: "itertools.count[int]",
+    deadline: float,
+    samples: list[float],
+) -> None:
+    while time.perf_counter() < deadline:
+        i = next(numbers)
+        payload = {"user_id": i, "license_number": f"RW{i:010d}", "years_of_experience": 3}
+        started = time.perf_counter()
+        response = await client.post("/drivers/", json=payload, headers={"X-API-Key": "writer"})
+        samples.append(time.perf_counter() - started)
+        assert response.status_code == 201, response.text
+
+
+async def _reader(
+    client: httpx.AsyncClient, rows: int, seed: int, deadline: float, samples: list[float]
+) -> None:
+    rng = random.Random(seed)
+    while time.perf_counter() < deadline:
+        params = {"limit": 50, "after": encode_cursor(rng.randrange(rows))}
+        started = time.perf_counter()
+        response = await client.get("/drivers/", params=params, headers={"X-API-Key": "reader"})
+        samples.append(time.perf_counter() - started)
+        assert response.status_code == 200, response.text
+
+
+async def run(
+    bench_db: BenchDatabase, rows: int, writers: int, readers: int, duration: float
+) -> list[dict[str, object]]:
+    results = []
+    numbers = itertools.count(rows + 1)
+    for mode, read_url in (("primary", None), ("read pool", bench_db.url)):
+        settings = Settings(
+            database_url=bench_db.url,
+            read_database_url=read_url,
+            db_profile="production",
+            db_schema_bootstrap="none",
+            metrics_enabled=False,
+            api_keys="writer,reader",
+        )
+        init_engines(settings)
+        app = create_app(settings)
+        reads: list[float] = []
+        writes: list[float] = []
+        transport = httpx.ASGITransport(app=app)  # type: ignore[arg-type]
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            deadline = time.perf_counter() + duration
+            await asyncio.gather(
+                *(_writer(client, numbers, deadline, writes) for _ in range(writers)),
+                *(_reader(client, rows, seed, deadline, reads) for seed in range(readers)),
+            )
+        await dispose_engines()
+        for kind, samples in (("read", reads), ("write", writes)):
+            results.append(
+                {
+                    "mode": mode,
+                    "kind": kind,
+                    "req/s": len(samples) / duration,
+                    **percentiles(samples),
+                }
+            )
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--readers", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=10.0)
+    args = parser.parse_args()
+
+    driver_list_cache.enabled = False
+    with temp_database(args.rows) as bench_db:
+        results = asyncio.run(run(bench_db, args.rows, args.writers, args.readers, args.duration))
+    print_table(
+        f"mixed load, {args.writers} writers / {args.readers} readers (latency ms)", results
+    )
+
+
+if __name__ == "__main__":
+    main()
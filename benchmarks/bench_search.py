@@ -0,0 +1,72 @@
+"""
+Поиск по номеру прав: ранжированный поиск (индекс + FTS5 trigram) vs LIKE '%q%'.
+
+LIKE с ведущим % читает всю таблицу на каждый запрос; search_drivers читает
+только страницу из индексов. Номера в тестовой БД - LIC0000000000..LIC{rows}.
+Запуск: python -m benchmarks.bench_search --rows 1000000 --repeat 50
+"""
+
+import argparse
+import time
+from collections.abc import Callable
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.models.db.driver import DriverDB
+from app.services.driver_service import DRIVER_COLUMNS, DriverService
+from benchmarks.common import percentiles, print_table, temp_database
+
+
+def like_search(db: Session, query: str, limit: int) -> list[object]:
+    """Наивный поиск подстроки без ранжирования"""
+    stmt = (
+        select(*DRIVER_COLUMNS)
+        .where(DriverDB.license_number.like(f"%{query}%"))
+        .order_by(DriverDB.id)
+        .limit(limit)
+    )
+    return list(db.execute(stmt).all())
+
+
+def ranked_search(db: Session, query: str, limit: int) -> list[object]:
+    return list(DriverService.search_drivers(db, query, limit)[0])
+
+
+def _measure(
+    search: Callable[[Session, str, int], object], db: Session, query: str, limit: int, repeat: int
+) -> list[float]:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        search(db, query, limit)
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--limit", type=int, default=20)
+    args = parser.parse_args()
+
+    middle = args.rows // 2
+    queries = {
+        "exact": f"LIC{middle:010d}",
+        "prefix": f"LIC{middle:010d}"[:-3],
+        "substring": f"{middle:010d}"[-6:],
+        "miss": "ZZZZZ",
+    }
+    results = []
+    with temp_database(args.rows) as bench_db:
+        with bench_db.session_factory() as db:
+            for kind, query in queries.items():
+                for mode, search in (("search_drivers", ranked_search), ("like", like_search)):
+                    stats = percentiles(_measure(search, db, query, args.limit, args.repeat))
+                    results.append({"query": kind, "mode": mode, **stats})
+    print_table(f"search, {args.rows} rows, limit {args.limit} (ms)", results)
+
+
+if __name__ == "__main__":
+    main()
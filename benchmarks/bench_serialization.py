@@ -0,0 +1,91 @@
+"""
+Стоимость строки на пути чтения списка для страницы из N строк.
+
+Запуск: python -m benchmarks.bench_serialization --rows 10000
+
+- orm+pydantic - прежний путь: DriverDB -> Driver (_db_to_domain) -> DriverResponse
+                 -> валидация response_model -> JSON
+- rows+to_json - быстрый путь: кортежи DRIVER_COLUMNS -> encode_json_array
+"""
+
+import argparse
+import time
+from collections.abc import Callable
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+from pydantic_core import to_json
+
+from app.api.encoders import encode_json_array
+from app.models.db.driver import DriverDB
+from app.models.schemas.driver import DriverResponse
+from app.services.driver_service import DRIVER_COLUMNS, DriverService
+from benchmarks.common import print_table, temp_database
+
+RESPONSE_ADAPTER = TypeAdapter(list[DriverResponse])
+
+
+def legacy_path(db_drivers: list[DriverDB]) -> bytes:
+    drivers = [DriverService._db_to_domain(driver) for driver in db_drivers]
+    responses = [
+        DriverResponse(
+            id=driver.id if driver.id is not None else 0,
+            user_id=driver.user_id,
+            license_number=driver.license_number,
+            years_of_experience=driver.years_of_experience,
+            status=driver.status,
+        )
+        for driver in drivers
+    ]
+    # FastAPI: повторная валидация по response_model + jsonable_encoder
+    validated = RESPONSE_ADAPTER.validate_python([response.model_dump() for response in responses])
+    return to_json(jsonable_encoder(validated))
+
+
+def best_of(repeat: int, func: Callable[[], object]) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    results = []
+    with temp_database(args.rows) as bench_db, bench_db.session_factory() as db:
+        cases: list[tuple[str, Callable[[], object], Callable[[], object]]] = [
+            (
+                "orm+pydantic",
+                lambda: db.query(DriverDB).order_by(DriverDB.id).all(),
+                lambda: legacy_path(db.query(DriverDB).order_by(DriverDB.id).all()),
+            ),
+            (
+                "rows+to_json",
+                lambda: db.query(*DRIVER_COLUMNS).order_by(DriverDB.id).all(),
+                lambda: encode_json_array(db.query(*DRIVER_COLUMNS).order_by(DriverDB.id).all()),
+            ),
+        ]
+        for name, fetch, full in cases:
+            db.expunge_all()
+            fetch_time = best_of(args.repeat, fetch)
+            total_time = best_of(args.repeat, full)
+            results.append(
+                {
+                    "path": name,
+                    "fetch_ms": fetch_time * 1000,
+                    "total_ms": total_time * 1000,
+                    "us_per_row": total_time / args.rows * 1e6,
+                }
+            )
+
+    print_table(f"page of {args.rows} rows", results)
+
+
+if __name__ == "__main__":
+    main()
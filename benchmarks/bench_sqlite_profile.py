@@ -0,0 +1,101 @@
+"""
+Конкурентные чтения/записи: профиль SQLite default (rollback journal) vs production (WAL).
+
+Запуск: python -m benchmarks.bench_sqlite_profile --rows 100000 --readers 4 --writers 2
+"""
+
+import argparse
+import itertools
+import threading
+import time
+
+from sqlalchemy.orm import sessionmaker
+
+from app.config import Settings
+from app.database.engine import create_db_engine
+from app.models.schemas.driver import DriverCreateRequest
+from app.services.cache import driver_list_cache
+from app.services.driver_service import DriverService
+from benchmarks.common import print_table, temp_database
+
+
+def run_profile(
+    profile: str, url: str, readers: int, writers: int, seconds: float
+) -> dict[str, object]:
+    engine = create_db_engine(
+        Settings(database_url=url, db_profile=profile, db_pool_size=readers + writers)
+    )
+    session_factory = sessionmaker(bind=engine, autoflush=False)
+    counters = {"reads": 0, "writes": 0, "errors": 0}
+    lock = threading.Lock()
+    stop = threading.Event()
+    sequence = itertools.count()
+
+    def reader() -> None:
+        while not stop.is_set():
+            with session_factory() as db:
+                try:
+                    DriverService.get_driver_rows(db, limit=100, after_id=next(sequence) % 1000)
+                    key = "reads"
+                except Exception:
+                    key = "errors"
+            with lock:
+                counters[key] += 1
+
+    def writer() -> None:
+        while not stop.is_set():
+            n = next(sequence)
+            with session_factory() as db:
+                try:
+                    DriverService.create_driver(
+                        db,
+                        DriverCreateRequest(
+                            user_id=n + 1,
+                            license_number=f"{profile[:4].upper()}{n:010d}",
+                            years_of_experience=1,
+                        ),
+                    )
+                    key = "writes"
+                except Exception:
+                    key = "errors"
+            with lock:
+                counters[key] += 1
+
+    threads = [threading.Thread(target=reader) for _ in range(readers)]
+    threads += [threading.Thread(target=writer) for _ in range(writers)]
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    engine.dispose()
+
+    return {
+        "profile": profile,
+        "reads_per_sec": counters["reads"] / seconds,
+        "writes_per_sec": counters["writes"] / seconds,
+        "errors": counters["errors"],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--writers", type=int, default=2)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    args = parser.parse_args()
+    driver_list_cache.enabled = False
+
+    results = []
+    for profile in ("default", "production"):
+        with temp_database(args.rows) as bench_db:
+            results.append(
+                run_profile(profile, bench_db.url, args.readers, args.writers, args.seconds)
+            )
+    print_table(f"{args.readers} readers + {args.writers} writers", results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Холодный старт: импорт app.main, create_app(), TestClient и готовность воркера uvicorn.
+
+Каждый замер - в новом процессе интерпретатора (без прогретых модулей).
+Цель: create_app() + lifespan (TestClient) < 0.5 с, воркер uvicorn отвечает на
+/health < 2 с. Время импорта в основном занимают fastapi и sqlalchemy.
+
+Запуск: python -m benchmarks.bench_startup --runs 5
+"""
+
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from pathlib import Path
+
+from benchmarks.common import percentiles, print_table
+
+# Выполняется в дочернем процессе; печатает JSON с временами этапов
+PROBE = """
+import json, time
+started = time.perf_counter()
+import app.main
+imported = time.perf_counter()
+application = app.main.create_app()
+created = time.perf_counter()
+from fastapi.testclient import TestClient
+with TestClient(application) as client:
+    client.get("/health")
+ready = time.perf_counter()
+print(json.dumps({
+    "import_s": imported - started,
+    "create_app_s": created - imported,
+    "testclient_s": ready - created,
+}))
+"""
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return int(sock.getsockname()[1])
+
+
+def uvicorn_boot(env: dict[str, str], timeout: float = 30.0) -> float:
+    """Секунды от запуска процесса uvicorn до первого ответа /health"""
+    port = _free_port()
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:create_app", "--factory", "--port", str(port)],
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        while time.perf_counter() - started < timeout:
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/health", timeout=1):
+                    return time.perf_counter() - started
+            except OSError:
+                time.sleep(0.01)
+        raise TimeoutError("uvicorn did not become ready")
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    samples: dict[str, list[float]] = {}
+    with tempfile.TemporaryDirectory(prefix="autopilot-bench-") as tmp:
+        env = {**os.environ, "AUTOPILOT_DATABASE_URL": f"sqlite:///{Path(tmp) / 'startup.db'}"}
+        for _ in range(args.runs):
+            probe = subprocess.run(
+                [sys.executable, "-c", PROBE], env=env, capture_output=True, text=True, check=True
+            )
+            for stage, seconds in json.loads(probe.stdout).items():
+                samples.setdefault(stage, []).append(seconds)
+            samples.setdefault("uvicorn_ready_s", []).append(uvicorn_boot(env))
+
+    print_table(
+        f"cold start, {args.runs} runs (ms)",
+        [{"stage": stage, **percentiles(values)} for stage, values in samples.items()],
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""
+Статистика водителей: счётчики driver_stats vs GROUP BY по drivers.
+
+Чтение счётчиков не зависит от числа строк; GROUP BY (и сверка
+reconcile_stats, которая его выполняет) проходит всю таблицу.
+Запуск: python -m benchmarks.bench_stats --rows 1000000 --repeat 20
+"""
+
+import argparse
+import time
+from collections.abc import Callable
+
+from sqlalchemy.orm import Session
+
+from app.services.driver_service import DriverService
+from app.services.driver_stats import actual_counts_query
+from benchmarks.common import percentiles, print_table, temp_database
+
+
+def group_by_stats(db: Session) -> object:
+    return db.execute(actual_counts_query()).all()
+
+
+def _measure(call: Callable[[Session], object], db: Session, repeat: int) -> list[float]:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        call(db)
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 1_000_000])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    results = []
+    for rows in args.rows:
+        with temp_database(rows) as bench_db, bench_db.session_factory() as db:
+            # seed_drivers пишет в drivers напрямую - счётчики строит первая сверка
+            DriverService.reconcile_stats(db)
+            for mode, call in (
+                ("counters", DriverService.get_stats),
+                ("group-by", group_by_stats),
+                ("reconcile", DriverService.reconcile_stats),
+            ):
+                stats = percentiles(_measure(call, db, args.repeat))
+                results.append({"rows": rows, "mode": mode, **stats})
+    print_table(f"driver stats, {args.repeat} runs (ms)", results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Хранилища: SQLite vs PostgreSQL на массовом импорте и конкурентном создании.
+
+Импорт - bulk_create_drivers (SQLite: executemany INSERT, PostgreSQL: COPY),
+создание - create_driver из --writers потоков (SQLite: один писатель за раз).
+PostgreSQL - --postgres-url (postgresql+psycopg://...) или локальный pgserver.
+Запуск: python -m benchmarks.bench_storage --rows 100000 --writers 1 4 8
+"""
+
+import argparse
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+from pathlib import Path
+
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import sessionmaker
+
+from app.config import Settings
+from app.database.engine import create_db_engine
+from app.database.session import Base
+from app.models.schemas.driver import DriverCreateRequest
+from app.services.driver_service import DriverService
+from benchmarks.common import print_table
+
+
+def _request(prefix: str, i: int) -> DriverCreateRequest:
+    return DriverCreateRequest(
+        user_id=i + 1, license_number=f"{prefix}{i:010d}", years_of_experience=i % 40
+    )
+
+
+def bench_backend(url: str, rows: int, writers: list[int], creates: int) -> list[dict[str, object]]:
+    engine = create_db_engine(Settings(database_url=url, db_profile="production", db_pool_size=16))
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    session_factory = sessionmaker(bind=engine, autoflush=False)
+    backend = make_url(url).get_backend_name()
+    results: list[dict[str, object]] = []
+    try:
+        with session_factory() as db:
+            started = time.perf_counter()
+            DriverService.bulk_create_drivers(db, [_request("BULK", i) for i in range(rows)])
+            elapsed = time.perf_counter() - started
+        results.append({"backend": backend, "scenario": "bulk", "rows/s": rows / elapsed})
+
+        for threads in writers:
+
+            def create(i: int, prefix: str = f"W{threads}-") -> None:
+                with session_factory() as db:
+                    DriverService.create_driver(db, _request(prefix, i))
+
+            with ThreadPoolExecutor(threads) as pool:
+                started = time.perf_counter()
+                list(pool.map(create, range(creates)))
+                elapsed = time.perf_counter() - started
+            results.append(
+                {"backend": backend, "scenario": f"create x{threads}", "rows/s": creates / elapsed}
+            )
+    finally:
+        Base.metadata.drop_all(engine)
+        engine.dispose()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--writers", type=int, nargs="+", default=[1, 4, 8])
+    parser.add_argument("--creates", type=int, default=2000)
+    parser.add_argument("--postgres-url", default=None)
+    args = parser.parse_args()
+
+    with ExitStack() as stack:
+        tmp = Path(stack.enter_context(tempfile.TemporaryDirectory(prefix="autopilot-bench-")))
+        urls = [f"sqlite:///{tmp / 'bench.db'}"]
+        postgres_url = args.postgres_url
+        if postgres_url is None:
+            try:
+                import pgserver
+            except ImportError:
+                print("pgserver is not installed and --postgres-url is not set: SQLite only")
+            else:
+                server = pgserver.get_server(tmp / "pgdata", cleanup_mode="stop")
+                stack.callback(server.cleanup)
+                postgres_url = (
+                    make_url(server.get_uri())
+                    .set(drivername="postgresql+psycopg")
+                    .render_as_string(hide_password=False)
+                )
+        if postgres_url is not None:
+            urls.append(postgres_url)
+
+        results = []
+        for url in urls:
+            results.extend(bench_backend(url, args.rows, args.writers, args.creates))
+    print_table(f"storage backends, {args.rows} rows bulk, {args.creates} creates", results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""
+Масштабирование по числу воркеров: run_app с AUTOPILOT_WORKERS=1,2,4 под HTTP-нагрузкой.
+
+Сервер - настоящий uvicorn по TCP (python -m app.main), клиенты - отдельные
+процессы, чтобы генератор нагрузки не упирался в одно ядро вместе с сервером.
+Смысл имеет на многоядерной машине: воркеров не больше, чем ядер.
+
+Запуск: python -m benchmarks.bench_workers --rows 100000 --workers 1 2 4 --duration 10
+"""
+
+import argparse
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+from concurrent.futures import ProcessPoolExecutor
+
+import httpx
+
+from benchmarks.common import percentiles, print_table, temp_database
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return int(sock.getsockname()[1])
+
+
+def _wait_ready(port: int, timeout: float = 60.0) -> None:
+    started = time.perf_counter()
+    while time.perf_counter() - started < timeout:
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/health", timeout=1):
+                return
+        except OSError:
+            time.sleep(0.05)
+    raise TimeoutError("server did not become ready")
+
+
+async def _client_load(
+    base_url: str, scenario: str, connections: int, duration: float, client_id: str
+) -> list[float]:
+    latencies: list[float] = []
+    deadline = time.perf_counter() + duration
+    limits = httpx.Limits(max_connections=connections)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30) as client:
+
+        async def connection(index: int) -> None:
+            number = 0
+            while time.perf_counter() < deadline:
+                started = time.perf_counter()
+                if scenario == "create":
+                    number += 1
+                    license_number = f"{client_id}{index:03d}{number:07d}"
+                    response = await client.post(
+                        "/drivers/",
+                        json={
+                            "user_id": 1,
+                            "license_number": license_number,
+                            "years_of_experience": 1,
+                        },
+                    )
+                else:
+                    response = await client.get("/drivers/", params={"limit": 100})
+                response.raise_for_status()
+                latencies.append(time.perf_counter() - started)
+
+        await asyncio.gather(*(connection(i) for i in range(connections)))
+    return latencies
+
+
+def _client_process(args: tuple[str, str, int, float, str]) -> list[float]:
+    return asyncio.run(_client_load(*args))
+
+
+def run_workers(
+    db_url: str, workers: int, scenario: str, clients: int, connections: int, duration: float
+) -> dict[str, object]:
+    port = _free_port()
+    env = {
+        **os.environ,
+        "AUTOPILOT_DATABASE_URL": db_url,
+        "AUTOPILOT_WORKERS": str(workers),
+        "AUTOPILOT_HOST": "127.0.0.1",
+        "AUTOPILOT_PORT": str(port),
+        "AUTOPILOT_CACHE_ENABLED": "0",
+        "AUTOPILOT_DB_PROFILE": "production",
+    }
+    server = subprocess.Popen(
+        [sys.executable, "-m", "app.main"],
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        _wait_ready(port)
+        jobs = [
+            # Номера прав уникальны между прогонами на одной БД
+            (f"http://127.0.0.1:{port}", scenario, connections, duration, f"W{workers}C{i}")
+            for i in range(clients)
+        ]
+        started = time.perf_counter()
+        with ProcessPoolExecutor(max_workers=clients) as pool:
+            latencies = [value for chunk in pool.map(_client_process, jobs) for value in chunk]
+        elapsed = time.perf_counter() - started
+    finally:
+        server.terminate()  # SIGTERM: uvicorn дожидается незавершённых запросов
+        server.wait()
+
+    stats = percentiles(latencies)
+    return {
+        "workers": workers,
+        "scenario": scenario,
+        "requests": len(latencies),
+        "rps": len(latencies) / elapsed,
+        "p50_ms": stats["p50"],
+        "p99_ms": stats["p99"],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--scenarios", nargs="+", choices=("list", "create"), default=["list"])
+    parser.add_argument("--clients", type=int, default=2, help="процессов-клиентов")
+    parser.add_argument("--connections", type=int, default=16, help="соединений на клиента")
+    parser.add_argument("--duration", type=float, default=10.0, help="секунд на прогон")
+    args = parser.parse_args()
+
+    results = []
+    with temp_database(args.rows) as bench_db:
+        for scenario in args.scenarios:
+            for workers in args.workers:
+                results.append(
+                    run_workers(
+                        bench_db.url,
+                        workers,
+                        scenario,
+                        args.clients,
+                        args.connections,
+                        args.duration,
+                    )
+                )
+    print_table(f"uvicorn workers, {os.cpu_count()} CPUs, {args.rows} rows", results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""Общие утилиты бенчмарков: временная БД, наполнение данными, перцентили"""
+
+import asyncio
+import statistics
+import tempfile
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+
+from sqlalchemy import Engine, create_engine, insert
+from sqlalchemy.orm import Session, sessionmaker
+from starlette.types import ASGIApp, Message
+
+from app.database.session import Base
+from app.models.db.driver import DriverDB, DriverStatusDB
+
+STATUSES = list(DriverStatusDB)
+
+
+@dataclass
+class BenchDatabase:
+    path: Path
+    engine: Engine
+    session_factory: sessionmaker[Session]
+
+    @property
+    def url(self) -> str:
+        return f"sqlite:///{self.path}"
+
+    @property
+    def async_url(self) -> str:
+        return f"sqlite+aiosqlite:///{self.path}"
+
+
+@contextmanager
+def temp_database(rows: int = 0) -> Iterator[BenchDatabase]:
+    """Временная SQLite БД со схемой drivers и rows сгенерированными водителями"""
+    with tempfile.TemporaryDirectory(prefix="autopilot-bench-") as tmp:
+        path = Path(tmp) / "bench.db"
+        engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+        Base.metadata.create_all(bind=engine)
+        seed_drivers(engine, rows)
+        try:
+            yield BenchDatabase(path, engine, sessionmaker(bind=engine, autoflush=False))
+        finally:
+            engine.dispose()
+
+
+def seed_drivers(engine: Engine, rows: int, start: int = 0, batch: int = 50_000) -> None:
+    """Быстрое наполнение таблицы drivers пакетными INSERT"""
+    with engine.begin() as conn:
+        for offset in range(start, start + rows, batch):
+            conn.execute(
+                insert(DriverDB),
+                [
+                    {
+                        "user_id": i + 1,
+                        "license_number": f"LIC{i:010d}",
+                        "years_of_experience": i % 40,
+                        "status": STATUSES[i % len(STATUSES)],
+                    }
+                    for i in range(offset, min(offset + batch, start + rows))
+                ],
+            )
+
+
+async def asgi_drain(
+    app: ASGIApp, path: str, query: str = "", headers: dict[str, str] | None = None
+) -> tuple[int, int]:
+    """
+    GET-запрос напрямую в ASGI-приложение без буферизации тела.
+
+    Возвращает (status, число байт тела). В отличие от httpx.ASGITransport
+    тело не накапливается, поэтому пиковая память отражает только сервер.
+    """
+    status = 0
+    received = 0
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": query.encode(),
+        "headers": [
+            (b"host", b"bench"),
+            *((name.lower().encode(), value.encode()) for name, value in (headers or {}).items()),
+        ],
+        "client": ("127.0.0.1", 0),
+        "server": ("bench", 80),
+    }
+
+    request_sent = False
+
+    async def receive() -> Message:
+        nonlocal request_sent
+        if request_sent:
+            await asyncio.Event().wait()  # Клиент "не отключается", пока ответ не отдан
+        request_sent = True
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message: Message) -> None:
+        nonlocal status, received
+        if message["type"] == "http.response.start":
+            status = message["status"]
+        elif message["type"] == "http.response.body":
+            received += len(message.get("body", b""))
+
+    await app(scope, receive, send)
+    return status, received
+
+
+def percentiles(samples: list[float]) -> dict[str, float]:
+    """p50/p95/p99/max в миллисекундах"""
+    if not samples:
+        return {"p50": 0.0, "p95": 0.0, "p99": 0.0, "max": 0.0}
+    ordered = sorted(samples)
+    cuts = statistics.quantiles(ordered, n=100, method="inclusive") if len(ordered) > 1 else []
+
+    def pick(q: int) -> float:
+        return (cuts[q - 1] if cuts else ordered[0]) * 1000
+
+    return {"p50": pick(50), "p95": pick(95), "p99": pick(99), "max": ordered[-1] * 1000}
+
+
+def print_table(title: str, rows: list[dict[str, object]]) -> None:
+    """Печать результатов в виде простой таблицы"""
+    print(f"\n== {title}")
+    if not rows:
+        return
+    headers = list(rows[0])
+    widths = [max(len(h), *(len(_fmt(r[h])) for r in rows)) for h in headers]
+    print("  ".join(h.ljust(w) for h, w in zip(headers, widths, strict=True)))
+    for row in rows:
+        print("  ".join(_fmt(row[h]).ljust(w) for h, w in zip(headers, widths, strict=True)))
+
+
+def _fmt(value: object) -> str:
+    return f"{value:.2f}" if isinstance(value, float) else str(value)
@@ -0,0 +1,174 @@
+"""
+Генератор нагрузки внутри процесса: concurrency клиентов шлют запросы прямо
+в ASGI-приложение (httpx.ASGITransport), без сети и отдельного сервера.
+
+Сценарии:
+- create - POST /drivers/ с уникальными номерами прав
+- list   - GET /drivers/ страницами по курсору, фильтр status у каждого третьего клиента
+
+Запуск отдельно: python -m benchmarks.load --rows 100000 --scenario list --concurrency 8
+"""
+
+import argparse
+import asyncio
+import itertools
+import random
+import time
+from collections.abc import Awaitable, Callable, Generator
+from dataclasses import asdict, dataclass
+from typing import Any
+
+import httpx
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.api.pagination import encode_cursor
+from app.database.session import get_db
+from app.main import app
+from app.models.db.driver import DriverDB
+from app.services.cache import driver_list_cache
+from benchmarks.common import STATUSES, BenchDatabase, percentiles, print_table, temp_database
+
+SCENARIOS = ("create", "list")
+SEED = 20240601  # Фиксированный seed: одинаковая последовательность запросов в каждом прогоне
+
+
+@dataclass
+class LoadResult:
+    scenario: str
+    rows: int
+    concurrency: int
+    requests: int
+    errors: int
+    seconds: float
+    rps: float
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    max_ms: float
+
+    @property
+    def key(self) -> str:
+        return f"{self.scenario}/rows={self.rows}/c={self.concurrency}"
+
+    def as_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+
+Request = Callable[[httpx.AsyncClient], Awaitable[httpx.Response]]
+
+
+def _create_requests(counter: "itertools.count[int]") -> Callable[[], Request]:
+    def next_request() -> Request:
+        number = next(counter)
+        payload = {
+            "user_id": number + 1,
+            "license_number": f"LOAD{number:010d}",
+            "years_of_experience": number % 40,
+        }
+        return lambda client: client.post("/drivers/", json=payload)
+
+    return next_request
+
+
+def _list_requests(worker: int, rows: int, limit: int) -> Callable[[], Request]:
+    rng = random.Random(SEED + worker)
+    params: dict[str, Any] = {"limit": limit}
+    if worker % 3 == 2:
+        params["status"] = STATUSES[worker % len(STATUSES)].value
+    cursor: str | None = None
+
+    async def send(client: httpx.AsyncClient) -> httpx.Response:
+        nonlocal cursor
+        if cursor is None:
+            # Новый проход по таблице начинается со случайного места
+            cursor = encode_cursor(rng.randrange(max(rows, 1)))
+        response = await client.get("/drivers/", params={**params, "after": cursor})
+        cursor = response.headers.get("X-Next-Cursor")
+        return response
+
+    return lambda: send
+
+
+async def run_load(
+    bench_db: BenchDatabase,
+    scenario: str,
+    concurrency: int,
+    requests: int,
+    rows: int,
+    limit: int = 100,
+) -> LoadResult:
+    """requests запросов на каждого из concurrency клиентов"""
+
+    def override_get_db() -> Generator[Session, None, None]:
+        db = bench_db.session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    # Номера прав продолжаются после уже созданных (повторные прогоны на той же БД)
+    with bench_db.engine.connect() as conn:
+        counter = itertools.count(conn.scalar(select(func.max(DriverDB.id))) or 0)
+    latencies: list[float] = []
+    errors = 0
+
+    transport = httpx.ASGITransport(app=app)  # type: ignore[arg-type]
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://bench", timeout=None
+    ) as client:
+
+        async def worker(index: int) -> None:
+            nonlocal errors
+            if scenario == "create":
+                next_request = _create_requests(counter)
+            else:
+                next_request = _list_requests(index, rows, limit)
+            for _ in range(requests):
+                request = next_request()
+                started = time.perf_counter()
+                response = await request(client)
+                latencies.append(time.perf_counter() - started)
+                if response.status_code >= 400:
+                    errors += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(i) for i in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    app.dependency_overrides.clear()
+    stats = percentiles(latencies)
+    return LoadResult(
+        scenario=scenario,
+        rows=rows,
+        concurrency=concurrency,
+        requests=len(latencies),
+        errors=errors,
+        seconds=elapsed,
+        rps=len(latencies) / elapsed,
+        p50_ms=stats["p50"],
+        p95_ms=stats["p95"],
+        p99_ms=stats["p99"],
+        max_ms=stats["max"],
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--scenario", choices=SCENARIOS, default="list")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=100, help="запросов на клиента")
+    args = parser.parse_args()
+    driver_list_cache.enabled = False
+
+    with temp_database(args.rows) as bench_db:
+        result = asyncio.run(
+            run_load(bench_db, args.scenario, args.concurrency, args.requests, args.rows)
+        )
+    print_table("load", [result.as_dict()])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""
+Микро-бенчмарки горячих преобразований DriverService (в духе pytest-benchmark).
+
+Каждый замер калибруется: число итераций в раунде подбирается так, чтобы раунд
+длился не меньше min_round_time; по раундам считаются min/mean/median/stddev.
+
+Запуск отдельно: python -m benchmarks.micro
+"""
+
+import argparse
+import statistics
+import time
+from collections.abc import Callable
+from dataclasses import asdict, dataclass
+from typing import Any
+
+from app.api.encoders import encode_json_array
+from app.api.pagination import decode_cursor, encode_cursor
+from app.models.db.driver import DriverDB, DriverStatusDB
+from app.models.domain.driver import Driver, DriverStatus
+from app.models.schemas.driver import DriverCreateRequest, DriverResponse
+from app.services.driver_service import DriverService
+from benchmarks.common import print_table
+
+PAGE_SIZE = 100
+
+
+@dataclass
+class MicroResult:
+    name: str
+    rounds: int
+    iterations: int  # Вызовов в раунде
+    min_us: float
+    mean_us: float
+    median_us: float
+    stddev_us: float
+    ops_per_sec: float
+
+    def as_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+
+def measure(
+    name: str, func: Callable[[], object], rounds: int = 20, min_round_time: float = 0.01
+) -> MicroResult:
+    """Время одного вызова func по rounds раундам (микросекунды)"""
+    iterations = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(iterations):
+            func()
+        if time.perf_counter() - started >= min_round_time:
+            break
+        iterations *= 2
+
+    timings = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        for _ in range(iterations):
+            func()
+        timings.append((time.perf_counter() - started) / iterations * 1e6)
+
+    mean = statistics.fmean(timings)
+    return MicroResult(
+        name=name,
+        rounds=rounds,
+        iterations=iterations,
+        min_us=min(timings),
+        mean_us=mean,
+        median_us=statistics.median(timings),
+        stddev_us=statistics.stdev(timings) if rounds > 1 else 0.0,
+        ops_per_sec=1e6 / mean,
+    )
+
+
+def _rows(count: int) -> list[tuple[int, int, str, int, DriverStatusDB]]:
+    statuses = list(DriverStatusDB)
+    return [(i, i, f"LIC{i:010d}", i % 40, statuses[i % 3]) for i in range(1, count + 1)]
+
+
+def micro_benchmarks() -> dict[str, Callable[[], object]]:
+    """Имя -> вызов; страница - PAGE_SIZE строк, как GET /drivers/ по умолчанию"""
+    row = _rows(1)[0]
+    page = _rows(PAGE_SIZE)
+    db_driver = DriverDB(
+        id=1,
+        user_id=1,
+        license_number="LIC0000000001",
+        years_of_experience=5,
+        status=DriverStatusDB.PENDING,
+    )
+    request = DriverCreateRequest(user_id=1, license_number="LIC0000000001", years_of_experience=5)
+    domain_page = [DriverService._row_to_domain(r) for r in page]
+    cursor = encode_cursor(123456)
+
+    def response_models() -> object:
+        # Прежний путь списка: Driver -> DriverResponse -> JSON
+        return [
+            DriverResponse.model_validate(driver.model_dump()).model_dump_json()
+            for driver in domain_page
+        ]
+
+    return {
+        "row_to_domain": lambda: DriverService._row_to_domain(row),
+        "db_to_domain": lambda: DriverService._db_to_domain(db_driver),
+        "insert_values": lambda: DriverService._insert_values(request),
+        "domain_verify": lambda: Driver(
+            user_id=1, license_number="LIC0000000001", years_of_experience=5
+        ).change_status(DriverStatus.VERIFIED),
+        f"page_{PAGE_SIZE}_to_domain": lambda: [DriverService._row_to_domain(r) for r in page],
+        f"page_{PAGE_SIZE}_encode_json": lambda: encode_json_array(page),
+        f"page_{PAGE_SIZE}_response_models": response_models,
+        "cursor_roundtrip": lambda: decode_cursor(cursor),
+    }
+
+
+def run_micro(
+    names: list[str] | None = None, rounds: int = 20, min_round_time: float = 0.01
+) -> list[MicroResult]:
+    benchmarks = micro_benchmarks()
+    return [
+        measure(name, func, rounds, min_round_time)
+        for name, func in benchmarks.items()
+        if names is None or name in names
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--only", nargs="+", choices=list(micro_benchmarks()), default=None)
+    args = parser.parse_args()
+    results = run_micro(args.only, args.rounds)
+    print_table("micro-benchmarks (us per call)", [r.as_dict() for r in results])
+
+
+if __name__ == "__main__":
+    main()
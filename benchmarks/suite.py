@@ -0,0 +1,138 @@
+"""
+Набор бенчмарков с отчётом в JSON: микро-бенчмарки + нагрузка на POST/GET /drivers/.
+
+Запуск:
+    python -m benchmarks.suite --rows 10000 100000 1000000 --concurrency 1 8 \\
+        --output bench-$(git rev-parse --short HEAD).json
+    python -m benchmarks.suite --baseline bench-main.json  # сравнение, код 1 при регрессии
+
+Отчёт содержит окружение (коммит, Python, SQLite, CPU), поэтому прогоны разных
+коммитов сравнимы между собой. Кэш списков выключен - меряется путь до БД.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import sqlite3
+import subprocess
+import sys
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+
+from app.services.cache import driver_list_cache
+from benchmarks.common import print_table, temp_database
+from benchmarks.load import SCENARIOS, run_load
+from benchmarks.micro import run_micro
+
+# Метрика -> True, если рост значения - это ухудшение
+MICRO_METRICS = {"mean_us": True}
+LOAD_METRICS = {"p95_ms": True, "p99_ms": True, "rps": False}
+
+
+def _git(*args: str) -> str | None:
+    try:
+        return subprocess.run(
+            ["git", *args], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def environment() -> dict[str, Any]:
+    return {
+        "commit": _git("rev-parse", "HEAD"),
+        "dirty": bool(_git("status", "--porcelain", "--untracked-files=no")),
+        "python": sys.version.split()[0],
+        "sqlite": sqlite3.sqlite_version,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "created_at": datetime.now(UTC).isoformat(timespec="seconds"),
+    }
+
+
+def run_suite(args: argparse.Namespace) -> dict[str, Any]:
+    report: dict[str, Any] = {"environment": environment(), "parameters": vars(args).copy()}
+    report["parameters"].pop("baseline", None)
+
+    micro = run_micro(rounds=args.rounds) if not args.skip_micro else []
+    report["micro"] = [result.as_dict() for result in micro]
+    print_table("micro-benchmarks (us per call)", report["micro"])
+
+    load = []
+    for rows in args.rows:
+        # Одна БД на размер таблицы: list до create, чтобы чтение шло по rows строкам
+        with temp_database(rows) as bench_db:
+            for scenario in args.scenarios:
+                for concurrency in args.concurrency:
+                    result = asyncio.run(
+                        run_load(bench_db, scenario, concurrency, args.requests, rows)
+                    )
+                    load.append(result.as_dict() | {"key": result.key})
+    report["load"] = load
+    print_table("load", [{k: v for k, v in r.items() if k != "key"} for r in load])
+    return report
+
+
+def compare(
+    report: dict[str, Any], baseline: dict[str, Any], max_regression: float
+) -> list[dict[str, Any]]:
+    """Строки сравнения с базовым отчётом; regression - ухудшение больше max_regression"""
+    rows = []
+    sections = (
+        ("micro", "name", MICRO_METRICS),
+        ("load", "key", LOAD_METRICS),
+    )
+    for section, key_field, metrics in sections:
+        before = {item[key_field]: item for item in baseline.get(section, [])}
+        for item in report.get(section, []):
+            old = before.get(item[key_field])
+            if old is None:
+                continue
+            for metric, higher_is_worse in metrics.items():
+                if not old[metric]:
+                    continue
+                change = (item[metric] - old[metric]) / old[metric]
+                worse = change if higher_is_worse else -change
+                rows.append(
+                    {
+                        "benchmark": f"{item[key_field]}:{metric}",
+                        "baseline": old[metric],
+                        "current": item[metric],
+                        "change_pct": change * 100,
+                        "regression": worse > max_regression,
+                    }
+                )
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=["list", "create"])
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8])
+    parser.add_argument("--requests", type=int, default=200, help="запросов на клиента")
+    parser.add_argument("--rounds", type=int, default=20, help="раундов микро-бенчмарка")
+    parser.add_argument("--skip-micro", action="store_true")
+    parser.add_argument("--output", type=Path, default=Path("bench-report.json"))
+    parser.add_argument("--baseline", type=Path, help="отчёт для сравнения")
+    parser.add_argument("--max-regression", type=float, default=0.15, help="допуск, доля")
+    args = parser.parse_args()
+    driver_list_cache.enabled = False
+
+    report = run_suite(args)
+    report["parameters"]["output"] = str(args.output)
+    args.output.write_text(json.dumps(report, indent=2))
+    print(f"\nreport written to {args.output}")
+
+    if args.baseline is not None:
+        rows = compare(report, json.loads(args.baseline.read_text()), args.max_regression)
+        print_table(f"compared with {args.baseline}", rows)
+        if any(row["regression"] for row in rows):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
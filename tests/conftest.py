@@ -1,17 +1,46 @@
 import pytest
+import pytest_asyncio
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
 
+from app.config import Settings
+from app.database.engine import install_query_metrics, install_query_profiling
 from app.database.session import Base, get_db
-from app.main import app
+from app.main import create_app
+from app.services.cache import LRUCache, driver_list_cache
 
 # Используем отдельную тестовую БД
 SQLALCHEMY_DATABASE_URL = "sqlite:///./test_autopilot.db"
 
+# Приложение на тестовой БД; таблицы создаёт и удаляет фикстура db
+app = create_app(Settings(database_url=SQLALCHEMY_DATABASE_URL, db_schema_bootstrap="none"))
+
 engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Асинхронный путь (aiosqlite) к той же тестовой БД; NullPool - соединения не живут между loop-ами
+async_engine = create_async_engine("sqlite+aiosqlite:///./test_autopilot.db", poolclass=NullPool)
+TestingAsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+# Как create_db_engine при AUTOPILOT_METRICS_ENABLED=1
+install_query_metrics(engine)
+install_query_metrics(async_engine.sync_engine)
+# Как при AUTOPILOT_PROFILE_HEADER_ENABLED=1 (без журнала медленных выражений)
+install_query_profiling(engine, 0)
+install_query_profiling(async_engine.sync_engine, 0)
+
+
+@pytest.fixture(autouse=True)
+def clear_driver_cache():
+    """Кэш списков общий для процесса - таблицы пересоздаются в каждом тесте"""
+    driver_list_cache.backend = LRUCache()
+    driver_list_cache.clear()
+    yield
+    driver_list_cache.clear()
+
 
 @pytest.fixture(scope="function")
 def db():
@@ -45,6 +74,75 @@ def client(db):
     app.dependency_overrides.clear()
 
 
+@pytest.fixture(scope="function")
+def async_client(db):
+    """Тестовый клиент, в котором роутер получает AsyncSession"""
+
+    async def override_get_db():
+        async with TestingAsyncSessionLocal() as async_db:
+            yield async_db
+
+    app.dependency_overrides[get_db] = override_get_db
+    with TestClient(app) as test_client:
+        yield test_client
+    app.dependency_overrides.clear()
+
+
+@pytest_asyncio.fixture(scope="function")
+async def async_db(db):
+    """Фикстура AsyncSession (таблицы создаёт фикстура db)"""
+    async with TestingAsyncSessionLocal() as session:
+        yield session
+
+
+class DriverFactory:
+    """Водители для тестов API: POST /drivers/ по одному или один POST /drivers/bulk"""
+
+    @staticmethod
+    def licenses(prefix, count):
+        return [f"{prefix}{i:05d}" for i in range(count)]
+
+    @staticmethod
+    def create(client, license_number, user_id=1, years_of_experience=3):
+        response = client.post(
+            "/drivers/",
+            json={
+                "user_id": user_id,
+                "license_number": license_number,
+                "years_of_experience": years_of_experience,
+            },
+        )
+        assert response.status_code == 201, response.text
+        return response.json()
+
+    def many(self, client, licenses, years_of_experience=3):
+        """По запросу на номер; user_id - 1, 2, ... в порядке licenses"""
+        return [
+            self.create(client, license_number, i + 1, years_of_experience)
+            for i, license_number in enumerate(licenses)
+        ]
+
+    @staticmethod
+    def bulk(client, rows):
+        """Строка rows - номер прав (user_id 1, стаж 3) или поля водителя; номер -> id"""
+        payload = [
+            {
+                "user_id": 1,
+                "years_of_experience": 3,
+                **({"license_number": row} if isinstance(row, str) else row),
+            }
+            for row in rows
+        ]
+        report = client.post("/drivers/bulk", json=payload).json()
+        assert report["created"] == len(payload), report
+        return {result["license_number"]: result["id"] for result in report["results"]}
+
+
+@pytest.fixture(scope="function")
+def driver_factory():
+    return DriverFactory()
+
+
 # Добавляем фикстуру для Allure
 @pytest.fixture(scope="function")
 def allure_report():
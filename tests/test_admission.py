@@ -0,0 +1,168 @@
+import asyncio
+from unittest.mock import patch
+
+import pytest
+
+
+class TestAdmissionControl:
+    """Тесты допуска запросов: token bucket, сброс нагрузки, дорогие запросы"""
+
+    def _settings(self, **overrides):
+        from app.config import Settings
+        from tests.conftest import SQLALCHEMY_DATABASE_URL
+
+        return Settings(
+            database_url=SQLALCHEMY_DATABASE_URL,
+            db_schema_bootstrap="none",
+            stats_reconcile_interval_seconds=0,
+            **overrides,
+        )
+
+    def _scope(self, path="/drivers/", query=b"", api_key=None):
+        headers = [] if api_key is None else [(b"x-api-key", api_key.encode())]
+        return {
+            "type": "http",
+            "method": "GET",
+            "path": path,
+            "query_string": query,
+            "headers": headers,
+            "client": ("10.0.0.1", 5000),
+        }
+
+    @staticmethod
+    async def _call(middleware, scope):
+        """Статус ответа middleware на запрос scope"""
+        messages = []
+
+        async def send(message):
+            messages.append(message)
+
+        await middleware(scope, None, send)
+        return messages[0]["status"]
+
+    def test_token_bucket_refills_and_evicts(self):
+        from app.api.admission import InMemoryRateLimitStore
+
+        store = InMemoryRateLimitStore(max_keys=2)
+        with patch("app.api.admission.time.monotonic", return_value=100.0) as clock:
+            assert [store.take("a", rate=2, burst=2) for _ in range(3)] == [0, 0, 0.5]
+            clock.return_value = 100.5
+            assert store.take("a", rate=2, burst=2) == 0
+            assert store.take("a", rate=2, burst=2) == pytest.approx(0.5)
+
+            store.take("b", rate=2, burst=2)
+            store.take("c", rate=2, burst=2)
+            # Вытеснен давно не активный "a": у него снова полный бакет
+            assert len(store) == 2
+            assert store.take("a", rate=2, burst=2) == 0
+
+    def test_client_key_and_expensive_requests(self):
+        from app.api.admission import is_expensive
+        from app.clients import client_key
+
+        assert client_key(self._scope(api_key="secret"), {"secret"}) == "key:secret"
+        # Неизвестный ключ не доверяется
+        assert client_key(self._scope(api_key="forged"), {"secret"}) == "ip:10.0.0.1"
+        assert client_key(self._scope(), {"secret"}) == "ip:10.0.0.1"
+        assert is_expensive(self._scope("/drivers/export"), 1000)
+        assert is_expensive(self._scope(query=b"limit=5000"), 1000)
+        assert not is_expensive(self._scope(query=b"limit=100"), 1000)
+        assert not is_expensive(self._scope(query=b"limit=abc"), 1000)
+        assert not is_expensive(self._scope("/drivers/42"), 1000)
+
+    def test_rate_limit_per_client(self, db):
+        from fastapi.testclient import TestClient
+
+        from app.main import create_app
+        from app.metrics import ADMISSION_DECISIONS
+
+        app = create_app(
+            self._settings(
+                rate_limit_per_second=0.001, rate_limit_burst=2, api_keys="client-a, client-b"
+            )
+        )
+        limited = ADMISSION_DECISIONS.value(decision="rate_limited")
+        with TestClient(app) as client:
+            headers = {"X-API-Key": "client-a"}
+            assert client.get("/drivers/stats", headers=headers).status_code == 200
+            assert client.get("/drivers/stats", headers=headers).status_code == 200
+            rejected = client.get("/drivers/stats", headers=headers)
+            assert rejected.status_code == 429
+            assert int(rejected.headers["Retry-After"]) > 1
+            # У другого ключа свой бакет; проверки живости не ограничиваются
+            other = client.get("/drivers/stats", headers={"X-API-Key": "client-b"})
+            assert other.status_code == 200
+            assert client.get("/health", headers=headers).status_code == 200
+            # Случайные ключи не дают новых бакетов: лимит - по IP
+            forged = [
+                client.get("/drivers/stats", headers={"X-API-Key": f"forged-{i}"}).status_code
+                for i in range(3)
+            ]
+            assert forged == [200, 200, 429]
+        assert ADMISSION_DECISIONS.value(decision="rate_limited") == limited + 2
+
+    @pytest.mark.asyncio
+    async def test_sheds_load_and_limits_expensive_requests(self):
+        from app.api.admission import AdmissionMiddleware
+
+        release = asyncio.Event()
+
+        async def slow_app(scope, receive, send):
+            await release.wait()
+            await send({"type": "http.response.start", "status": 200, "headers": []})
+            await send({"type": "http.response.body", "body": b""})
+
+        middleware = AdmissionMiddleware(
+            slow_app, self._settings(max_in_flight_requests=2, max_expensive_requests=1)
+        )
+        export = asyncio.ensure_future(self._call(middleware, self._scope("/drivers/export")))
+        await asyncio.sleep(0)
+        # Второй дорогой запрос - 503, обычный проходит
+        assert await self._call(middleware, self._scope("/drivers/lookup")) == 503
+        page = asyncio.ensure_future(self._call(middleware, self._scope()))
+        await asyncio.sleep(0)
+        assert middleware.in_flight == 2
+        assert await self._call(middleware, self._scope()) == 503
+
+        release.set()
+        assert await export == 200 and await page == 200
+        assert middleware.in_flight == middleware.expensive_in_flight == 0
+        assert await self._call(middleware, self._scope("/drivers/export")) == 200
+
+    @pytest.mark.asyncio
+    async def test_change_feed_streams_have_own_limit(self):
+        """SSE и long-poll не занимают max_in_flight_requests, у них свой лимит"""
+        from app.api.admission import AdmissionMiddleware
+
+        release = asyncio.Event()
+
+        async def streaming_app(scope, receive, send):
+            await release.wait()
+            await send({"type": "http.response.start", "status": 200, "headers": []})
+            await send({"type": "http.response.body", "body": b""})
+
+        middleware = AdmissionMiddleware(
+            streaming_app, self._settings(max_in_flight_requests=1, max_streaming_requests=2)
+        )
+        streams = [
+            asyncio.ensure_future(self._call(middleware, self._scope("/drivers/changes")))
+            for _ in range(2)
+        ]
+        await asyncio.sleep(0)
+        assert middleware.streaming_in_flight == 2 and middleware.in_flight == 0
+        assert await self._call(middleware, self._scope("/drivers/changes")) == 503
+
+        page = asyncio.ensure_future(self._call(middleware, self._scope()))
+        await asyncio.sleep(0)
+        assert middleware.in_flight == 1
+        release.set()
+        assert await asyncio.gather(*streams, page) == [200, 200, 200]
+        assert middleware.in_flight == middleware.streaming_in_flight == 0
+
+    def test_page_limit_is_capped(self, client):
+        assert client.get("/drivers/?limit=0").status_code == 422
+        assert client.get("/drivers/?limit=-1").status_code == 422
+        response = client.get("/drivers/?limit=10001")
+        assert response.status_code == 422
+        assert "/drivers/export" in response.json()["detail"]
+        assert client.get("/drivers/?limit=10000").status_code == 200
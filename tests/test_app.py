@@ -0,0 +1,187 @@
+import asyncio
+import os
+from unittest.mock import patch
+
+import pytest
+
+
+class TestApplicationFactory:
+    """Тесты create_app: без побочных эффектов при импорте, схема в lifespan"""
+
+    def test_import_has_no_side_effects(self, tmp_path):
+        """Импорт app.main и create_app() не создают файл БД"""
+        import subprocess
+        import sys
+
+        db_path = tmp_path / "cold.db"
+        code = "import app.main as m; m.create_app(); assert m.app is m.app"
+        subprocess.run(
+            [sys.executable, "-c", code],
+            check=True,
+            env={**os.environ, "AUTOPILOT_DATABASE_URL": f"sqlite:///{db_path}"},
+        )
+        assert not db_path.exists()
+
+    @pytest.mark.parametrize("bootstrap", ["create_all", "migrate", "none"])
+    def test_schema_bootstrap_in_lifespan(self, tmp_path, bootstrap):
+        """Схема готовится при старте приложения согласно db_schema_bootstrap"""
+        from fastapi.testclient import TestClient
+        from sqlalchemy import create_engine, inspect
+
+        from app.config import Settings
+        from app.main import create_app
+
+        url = f"sqlite:///{tmp_path / 'boot.db'}"
+        app = create_app(Settings(database_url=url, db_schema_bootstrap=bootstrap))
+        with TestClient(app) as client:
+            assert client.get("/health").status_code == 200
+
+        engine = create_engine(url)
+        tables = set(inspect(engine).get_table_names())
+        engine.dispose()
+        expected = {
+            "create_all": {
+                "drivers",
+                "drivers_search",
+                "driver_stats",
+                "driver_changes",
+                "driver_changes_pruned",
+            },
+            "migrate": {
+                "drivers",
+                "drivers_search",
+                "driver_stats",
+                "driver_changes",
+                "driver_changes_pruned",
+                "alembic_version",
+            },
+            "none": set(),
+        }
+        # Служебные таблицы FTS5 (drivers_search_data, ...) не важны
+        tables = {name for name in tables if not name.startswith("drivers_search_")}
+        assert tables == expected[bootstrap]
+
+    def test_session_dependency_follows_settings(self, db):
+        """db_async, метрики и кэш списков - из настроек приложения, а не окружения процесса"""
+        from fastapi.testclient import TestClient
+
+        from app.config import Settings
+        from app.main import create_app
+        from app.metrics import metrics
+        from app.services.cache import LRUCache, driver_list_cache
+        from app.services.driver_service import DriverService
+
+        settings = Settings(
+            database_url="sqlite:///./test_autopilot.db",
+            db_schema_bootstrap="none",
+            db_async=True,
+            metrics_enabled=False,
+            cache_enabled=False,
+            cache_max_entries=7,
+        )
+        app = create_app(settings)
+        assert app.dependency_overrides == {}
+        assert not any(route.path == "/metrics" for route in app.routes)
+        payload = {"user_id": 1, "license_number": "APPSET001", "years_of_experience": 1}
+        try:
+            with (
+                TestClient(app) as client,
+                patch.object(
+                    DriverService,
+                    "create_driver_async",
+                    wraps=DriverService.create_driver_async,
+                ) as create_async,
+            ):
+                assert client.post("/drivers/", json=payload).status_code == 201
+                create_async.assert_called_once()
+                assert metrics.enabled is False
+                assert driver_list_cache.enabled is False
+                assert driver_list_cache.backend.max_entries == 7
+        finally:
+            metrics.enabled = True
+            driver_list_cache.enabled = True
+            driver_list_cache.backend = LRUCache()
+
+        import app.main as main_module
+
+        with pytest.raises(AttributeError):
+            main_module.missing_attribute  # noqa: B018
+
+
+class TestMultiWorkerServing:
+    """Тесты многопроцессного режима run_app"""
+
+    def test_worker_environment(self):
+        """Все поля - в окружение; схема - только в родителе, SQLite - в WAL, in-memory запрещена"""
+        from app.config import Settings
+        from app.main import worker_environment
+
+        settings = Settings(database_url="sqlite:///./w.db", cache_ttl_seconds=2.5, db_async=True)
+        env = worker_environment(settings)
+        assert env["AUTOPILOT_DB_SCHEMA_BOOTSTRAP"] == "none"
+        assert env["AUTOPILOT_SQLITE_JOURNAL_MODE"] == "WAL"
+        assert (env["AUTOPILOT_CACHE_TTL_SECONDS"], env["AUTOPILOT_DB_ASYNC"]) == ("2.5", "1")
+        assert "AUTOPILOT_READ_DATABASE_URL" not in env  # None
+        production = Settings(database_url="sqlite:///./w.db", db_profile="production")
+        assert "AUTOPILOT_SQLITE_JOURNAL_MODE" not in worker_environment(production)
+        postgres = Settings(database_url="postgresql://db/autopilot")
+        assert "AUTOPILOT_SQLITE_JOURNAL_MODE" not in worker_environment(postgres)
+        with pytest.raises(ValueError, match="In-memory"):
+            worker_environment(Settings(database_url="sqlite://"))
+
+    def test_run_app_with_workers(self, tmp_path):
+        """Схема готовится один раз до запуска воркеров, воркеры получают все настройки"""
+        from sqlalchemy import create_engine, inspect
+
+        from app.config import Settings
+        from app.main import run_app
+
+        url = f"sqlite:///{tmp_path / 'workers.db'}"
+        settings = Settings(
+            database_url=url,
+            workers=4,
+            shutdown_timeout_seconds=5,
+            max_page_limit=500,
+            metrics_enabled=False,
+        )
+        with (
+            patch.dict(os.environ, {"AUTOPILOT_READ_DATABASE_URL": "sqlite:///./stale.db"}),
+            patch("uvicorn.run") as uvicorn_run,
+        ):
+            run_app(settings)
+            worker_settings = Settings.from_env()
+
+        assert worker_settings == settings.model_copy(
+            update={"db_schema_bootstrap": "none", "sqlite_journal_mode": "WAL"}
+        )
+        kwargs = uvicorn_run.call_args.kwargs
+        assert uvicorn_run.call_args.args == ("app.main:create_app",)
+        assert (kwargs["factory"], kwargs["workers"]) == (True, 4)
+        assert kwargs["timeout_graceful_shutdown"] == 5
+        engine = create_engine(url)
+        assert {"drivers", "drivers_search"} <= set(inspect(engine).get_table_names())
+        engine.dispose()
+
+        # Один воркер обслуживает приложение с переданными настройками
+        single = Settings(database_url=url, max_page_limit=500)
+        with patch("uvicorn.run") as uvicorn_run:
+            run_app(single)
+        [app] = uvicorn_run.call_args.args
+        assert app.state.settings is single
+        kwargs = uvicorn_run.call_args.kwargs
+        assert (kwargs["factory"], kwargs["workers"]) == (False, 1)
+
+    def test_pool_reset_after_fork(self, tmp_path):
+        """В дочернем процессе пул родителя заменяется новым"""
+        from app.config import Settings
+        from app.database import session
+
+        engine = session.init_engines(Settings(database_url=f"sqlite:///{tmp_path / 'f.db'}"))
+        async_engine = session.get_async_engine()
+        pools = engine.pool, async_engine.sync_engine.pool
+
+        session._reset_after_fork()
+
+        assert engine.pool is not pools[0]
+        assert async_engine.sync_engine.pool is not pools[1]
+        asyncio.run(session.dispose_engines())
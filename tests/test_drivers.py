@@ -1,9 +1,12 @@
+import asyncio
+import json
 from unittest.mock import patch
 
 import pytest
+from sqlalchemy.exc import IntegrityError
 
 from app.models.domain.driver import DriverStatus
-from app.models.schemas.driver import DriverCreateRequest
+from app.models.schemas.driver import DriverCreateRequest, DriverStatusChange, DriverUpdateRequest
 
 
 class TestDriversAPI:
@@ -42,6 +45,22 @@ class TestDriversAPI:
         response2 = client.post("/drivers/", json=driver_data)
         assert response2.status_code == 400 or response2.status_code == 409
 
+    def test_create_driver_on_conflict_return(self, client):
+        """on_conflict=return: повтор того же user_id - 200 с существующим водителем"""
+        driver_data = {"user_id": 3, "license_number": "IDEMP0001", "years_of_experience": 4}
+
+        created = client.post("/drivers/?on_conflict=return", json=driver_data)
+        assert created.status_code == 201
+
+        repeated = client.post("/drivers/?on_conflict=return", json=driver_data)
+        assert repeated.status_code == 200
+        assert repeated.json() == created.json()
+
+        # Номер прав другого пользователя - по-прежнему конфликт
+        foreign = client.post("/drivers/?on_conflict=return", json={**driver_data, "user_id": 4})
+        assert foreign.status_code == 409
+        assert len(client.get("/drivers/").json()) == 1
+
     def test_create_driver_validation_error(self, client):
         """Тест валидации данных"""
         invalid_data = {
@@ -119,7 +138,7 @@ class TestDriversAPIErrorHandling:
 
     def test_get_drivers_service_exception(self, client):
         """Тест обработки исключения из сервиса при получении"""
-        with patch("app.api.drivers.DriverService.get_drivers") as mock:
+        with patch("app.api.drivers.DriverService.get_driver_page") as mock:
             mock.side_effect = Exception("DB error")
             response = client.get("/drivers/")
 
@@ -256,6 +275,1586 @@ class TestDriverIntegration:
         assert "DRIVER002" in license_numbers
 
 
+class TestDriversPagination:
+    """Тесты keyset-пагинации GET /drivers/"""
+
+    def test_cursor_walks_all_pages(self, client, driver_factory):
+        """Курсор из X-Next-Cursor проходит все страницы без пропусков и повторов"""
+        driver_factory.many(client, driver_factory.licenses("PAGE", 5))
+
+        seen = []
+        response = client.get("/drivers/?limit=2")
+        while True:
+            assert response.status_code == 200
+            seen.extend(d["license_number"] for d in response.json())
+            cursor = response.headers.get("X-Next-Cursor")
+            if cursor is None:
+                break
+            response = client.get(f"/drivers/?limit=2&after={cursor}")
+
+        assert seen == [f"PAGE{i:05d}" for i in range(5)]
+
+    def test_cursor_with_status_filter_and_skip_fallback(self, client, driver_factory):
+        """Курсор совместим с фильтром status, skip остаётся рабочим"""
+        driver_factory.many(client, driver_factory.licenses("PAGE", 3))
+
+        first = client.get("/drivers/?status=PENDING&limit=1")
+        cursor = first.headers["X-Next-Cursor"]
+        second = client.get(f"/drivers/?status=PENDING&limit=1&after={cursor}")
+        assert second.json()[0]["license_number"] == "PAGE00001"
+
+        by_skip = client.get("/drivers/?skip=1&limit=1")
+        assert by_skip.json()[0]["license_number"] == "PAGE00001"
+
+    def test_invalid_cursor(self, client):
+        """Повреждённый курсор и after+skip дают 400"""
+        from app.api.pagination import encode_cursor
+
+        assert client.get("/drivers/?after=not-a-cursor").status_code == 400
+        assert client.get("/drivers/?after=eyJpZCI6ICJ4In0").status_code == 400
+        response = client.get(f"/drivers/?after={encode_cursor(1)}&skip=5")
+        assert response.status_code == 400
+
+    def test_cursor_async_path(self, async_client, driver_factory):
+        """Keyset-пагинация через AsyncSession"""
+        driver_factory.many(async_client, driver_factory.licenses("APAGE", 3))
+
+        first = async_client.get("/drivers/?limit=2")
+        cursor = first.headers["X-Next-Cursor"]
+        second = async_client.get(f"/drivers/?limit=2&after={cursor}")
+        assert [d["license_number"] for d in second.json()] == ["APAGE00002"]
+        assert "X-Next-Cursor" not in second.headers
+
+
+class TestDriverSearch:
+    """Тесты поиска GET /drivers/search"""
+
+    LICENSES = ["XAB1230", "AB12399", "AB123", "QQ00000", "AB12300", "ab123zz"]
+
+    def test_ranking_exact_prefix_substring(self, client, driver_factory):
+        """Точное совпадение, затем префикс по алфавиту, затем подстрока по id"""
+        driver_factory.many(client, [*self.LICENSES, "ZZAB123"])
+
+        response = client.get("/drivers/search?q=AB123")
+        assert response.status_code == 200
+        assert [d["license_number"] for d in response.json()] == [
+            "AB123",
+            "AB12300",
+            "AB12399",
+            "XAB1230",
+            "ab123zz",
+            "ZZAB123",
+        ]
+        assert "X-Next-Cursor" not in response.headers
+
+    def test_cursor_walks_across_phases(self, client, driver_factory):
+        """Курсор переходит между этапами без пропусков и повторов"""
+        driver_factory.many(client, self.LICENSES)
+
+        seen = []
+        response = client.get("/drivers/search?q=AB123&limit=2")
+        while True:
+            assert response.status_code == 200
+            seen.extend(d["license_number"] for d in response.json())
+            cursor = response.headers.get("X-Next-Cursor")
+            if cursor is None:
+                break
+            response = client.get(f"/drivers/search?q=AB123&limit=2&after={cursor}")
+
+        assert seen == ["AB123", "AB12300", "AB12399", "XAB1230", "ab123zz"]
+
+    def test_index_follows_updates_and_deletes(self, client, db, driver_factory):
+        """Триггеры держат FTS-индекс в синхроне с drivers"""
+        from sqlalchemy import delete, update
+
+        from app.models.db.driver import DriverDB
+
+        driver_factory.many(client, ["QQ1111", "QQ2222"])
+        db.execute(
+            update(DriverDB)
+            .where(DriverDB.license_number == "QQ1111")
+            .values(license_number="QQ9ZZZ1")
+        )
+        db.execute(delete(DriverDB).where(DriverDB.license_number == "QQ2222"))
+        db.commit()
+
+        assert client.get("/drivers/search?q=111").json() == []
+        assert client.get("/drivers/search?q=222").json() == []
+        assert [d["license_number"] for d in client.get("/drivers/search?q=9ZZ").json()] == [
+            "QQ9ZZZ1"
+        ]
+
+    def test_short_query_skips_substring(self, client, driver_factory):
+        """Короче 3 символов - только точное совпадение и префикс"""
+        driver_factory.many(client, ["AB0001", "XAB001"])
+
+        response = client.get("/drivers/search?q=AB")
+        assert [d["license_number"] for d in response.json()] == ["AB0001"]
+
+    def test_query_special_characters(self, client, driver_factory):
+        """Кавычки и символы LIKE в запросе не ломают поиск"""
+        driver_factory.many(client, ["AB%_1X", 'QQ"1"Z'])
+
+        assert [d["license_number"] for d in client.get("/drivers/search?q=%_1").json()] == [
+            "AB%_1X"
+        ]
+        assert [d["license_number"] for d in client.get('/drivers/search?q="1"').json()] == [
+            'QQ"1"Z'
+        ]
+
+    def test_invalid_parameters(self, client):
+        """Пустой запрос - 422; повреждённый курсор и ключ не того типа для этапа - 400"""
+        from app.api.pagination import encode_cursor, encode_search_cursor
+
+        assert client.get("/drivers/search?q=").status_code == 422
+        assert client.get("/drivers/search?q=AB1&after=not-a-cursor").status_code == 400
+        # Тот же код, что у курсора списка
+        assert client.get("/drivers/?after=not-a-cursor").status_code == 400
+        cursors = [
+            encode_cursor(1),
+            encode_search_cursor(0, 5),
+            encode_search_cursor(1, 5),
+            encode_search_cursor(2, "AB1"),
+            encode_search_cursor(3, 5),
+            encode_search_cursor(True, "AB1"),  # type: ignore[arg-type]
+        ]
+        for cursor in cursors:
+            response = client.get(f"/drivers/search?q=AB1&after={cursor}")
+            assert response.status_code == 400
+            assert response.json()["detail"] == "Invalid cursor"
+
+    def test_service_rejects_mismatched_key(self, db):
+        """DriverService.search_drivers сам сужает тип ключа этапа"""
+        from app.services.driver_service import SEARCH_PREFIX, SEARCH_SUBSTRING, DriverService
+
+        for position in [(SEARCH_PREFIX, 5), (SEARCH_SUBSTRING, "AB1")]:
+            with pytest.raises(ValueError, match="Invalid cursor"):
+                DriverService.search_drivers(db, "AB1", after=position)
+
+    def test_search_async_path(self, async_client, driver_factory):
+        """Поиск через AsyncSession"""
+        driver_factory.many(async_client, ["AS1234", "XAS123"])
+
+        response = async_client.get("/drivers/search?q=AS123")
+        assert [d["license_number"] for d in response.json()] == ["AS1234", "XAS123"]
+
+    def test_substring_fallback_without_fts(self, db, monkeypatch):
+        """Вне SQLite подстрока ищется через ILIKE"""
+        from sqlalchemy.dialects import postgresql
+
+        from app.services.driver_service import DriverService
+
+        monkeypatch.setattr(db.get_bind().dialect, "name", "postgresql")
+        stmt = DriverService._search_phase(db, 2, "A%1", 10)
+        sql = str(stmt.compile(dialect=postgresql.dialect()))
+        assert "drivers_search" not in sql
+        assert "ILIKE" in sql and "drivers.id >" in sql
+
+
+class TestDriverStats:
+    """Тесты GET /drivers/stats и счётчиков driver_stats"""
+
+    def test_counters_follow_writes(self, client, driver_factory):
+        """Создание, идемпотентное создание, импорт и смена статуса меняют счётчики"""
+        first = driver_factory.create(client, "STATS0001", years_of_experience=0)
+        second = driver_factory.create(client, "STATS0002", years_of_experience=7)
+        duplicate = client.post(
+            "/drivers/",
+            json={"user_id": 1, "license_number": "STATS0002", "years_of_experience": 7},
+        )
+        assert duplicate.status_code == 409  # Счётчики не меняются
+        client.post(
+            "/drivers/?on_conflict=return",
+            json={"user_id": 1, "license_number": "STATS0003", "years_of_experience": 25},
+        )
+        client.post(
+            "/drivers/?on_conflict=return",
+            json={"user_id": 1, "license_number": "STATS0003", "years_of_experience": 25},
+        )
+        client.post(
+            "/drivers/bulk",
+            json=[
+                {"user_id": 1, "license_number": "STATS0004", "years_of_experience": 3},
+                {"user_id": 1, "license_number": "STATS0001", "years_of_experience": 3},
+            ],
+        )
+        for driver, status in ((first, "REJECTED"), (second, "VERIFIED")):
+            response = client.patch(f"/drivers/{driver['id']}/status", json={"status": status})
+            assert response.status_code == 200
+
+        response = client.get("/drivers/stats")
+        assert response.status_code == 200
+        assert response.json() == {
+            "total": 4,
+            "by_status": {"PENDING": 2, "VERIFIED": 1, "REJECTED": 1},
+            "by_experience": {"0-1": 1, "2-4": 1, "5-9": 1, "10-19": 0, "20+": 1},
+        }
+
+    def test_reconcile_repairs_drift(self, client, db, driver_factory):
+        """Сверка с GROUP BY восстанавливает расходящиеся счётчики"""
+        from sqlalchemy import delete, update
+
+        from app.main import reconcile_stats
+        from app.models.db.driver import DriverDB, DriverStatsDB
+        from app.services.driver_service import DriverService
+
+        driver_factory.create(client, "DRIFT0001", years_of_experience=1)
+        driver_factory.create(client, "DRIFT0002", years_of_experience=12)
+        # Строка, записанная в обход DriverService
+        db.execute(update(DriverDB).values(years_of_experience=2))
+        db.execute(delete(DriverStatsDB).where(DriverStatsDB.experience_bucket == 0))
+        db.commit()
+
+        assert DriverService.reconcile_stats(db) == 2
+        assert client.get("/drivers/stats").json()["by_experience"] == {
+            "0-1": 0,
+            "2-4": 2,
+            "5-9": 0,
+            "10-19": 0,
+            "20+": 0,
+        }
+        assert reconcile_stats() == 0
+
+    def test_counters_sharded_by_driver_id(self, client, db, driver_factory):
+        """Ячейка разбита на шарды по id % STATS_SHARDS, чтение их суммирует"""
+        from sqlalchemy import select
+
+        from app.models.db.driver import DriverStatsDB
+        from app.services.driver_service import DriverService
+        from app.services.driver_stats import STATS_SHARDS
+
+        count = STATS_SHARDS + 4
+        ids = driver_factory.bulk(client, driver_factory.licenses("SHARD", count))
+        first = ids["SHARD00000"]
+        response = client.patch(f"/drivers/{first}/status", json={"status": "VERIFIED"})
+        assert response.status_code == 200
+
+        rows = db.execute(
+            select(DriverStatsDB.status, DriverStatsDB.shard, DriverStatsDB.count)
+        ).all()
+        pending = {shard: n for status, shard, n in rows if status.value == "PENDING"}
+        verified = {shard: n for status, shard, n in rows if status.value == "VERIFIED"}
+        assert len(pending) == STATS_SHARDS
+        assert sum(pending.values()) == count - 1
+        # Смена статуса - в шарде того же водителя
+        assert verified == {first % STATS_SHARDS: 1}
+        assert pending[first % STATS_SHARDS] == 1
+        assert client.get("/drivers/stats").json()["by_status"] == {
+            "PENDING": count - 1,
+            "VERIFIED": 1,
+            "REJECTED": 0,
+        }
+        assert DriverService.reconcile_stats(db) == 0
+
+    def test_stats_async_path(self, async_client, driver_factory):
+        """Счётчики обновляются и читаются через AsyncSession"""
+        driver_factory.create(async_client, "ASTAT0001", years_of_experience=4)
+
+        assert async_client.get("/drivers/stats").json()["by_experience"]["2-4"] == 1
+
+    @pytest.mark.asyncio
+    async def test_periodic_reconciliation(self, monkeypatch):
+        """Фоновая сверка повторяется и переживает ошибки"""
+        from app import main
+
+        calls = []
+
+        def reconcile():
+            calls.append(1)
+            if len(calls) == 1:
+                raise RuntimeError("DB down")
+            return 0
+
+        monkeypatch.setattr(main, "reconcile_stats", reconcile)
+        task = asyncio.create_task(main.reconcile_stats_periodically(0.001))
+        while len(calls) < 2:
+            await asyncio.sleep(0.01)
+        task.cancel()
+        assert len(calls) >= 2
+
+
+class TestDriverChanges:
+    """Тесты ленты изменений GET /drivers/changes"""
+
+    def _events(self, body):
+        """События SSE: (id, event, data) без служебных строк"""
+        events = []
+        for block in body.split("\n\n"):
+            fields = dict(
+                line.split(": ", 1) for line in block.splitlines() if not line.startswith(":")
+            )
+            if "id" in fields:
+                events.append((int(fields["id"]), fields["event"], json.loads(fields["data"])))
+        return events
+
+    def test_long_poll_returns_deltas(self, client, driver_factory):
+        """Создание, импорт и смена статуса попадают в журнал по порядку seq"""
+        driver = driver_factory.create(client, "FEED00001")
+        client.post(
+            "/drivers/bulk",
+            json=[{"user_id": 2, "license_number": "FEED00002", "years_of_experience": 1}],
+        )
+        client.patch(f"/drivers/{driver['id']}/status", json={"status": "VERIFIED"})
+
+        page = client.get("/drivers/changes").json()
+        assert [(c["operation"], c["driver"]["license_number"]) for c in page["changes"]] == [
+            ("created", "FEED00001"),
+            ("created", "FEED00002"),
+            ("status_changed", "FEED00001"),
+        ]
+        assert page["changes"][-1]["driver"]["status"] == "VERIFIED"
+        assert page["last_seq"] == page["changes"][-1]["seq"]
+
+        # Продолжение с last_seq - только новые изменения
+        assert client.get(f"/drivers/changes?after={page['last_seq']}").json() == {
+            "changes": [],
+            "last_seq": page["last_seq"],
+        }
+        verified = client.get("/drivers/changes?status=VERIFIED").json()["changes"]
+        assert [c["operation"] for c in verified] == ["status_changed"]
+
+    def test_long_poll_wakes_on_commit(self, client):
+        """Ожидающий запрос возвращается сразу после commit, а не по таймауту"""
+        import threading
+        import time
+
+        from app.services.driver_service import DriverService
+        from tests.conftest import TestingSessionLocal
+
+        def create_later():
+            time.sleep(0.2)
+            with TestingSessionLocal() as session:
+                DriverService.create_driver(
+                    session,
+                    DriverCreateRequest(
+                        user_id=1, license_number="WAKE00001", years_of_experience=1
+                    ),
+                )
+
+        writer = threading.Thread(target=create_later)
+        started = time.perf_counter()
+        writer.start()
+        page = client.get("/drivers/changes?wait=10").json()
+        writer.join()
+
+        assert time.perf_counter() - started < 5
+        assert [c["driver"]["license_number"] for c in page["changes"]] == ["WAKE00001"]
+
+    def test_sse_stream_and_resume(self, client, monkeypatch, driver_factory):
+        """SSE: id события - seq, Last-Event-ID возобновляет поток"""
+        from app.api import drivers
+
+        monkeypatch.setattr(drivers, "SSE_KEEPALIVE_SECONDS", 0.05)
+        for i in range(3):
+            driver_factory.create(client, f"SSE0000{i}")
+
+        headers = {"Accept": "text/event-stream"}
+        response = client.get("/drivers/changes?timeout=0.3&limit=2", headers=headers)
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+        events = self._events(response.text)
+        assert [(event, data["driver"]["license_number"]) for _, event, data in events] == [
+            ("created", "SSE00000"),
+            ("created", "SSE00001"),
+            ("created", "SSE00002"),
+        ]
+        assert ": keepalive" in response.text
+
+        resumed = client.get(
+            "/drivers/changes?timeout=0.1", headers={**headers, "Last-Event-ID": str(events[0][0])}
+        )
+        assert [seq for seq, _, _ in self._events(resumed.text)] == [
+            seq for seq, _, _ in events[1:]
+        ]
+
+    def test_changes_async_path(self, async_client, driver_factory):
+        """Журнал пишется и читается через AsyncSession"""
+        driver_factory.create(async_client, "AFEED0001")
+
+        page = async_client.get("/drivers/changes").json()
+        assert [c["driver"]["license_number"] for c in page["changes"]] == ["AFEED0001"]
+
+    def test_pruned_cursor_is_gone(self, client, db, driver_factory):
+        """Курсор старше очищенного журнала - 410 с last_seq, SSE - событие reset"""
+        from app.main import prune_changes
+        from app.services.driver_service import DriverService
+
+        driver_factory.many(client, driver_factory.licenses("PRUNE", 3))
+        seqs = [c["seq"] for c in client.get("/drivers/changes").json()["changes"]]
+        etag = client.get("/drivers/").headers["ETag"]
+
+        assert DriverService.prune_changes(db, 1) == 2
+        assert prune_changes(1) == 0
+
+        gone = client.get("/drivers/changes?after=0")
+        assert gone.status_code == 410
+        assert gone.json()["detail"]["last_seq"] == seqs[-1]
+        # Курсор на границе очистки ничего не потерял
+        page = client.get(f"/drivers/changes?after={seqs[1]}").json()
+        assert [c["seq"] for c in page["changes"]] == [seqs[-1]]
+        # Последняя запись не удаляется: версия таблицы для ETag не откатывается
+        assert client.get("/drivers/").headers["ETag"] == etag
+
+        response = client.get("/drivers/changes?timeout=1", headers={"Accept": "text/event-stream"})
+        assert self._events(response.text) == [(seqs[-1], "reset", {"last_seq": seqs[-1]})]
+
+    @pytest.mark.asyncio
+    async def test_periodic_pruning(self, monkeypatch):
+        """Фоновая очистка журнала повторяется и переживает ошибки"""
+        from app import main
+
+        calls = []
+
+        def prune(keep):
+            calls.append(keep)
+            if len(calls) == 1:
+                raise RuntimeError("DB down")
+            return 0
+
+        monkeypatch.setattr(main, "prune_changes", prune)
+        task = asyncio.create_task(main.prune_changes_periodically(0.001, 10))
+        while len(calls) < 2:
+            await asyncio.sleep(0.01)
+        task.cancel()
+        assert calls[:2] == [10, 10]
+
+    @pytest.mark.asyncio
+    async def test_notifier(self):
+        """ChangeNotifier: версия до чтения не даёт пропустить notify()"""
+        from app.services.change_feed import ChangeNotifier
+
+        notifier = ChangeNotifier()
+        version = notifier.version
+        assert await notifier.wait(version, 0.01) is False
+        notifier.notify()
+        assert await notifier.wait(version, 10) is True
+
+        waiter = asyncio.create_task(notifier.wait(notifier.version, 10))
+        await asyncio.sleep(0.01)
+        closed_loop = asyncio.new_event_loop()
+        closed_loop.close()
+        notifier._waiters.add((closed_loop, asyncio.Event()))
+        notifier.notify()
+        assert await waiter is True
+
+
+class TestConditionalGet:
+    """Тесты ETag и If-None-Match для GET /drivers/ и GET /drivers/{id}"""
+
+    def test_listing_not_modified_without_reading_rows(self, client, driver_factory):
+        """304 по версии таблицы - до DriverService.get_driver_page"""
+        from app.services.driver_service import DriverService
+
+        driver_factory.create(client, "ETAG00001")
+        first = client.get("/drivers/")
+        etag = first.headers["ETag"]
+        assert first.headers["Cache-Control"] == "no-cache"
+
+        with patch.object(DriverService, "get_driver_page", side_effect=AssertionError):
+            cached = client.get("/drivers/", headers={"If-None-Match": etag})
+            assert cached.status_code == 304
+            assert cached.content == b""
+            assert cached.headers["ETag"] == etag
+            listed = client.get("/drivers/", headers={"If-None-Match": f'"other", W/{etag}'})
+            assert listed.status_code == 304
+            assert client.get("/drivers/", headers={"If-None-Match": "*"}).status_code == 304
+
+        driver_factory.create(client, "ETAG00002")
+        changed = client.get("/drivers/", headers={"If-None-Match": etag})
+        assert changed.status_code == 200
+        assert changed.headers["ETag"] != etag
+        assert len(changed.json()) == 2
+
+    def test_listing_etag_follows_cached_page(self, client, db, driver_factory):
+        """Запись другого воркера (без инвалидации кэша): ETag - версии отданной страницы"""
+        from sqlalchemy import insert
+
+        from app.models.db.driver import (
+            DriverChangeDB,
+            DriverChangeOperationDB,
+            DriverDB,
+            DriverStatusDB,
+        )
+        from app.services.cache import driver_list_cache
+
+        driver_factory.create(client, "ETAG00003")
+        etag = client.get("/drivers/").headers["ETag"]
+
+        values = {
+            "user_id": 2,
+            "license_number": "ETAG00004",
+            "years_of_experience": 1,
+            "status": DriverStatusDB.PENDING,
+        }
+        driver_id = db.execute(insert(DriverDB).values(values).returning(DriverDB.id)).scalar()
+        db.execute(
+            insert(DriverChangeDB).values(
+                operation=DriverChangeOperationDB.CREATED, driver_id=driver_id, **values
+            )
+        )
+        db.commit()
+
+        stale = client.get("/drivers/")
+        assert stale.headers["ETag"] == etag
+        assert [d["license_number"] for d in stale.json()] == ["ETAG00003"]
+        assert client.get("/drivers/", headers={"If-None-Match": etag}).status_code == 304
+
+        driver_list_cache.clear()  # Истечение TTL
+        response = client.get("/drivers/", headers={"If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.headers["ETag"] != etag
+        assert [d["license_number"] for d in response.json()] == ["ETAG00003", "ETAG00004"]
+
+    def test_get_driver(self, client, driver_factory):
+        """GET /drivers/{id}: ETag по версии строки, 304 и 404"""
+        driver = driver_factory.create(client, "ETAG00005")
+
+        response = client.get(f"/drivers/{driver['id']}")
+        assert response.status_code == 200
+        assert response.json() == {**driver, "version": 1}
+        etag = response.headers["ETag"]
+        assert (
+            client.get(f"/drivers/{driver['id']}", headers={"If-None-Match": etag}).status_code
+            == 304
+        )
+
+        client.patch(f"/drivers/{driver['id']}/status", json={"status": "VERIFIED"})
+        updated = client.get(f"/drivers/{driver['id']}", headers={"If-None-Match": etag})
+        assert updated.status_code == 200
+        assert updated.json()["version"] == 2
+        assert updated.headers["ETag"] != etag
+
+        assert client.get("/drivers/999999").status_code == 404
+        assert client.get("/drivers/not-a-number").status_code == 422
+
+    def test_conditional_get_async_path(self, async_client, driver_factory):
+        """ETag и 304 через AsyncSession"""
+        driver = driver_factory.create(async_client, "AETAG0001")
+
+        etag = async_client.get("/drivers/").headers["ETag"]
+        assert async_client.get("/drivers/", headers={"If-None-Match": etag}).status_code == 304
+        single = async_client.get(f"/drivers/{driver['id']}")
+        assert single.json()["version"] == 1
+        assert (
+            async_client.get(
+                f"/drivers/{driver['id']}", headers={"If-None-Match": single.headers["ETag"]}
+            ).status_code
+            == 304
+        )
+
+
+class TestContentNegotiation:
+    """Тесты сжатия и бинарных форматов страниц водителей"""
+
+    def test_gzip_above_threshold(self, client, driver_factory):
+        """Сжатие только для тел не меньше compression_min_size"""
+        driver_factory.bulk(client, driver_factory.licenses("NEGO", 30))
+
+        large = client.get("/drivers/", headers={"Accept-Encoding": "gzip"})
+        assert large.headers["content-encoding"] == "gzip"
+        assert large.headers["vary"] == "Accept, Accept-Encoding"
+        assert len(large.json()) == 30
+
+        small = client.get("/drivers/?limit=1", headers={"Accept-Encoding": "gzip"})
+        assert "content-encoding" not in small.headers
+        identity = client.get("/drivers/", headers={"Accept-Encoding": "identity"})
+        assert "content-encoding" not in identity.headers
+
+    def test_brotli(self, client, driver_factory):
+        """br предпочтительнее gzip при равном q"""
+        pytest.importorskip("brotli")
+        driver_factory.bulk(client, driver_factory.licenses("NEGO", 30))
+
+        response = client.get("/drivers/", headers={"Accept-Encoding": "gzip, br"})
+        assert response.headers["content-encoding"] == "br"
+        assert len(response.json()) == 30
+        gzip_preferred = client.get("/drivers/", headers={"Accept-Encoding": "gzip, br;q=0.5"})
+        assert gzip_preferred.headers["content-encoding"] == "gzip"
+
+    def test_msgpack(self, client, monkeypatch, driver_factory):
+        """application/msgpack - тот же массив объектов, что и JSON"""
+        msgpack = pytest.importorskip("msgpack")
+        from app.api import negotiation
+
+        monkeypatch.setattr(negotiation, "THREADPOOL_MIN_ROWS", 1)  # Путь через threadpool
+        driver_factory.bulk(client, driver_factory.licenses("NEGO", 3))
+
+        response = client.get("/drivers/", headers={"Accept": "application/msgpack"})
+        assert response.headers["content-type"] == "application/msgpack"
+        assert msgpack.unpackb(response.content) == client.get("/drivers/").json()
+
+        search = client.get("/drivers/search?q=NEGO", headers={"Accept": "application/x-msgpack"})
+        assert [d["license_number"] for d in msgpack.unpackb(search.content)] == [
+            "NEGO00000",
+            "NEGO00001",
+            "NEGO00002",
+        ]
+
+    def test_arrow(self, client, driver_factory):
+        """Arrow IPC stream: колонки DriverResponse"""
+        pa = pytest.importorskip("pyarrow")
+        driver_factory.bulk(client, driver_factory.licenses("NEGO", 3))
+
+        response = client.get(
+            "/drivers/?status=PENDING", headers={"Accept": "application/vnd.apache.arrow.stream"}
+        )
+        assert response.headers["content-type"] == "application/vnd.apache.arrow.stream"
+        table = pa.ipc.open_stream(response.content).read_all()
+        assert table.column_names == [
+            "id",
+            "user_id",
+            "license_number",
+            "years_of_experience",
+            "status",
+        ]
+        assert table.to_pylist() == client.get("/drivers/?status=PENDING").json()
+
+        empty = client.get(
+            "/drivers/?status=VERIFIED", headers={"Accept": "application/vnd.apache.arrow.stream"}
+        )
+        assert pa.ipc.open_stream(empty.content).read_all().num_rows == 0
+
+    def test_etag_per_representation(self, client, driver_factory):
+        """Разные представления - разные сильные ETag, 304 с Vary"""
+        driver_factory.bulk(client, driver_factory.licenses("NEGO", 1))
+
+        plain = client.get("/drivers/", headers={"Accept-Encoding": "identity"})
+        gzipped = client.get("/drivers/", headers={"Accept-Encoding": "gzip"})
+        assert plain.headers["etag"] != gzipped.headers["etag"]
+
+        cached = client.get(
+            "/drivers/",
+            headers={"Accept-Encoding": "gzip", "If-None-Match": gzipped.headers["etag"]},
+        )
+        assert cached.status_code == 304
+        assert cached.headers["vary"] == "Accept, Accept-Encoding"
+        other = client.get(
+            "/drivers/",
+            headers={"Accept-Encoding": "identity", "If-None-Match": gzipped.headers["etag"]},
+        )
+        assert other.status_code == 200
+
+    @pytest.mark.parametrize(
+        ("accept", "expected"),
+        [
+            (None, "json"),
+            ("text/html", "json"),
+            ("*/*", "json"),
+            ("application/*;q=0.9, application/json;q=0.1", "msgpack"),
+            ("application/json;q=0.5, application/msgpack", "msgpack"),
+            ("application/msgpack;q=0, application/vnd.apache.arrow.stream", "arrow"),
+            ("application/msgpack;q=oops", "json"),
+        ],
+    )
+    def test_choose_format(self, accept, expected):
+        pytest.importorskip("msgpack")
+        pytest.importorskip("pyarrow")
+        from app.api.negotiation import choose_format
+
+        assert choose_format(accept).name == expected
+
+    @pytest.mark.parametrize(
+        ("accept_encoding", "expected"),
+        [
+            (None, None),
+            ("", None),
+            ("gzip", "gzip"),
+            ("*", "br"),
+            ("gzip;q=0, *", "br"),
+            ("br;q=0, gzip;q=0", None),
+            ("deflate", None),
+        ],
+    )
+    def test_choose_encoding(self, accept_encoding, expected):
+        pytest.importorskip("brotli")
+        from app.api.negotiation import choose_encoding
+
+        assert choose_encoding(accept_encoding) == expected
+
+
+class TestDriverLookup:
+    """Тесты POST /drivers/lookup"""
+
+    DRIVERS = [
+        {"user_id": 1, "license_number": "LOOK00001"},
+        {"user_id": 1, "license_number": "LOOK00002"},
+        {"user_id": 2, "license_number": "LOOK00003"},
+        {"user_id": 3, "license_number": "LOOK00004"},
+    ]
+
+    def test_lookup_returns_maps(self, client, driver_factory):
+        """Карты по обоим видам ключей, ненайденные ключи - в missing_*"""
+        ids = driver_factory.bulk(client, self.DRIVERS)
+
+        response = client.post(
+            "/drivers/lookup",
+            json={
+                "user_ids": [2, 1, 99, 1],
+                "license_numbers": ["LOOK00004", "LOOK00001", "NOPE00000"],
+            },
+        )
+
+        assert response.status_code == 200
+        body = response.json()
+        assert [d["id"] for d in body["by_user_id"]["1"]] == [ids["LOOK00001"], ids["LOOK00002"]]
+        assert [d["license_number"] for d in body["by_user_id"]["2"]] == ["LOOK00003"]
+        assert set(body["by_license_number"]) == {"LOOK00004", "LOOK00001"}
+        assert body["by_license_number"]["LOOK00004"] == {
+            "id": ids["LOOK00004"],
+            "user_id": 3,
+            "license_number": "LOOK00004",
+            "years_of_experience": 3,
+            "status": "PENDING",
+        }
+        assert body["missing_user_ids"] == [99]
+        assert body["missing_license_numbers"] == ["NOPE00000"]
+
+    def test_lookup_single_key_kind(self, client, driver_factory):
+        driver_factory.bulk(client, self.DRIVERS)
+        response = client.post("/drivers/lookup", json={"license_numbers": ["LOOK00003"]})
+        assert response.status_code == 200
+        assert response.json()["by_user_id"] == {}
+        assert list(response.json()["by_license_number"]) == ["LOOK00003"]
+
+    @pytest.mark.parametrize(
+        "payload",
+        [
+            {},
+            {"user_ids": [], "license_numbers": []},
+            {"user_ids": [0]},
+            {"user_ids": list(range(1, 5002))},
+        ],
+    )
+    def test_lookup_validation(self, client, payload):
+        assert client.post("/drivers/lookup", json=payload).status_code == 422
+
+    def test_lookup_chunks_in_lists(self, db, client, driver_factory):
+        """Длинный список ключей делится на несколько SELECT ... IN"""
+        from sqlalchemy import event
+
+        from app.services.driver_service import DriverService
+
+        driver_factory.bulk(client, self.DRIVERS)
+        statements = []
+
+        def count_selects(conn, cursor, statement, parameters, context, executemany):
+            if statement.lstrip().upper().startswith("SELECT"):
+                statements.append(len(parameters))
+
+        engine = db.get_bind()
+        event.listen(engine, "before_cursor_execute", count_selects)
+        try:
+            with patch("app.services.driver_service.LOOKUP_CHUNK_SIZE", 2):
+                rows = DriverService.lookup_drivers(db, [1, 2, 3, 1], ["LOOK00001", "MISSING01"])
+        finally:
+            event.remove(engine, "before_cursor_execute", count_selects)
+
+        assert statements == [2, 1, 2]
+        assert [row.license_number for row in rows] == [
+            "LOOK00001",
+            "LOOK00002",
+            "LOOK00003",
+            "LOOK00004",
+        ]
+
+
+class TestCreateGroupCommit:
+    """Тесты группового commit POST /drivers/ (CreateBatcher)"""
+
+    def _data(self, license_number, user_id=1):
+        return DriverCreateRequest(
+            user_id=user_id, license_number=license_number, years_of_experience=2
+        )
+
+    @pytest.mark.asyncio
+    async def test_concurrent_creates_share_one_commit(self, db):
+        """Конкурентные запросы - одна пачка; дубликат получает IntegrityError"""
+        from app.metrics import CREATE_BATCH_SIZE
+        from app.services.create_batcher import CreateBatcher
+        from app.services.driver_service import DriverService
+        from tests.conftest import TestingSessionLocal
+
+        batcher = CreateBatcher(TestingSessionLocal, max_rows=100, max_delay=0.05)
+        batcher.start()
+        batches = CREATE_BATCH_SIZE.count()
+        try:
+            results = await asyncio.gather(
+                *(batcher.submit(self._data(f"GROUP{i:04d}", user_id=i + 1)) for i in range(5)),
+                batcher.submit(self._data("GROUP0001", user_id=9)),
+                return_exceptions=True,
+            )
+        finally:
+            await batcher.stop()
+
+        drivers, duplicate = results[:5], results[5]
+        assert isinstance(duplicate, IntegrityError)
+        assert [driver.license_number for driver in drivers] == [f"GROUP{i:04d}" for i in range(5)]
+        assert [driver.user_id for driver in drivers] == [1, 2, 3, 4, 5]
+        assert len({driver.id for driver in drivers}) == 5
+        assert CREATE_BATCH_SIZE.count() == batches + 1
+        assert DriverService.get_stats(db).total == 5
+
+    @pytest.mark.asyncio
+    async def test_max_rows_closes_batch(self, db):
+        from app.metrics import CREATE_BATCH_SIZE
+        from app.services.create_batcher import CreateBatcher
+        from tests.conftest import TestingSessionLocal
+
+        batcher = CreateBatcher(TestingSessionLocal, max_rows=2, max_delay=10)
+        batcher.start()
+        batches = CREATE_BATCH_SIZE.count()
+        try:
+            drivers = await asyncio.wait_for(
+                asyncio.gather(*(batcher.submit(self._data(f"ROWS{i:05d}")) for i in range(4))),
+                timeout=5,
+            )
+        finally:
+            await batcher.stop()
+        assert len(drivers) == 4
+        assert CREATE_BATCH_SIZE.count() == batches + 2
+
+    @pytest.mark.asyncio
+    async def test_queue_full_and_drain_on_stop(self, db):
+        """Переполненная очередь отказывает сразу; stop() дописывает очередь"""
+        from app.services.create_batcher import CreateBatcher, CreateQueueFullError
+        from tests.conftest import TestingSessionLocal
+
+        batcher = CreateBatcher(TestingSessionLocal, max_queue=1)  # Без start(): никто не пишет
+        queued = asyncio.ensure_future(batcher.submit(self._data("DRAIN0001")))
+        await asyncio.sleep(0)
+        with pytest.raises(CreateQueueFullError):
+            await batcher.submit(self._data("DRAIN0002"))
+
+        await batcher.stop()
+        assert (await queued).license_number == "DRAIN0001"
+
+    @pytest.mark.asyncio
+    async def test_stop_writes_partially_collected_batch(self, db):
+        """Пачка, собиравшаяся в момент stop(), пишется, а не теряется"""
+        from app.services.create_batcher import CreateBatcher
+        from tests.conftest import TestingSessionLocal
+
+        batcher = CreateBatcher(TestingSessionLocal, max_rows=100, max_delay=10)
+        batcher.start()
+        submitted = [
+            asyncio.ensure_future(batcher.submit(self._data(f"PART{i:05d}"))) for i in range(2)
+        ]
+        # Обе заявки вынуты из очереди и ждут закрытия пачки по max_delay
+        while not batcher._queue.empty() or len(batcher._collecting) < 2:
+            await asyncio.sleep(0.001)
+
+        await batcher.stop()
+        drivers = await asyncio.wait_for(asyncio.gather(*submitted), timeout=5)
+        assert [driver.license_number for driver in drivers] == ["PART00000", "PART00001"]
+
+    @pytest.mark.asyncio
+    async def test_failed_batch_fails_every_request(self, db):
+        from app.services.create_batcher import CreateBatcher
+
+        def broken_session():
+            raise RuntimeError("database is gone")
+
+        batcher = CreateBatcher(broken_session, max_delay=0.01)
+        batcher.start()
+        try:
+            results = await asyncio.gather(
+                batcher.submit(self._data("FAIL00001")),
+                batcher.submit(self._data("FAIL00002")),
+                return_exceptions=True,
+            )
+        finally:
+            await batcher.stop()
+        assert all(isinstance(result, RuntimeError) for result in results)
+
+    @pytest.mark.asyncio
+    async def test_failed_batch_falls_back_to_single_inserts(self, db):
+        """Сбой пачки: каждый запрос получает своего водителя или свой конфликт"""
+        from app.services.create_batcher import CreateBatcher
+        from app.services.driver_service import DriverService
+        from tests.conftest import TestingSessionLocal
+
+        DriverService.create_driver(db, self._data("SOLO00000"))
+        batcher = CreateBatcher(TestingSessionLocal, max_delay=0.05)
+        batcher.start()
+        failure = IntegrityError("INSERT INTO drivers", {}, Exception("retry failed"))
+        try:
+            with patch.object(DriverService, "bulk_create_drivers", side_effect=failure):
+                results = await asyncio.gather(
+                    *(batcher.submit(self._data(f"SOLO{i:05d}")) for i in range(3)),
+                    return_exceptions=True,
+                )
+        finally:
+            await batcher.stop()
+
+        assert isinstance(results[0], IntegrityError) and results[0] is not failure
+        assert [driver.license_number for driver in results[1:]] == ["SOLO00001", "SOLO00002"]
+        assert DriverService.get_stats(db).total == 3
+
+    def test_route_uses_group_commit(self, db):
+        """С create_batch_enabled POST /drivers/ идёт через очередь; переполнение - 503"""
+        from fastapi.testclient import TestClient
+
+        from app.config import Settings
+        from app.main import create_app
+        from app.services.create_batcher import CreateQueueFullError
+        from tests.conftest import SQLALCHEMY_DATABASE_URL
+
+        app = create_app(
+            Settings(
+                database_url=SQLALCHEMY_DATABASE_URL,
+                db_schema_bootstrap="none",
+                create_batch_enabled=True,
+                create_batch_max_delay_ms=1,
+                stats_reconcile_interval_seconds=0,
+            )
+        )
+        payload = {"user_id": 1, "license_number": "ROUTE0001", "years_of_experience": 3}
+        with TestClient(app) as client:
+            created = client.post("/drivers/", json=payload)
+            assert created.status_code == 201
+            assert created.json()["license_number"] == "ROUTE0001"
+            assert client.post("/drivers/", json=payload).status_code == 409
+            # Сбой пачки не превращает чужой запрос в 409
+            with patch(
+                "app.services.create_batcher.DriverService.bulk_create_drivers",
+                side_effect=IntegrityError("INSERT INTO drivers", {}, Exception("batch")),
+            ):
+                fallback = client.post("/drivers/", json={**payload, "license_number": "ROUTE3"})
+                assert fallback.status_code == 201
+                assert client.post("/drivers/", json=payload).status_code == 409
+
+            with patch.object(
+                app.state.create_batcher, "submit", side_effect=CreateQueueFullError("full")
+            ):
+                rejected = client.post("/drivers/", json={**payload, "license_number": "ROUTE2"})
+            assert rejected.status_code == 503
+            assert rejected.headers["Retry-After"] == "1"
+        assert client.app.state.create_batcher._task is None
+
+
+class TestReadReplicaRouting:
+    """Тесты маршрутизации чтений в пул чтения и read-your-writes"""
+
+    def _settings(self, **overrides):
+        from app.config import Settings
+        from tests.conftest import SQLALCHEMY_DATABASE_URL
+
+        return Settings(
+            database_url=SQLALCHEMY_DATABASE_URL,
+            read_database_url=SQLALCHEMY_DATABASE_URL,
+            db_schema_bootstrap="none",
+            stats_reconcile_interval_seconds=0,
+            **overrides,
+        )
+
+    def _count_queries(self, engine):
+        from sqlalchemy import event
+
+        statements = []
+        event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+        return statements
+
+    def test_reads_go_to_read_pool_except_for_recent_writers(self, db):
+        from fastapi.testclient import TestClient
+
+        from app.database.session import get_read_engine
+        from app.main import create_app
+
+        writer, reader = {"X-API-Key": "writer"}, {"X-API-Key": "reader"}
+        payload = {"user_id": 1, "license_number": "READ0001", "years_of_experience": 3}
+        with TestClient(create_app(self._settings(api_keys="writer,reader"))) as client:
+            read_queries = self._count_queries(get_read_engine())
+            created = client.post("/drivers/", json=payload, headers=writer)
+            assert created.status_code == 201
+            assert read_queries == []
+
+            # Писавший клиент читает из основной БД
+            assert len(client.get("/drivers/", headers=writer).json()) == 1
+            assert read_queries == []
+
+            # Остальные - из пула чтения (тот же файл: запись уже видна)
+            page = client.get("/drivers/", headers=reader)
+            assert [driver["license_number"] for driver in page.json()] == ["READ0001"]
+            driver_id = created.json()["id"]
+            assert client.get(f"/drivers/{driver_id}", headers=reader).status_code == 200
+            assert client.get("/drivers/stats", headers=reader).json()["total"] == 1
+            assert read_queries
+
+    def test_read_pool_is_read_only(self, db):
+        from sqlalchemy import text
+        from sqlalchemy.exc import OperationalError
+
+        from app.database.session import dispose_engines, get_read_engine, init_engines
+
+        init_engines(self._settings(db_profile="production"))
+        try:
+            with get_read_engine().connect() as conn:
+                assert conn.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+                with pytest.raises(OperationalError, match="readonly"):
+                    conn.execute(text("DELETE FROM drivers"))
+        finally:
+            asyncio.run(dispose_engines())
+
+    def test_recent_writes_window_and_eviction(self):
+        from app.database.session import RecentWrites
+
+        recent = RecentWrites(window=5, max_clients=2)
+        with patch("app.database.session.time.monotonic", return_value=100.0) as clock:
+            recent.mark("a")
+            assert "a" in recent and "b" not in recent
+            clock.return_value = 105.0
+            assert "a" not in recent
+
+            recent.mark("a")
+            recent.mark("b")
+            recent.mark("c")
+            assert "a" not in recent and "b" in recent and "c" in recent
+
+    @pytest.mark.asyncio
+    async def test_async_read_session_uses_read_pool(self, db):
+        from types import SimpleNamespace
+
+        from sqlalchemy.ext.asyncio import AsyncSession
+        from starlette.requests import Request
+
+        from app.database.session import (
+            dispose_engines,
+            get_read_session,
+            init_engines,
+            recent_writes,
+            track_write,
+        )
+
+        settings = self._settings(db_async=True)
+        init_engines(settings)
+        app = SimpleNamespace(state=SimpleNamespace(settings=settings))
+        request = Request({"type": "http", "headers": [], "client": ("10.0.0.7", 1), "app": app})
+        primary = AsyncSession()
+        try:
+            sessions = get_read_session(request, primary)
+            read_db = await sessions.__anext__()
+            assert read_db is not primary
+            assert read_db.bind.url.drivername == "sqlite+aiosqlite"
+            await sessions.aclose()
+
+            track_write(request)
+            assert "ip:10.0.0.7" in recent_writes
+            sessions = get_read_session(request, primary)
+            assert await sessions.__anext__() is primary
+            await sessions.aclose()
+        finally:
+            await dispose_engines()
+
+
+class TestDriversBulkImport:
+    """Тесты массового импорта POST /drivers/bulk"""
+
+    def test_bulk_json_array_report(self, client):
+        """JSON-массив: созданные, конфликты (БД и внутри импорта) и невалидные строки"""
+        client.post(
+            "/drivers/",
+            json={"user_id": 1, "license_number": "EXIST0001", "years_of_experience": 2},
+        )
+        payload = [
+            {"user_id": 2, "license_number": "BULK00001", "years_of_experience": 3},
+            {"user_id": 3, "license_number": "EXIST0001", "years_of_experience": 3},
+            {"user_id": 0, "license_number": "BAD", "years_of_experience": 3},
+            {"user_id": 4, "license_number": "BULK00001", "years_of_experience": 1},
+            {"user_id": 5, "license_number": "BULK00002", "years_of_experience": 1},
+        ]
+
+        response = client.post("/drivers/bulk", json=payload)
+
+        assert response.status_code == 200
+        report = response.json()
+        assert (report["created"], report["conflicts"], report["invalid"]) == (2, 2, 1)
+        assert [r["status"] for r in report["results"]] == [
+            "CREATED",
+            "CONFLICT",
+            "INVALID",
+            "CONFLICT",
+            "CREATED",
+        ]
+        assert "user_id" in report["results"][2]["detail"]
+        assert len(client.get("/drivers/").json()) == 3
+
+    def test_bulk_ndjson_stream(self, client):
+        """NDJSON обрабатывается построчно, включая пакеты больше BULK_BATCH_SIZE"""
+        from app.services import driver_service
+
+        with (
+            patch.object(driver_service, "BULK_BATCH_SIZE", 2),
+            patch("app.api.drivers.BULK_BATCH_SIZE", 2),
+        ):
+            lines = [
+                f'{{"user_id": {i}, "license_number": "ND{i:06d}", "years_of_experience": 1}}'
+                for i in range(1, 6)
+            ]
+            body = "\n".join(lines[:3]) + "\n\nnot json\n" + "\n".join(lines[3:])
+            response = client.post(
+                "/drivers/bulk",
+                content=body.encode(),
+                headers={"Content-Type": "application/x-ndjson"},
+            )
+
+        report = response.json()
+        assert (report["created"], report["invalid"]) == (5, 1)
+        assert [r["index"] for r in report["results"]] == list(range(6))
+        assert report["results"][3]["status"] == "INVALID"
+
+    def test_bulk_bad_body(self, client):
+        """Не массив или битый JSON - 400"""
+        assert client.post("/drivers/bulk", json={"user_id": 1}).status_code == 400
+        response = client.post(
+            "/drivers/bulk", content=b"[", headers={"Content-Type": "application/json"}
+        )
+        assert response.status_code == 400
+
+    def test_bulk_service_exception(self, client):
+        """Ошибка сервиса превращается в 500"""
+        with patch("app.api.drivers.DriverService.bulk_create_drivers") as mock:
+            mock.side_effect = Exception("DB error")
+            response = client.post(
+                "/drivers/bulk",
+                json=[{"user_id": 1, "license_number": "ERR000001", "years_of_experience": 1}],
+            )
+        assert response.status_code == 500
+
+    def test_bulk_async_path(self, async_client):
+        """Массовый импорт через AsyncSession.run_sync"""
+        response = async_client.post(
+            "/drivers/bulk",
+            json=[{"user_id": 1, "license_number": "ABULK0001", "years_of_experience": 1}],
+        )
+        assert response.json()["created"] == 1
+
+    def test_bulk_retries_after_concurrent_insert(self, db):
+        """IntegrityError от конкурентной вставки - пакет перепроверяется и повторяется"""
+        from app.services.driver_service import DriverService
+
+        rows = [DriverCreateRequest(user_id=1, license_number="RACE00001", years_of_experience=1)]
+        original = DriverService._insert_batch
+        calls = []
+
+        def racing_insert(session, batch, seen):
+            calls.append(1)
+            if len(calls) == 1:
+                DriverService.create_driver(session, rows[0])  # "чужая" вставка
+                raise IntegrityError("mock", "mock", Exception("UNIQUE constraint failed"))
+            return original(session, batch, seen)
+
+        with patch.object(DriverService, "_insert_batch", side_effect=racing_insert):
+            results = DriverService.bulk_create_drivers(db, rows)
+
+        assert [r.status.value for r in results] == ["CONFLICT"]
+
+        with patch.object(DriverService, "_insert_batch", side_effect=Exception("boom")):
+            with pytest.raises(Exception, match="boom"):
+                DriverService.bulk_create_drivers(db, rows)
+
+    def test_bulk_failed_retry_rolls_back(self, db, caplog):
+        """Повторная IntegrityError - откат, запись в лог и исключение наружу"""
+        from app.services.driver_service import DriverService
+
+        rows = [DriverCreateRequest(user_id=1, license_number="RACE00002", years_of_experience=1)]
+        error = IntegrityError("mock", "mock", Exception("UNIQUE constraint failed"))
+
+        with (
+            patch.object(DriverService, "_insert_batch", side_effect=error) as insert_batch,
+            patch.object(db, "rollback", wraps=db.rollback) as rollback,
+        ):
+            with pytest.raises(IntegrityError):
+                DriverService.bulk_create_drivers(db, rows)
+
+        assert insert_batch.call_count == 2
+        assert rollback.call_count == 2
+        assert "Error bulk creating drivers" in caplog.text
+        # Сессия пригодна для следующих запросов
+        assert DriverService.create_driver(db, rows[0]).license_number == "RACE00002"
+
+
+class TestDriverStatusTransitions:
+    """Тесты PATCH /drivers/{id}/status и PATCH /drivers/status"""
+
+    def test_verify_and_reject_with_versions(self, client, driver_factory):
+        """Переход по правилам Driver, версия растёт, устаревшая версия - 409"""
+        driver_id = driver_factory.create(client, "STAT00001")["id"]
+        assert client.get("/drivers/?status=PENDING").json()[0]["id"] == driver_id
+
+        response = client.patch(f"/drivers/{driver_id}/status", json={"status": "VERIFIED"})
+        assert response.status_code == 200
+        assert response.json()["status"] == "VERIFIED"
+        assert response.json()["version"] == 2
+
+        # Закэшированные страницы старого и нового статуса сброшены
+        assert client.get("/drivers/?status=PENDING").json() == []
+        assert client.get("/drivers/?status=VERIFIED").json()[0]["id"] == driver_id
+
+        stale = client.patch(
+            f"/drivers/{driver_id}/status", json={"status": "REJECTED", "version": 1}
+        )
+        assert stale.status_code == 409
+
+        response = client.patch(
+            f"/drivers/{driver_id}/status", json={"status": "REJECTED", "version": 2}
+        )
+        assert response.json()["status"] == "REJECTED"
+        assert response.json()["version"] == 3
+
+    def test_transition_errors(self, client, driver_factory):
+        """Нет водителя - 404, запрещённый переход - 400"""
+        novice_id = driver_factory.create(client, "STAT00002", years_of_experience=0)["id"]
+
+        response = client.patch("/drivers/999999/status", json={"status": "VERIFIED"})
+        assert response.status_code == 404
+        response = client.patch(f"/drivers/{novice_id}/status", json={"status": "VERIFIED"})
+        assert response.status_code == 400
+        response = client.patch(f"/drivers/{novice_id}/status", json={"status": "PENDING"})
+        assert response.status_code == 400
+
+        with patch("app.api.drivers.DriverService.change_status", side_effect=Exception("DB down")):
+            response = client.patch(f"/drivers/{novice_id}/status", json={"status": "REJECTED"})
+        assert response.status_code == 500
+
+    def test_concurrent_modification_detected(self, db):
+        """Строка изменилась между чтением и UPDATE - конфликт вместо перезаписи"""
+        from app.services.driver_service import DriverService, DriverVersionConflictError
+
+        driver = DriverService.create_driver(
+            db, DriverCreateRequest(user_id=1, license_number="STAT00003", years_of_experience=2)
+        )
+        original = DriverService._apply_status_change
+
+        def racing_change(session, current, update_data):
+            # "Чужая" смена статуса после того, как строка уже прочитана
+            original(session, current, DriverUpdateRequest(status=DriverStatus.REJECTED))
+            return original(session, current, update_data)
+
+        with patch.object(DriverService, "_apply_status_change", side_effect=racing_change):
+            with pytest.raises(DriverVersionConflictError):
+                DriverService.change_status(
+                    db, driver.id, DriverUpdateRequest(status=DriverStatus.VERIFIED)
+                )
+
+        # Откатились обе записи, версия не изменилась
+        driver = DriverService.change_status(
+            db, driver.id, DriverUpdateRequest(status=DriverStatus.VERIFIED, version=1)
+        )
+        assert driver.version == 2
+
+    def test_batch_status_change(self, client, driver_factory):
+        """Массовая смена: результат по каждому элементу"""
+        first = driver_factory.create(client, "STAT00004")["id"]
+        second = driver_factory.create(client, "STAT00005", years_of_experience=0)["id"]
+
+        response = client.patch(
+            "/drivers/status",
+            json=[
+                {"id": first, "status": "VERIFIED"},
+                {"id": first, "status": "REJECTED", "version": 2},
+                {"id": first, "status": "VERIFIED", "version": 1},
+                {"id": second, "status": "VERIFIED"},
+                {"id": 999999, "status": "REJECTED"},
+            ],
+        )
+        assert response.status_code == 200
+        report = response.json()
+        assert [r["outcome"] for r in report["results"]] == [
+            "UPDATED",
+            "UPDATED",
+            "CONFLICT",
+            "INVALID",
+            "NOT_FOUND",
+        ]
+        assert report["results"][1]["driver"]["version"] == 3
+        assert (report["updated"], report["conflicts"], report["invalid"]) == (2, 1, 1)
+        assert report["not_found"] == 1
+        assert client.get("/drivers/?status=REJECTED").json()[0]["id"] == first
+
+        with patch(
+            "app.api.drivers.DriverService.change_statuses", side_effect=Exception("DB down")
+        ):
+            response = client.patch("/drivers/status", json=[{"id": first, "status": "VERIFIED"}])
+        assert response.status_code == 500
+
+    def test_status_change_async_path(self, async_client, driver_factory):
+        """Смена статуса через AsyncSession.run_sync"""
+        driver_id = driver_factory.create(async_client, "STAT00006")["id"]
+
+        response = async_client.patch(f"/drivers/{driver_id}/status", json={"status": "REJECTED"})
+        assert response.status_code == 200
+        assert response.json()["version"] == 2
+
+
+class TestDriversExport:
+    """Тесты потоковой выгрузки GET /drivers/export"""
+
+    ROWS = [
+        {"user_id": i + 1, "license_number": f"EXP{i:06d}", "years_of_experience": i}
+        for i in range(5)
+    ]
+
+    def test_export_ndjson_in_batches(self, client, driver_factory):
+        """NDJSON отдаётся потоком, пакетами yield_per"""
+        import json
+
+        driver_factory.bulk(client, self.ROWS)
+        with patch("app.services.driver_service.EXPORT_BATCH_SIZE", 2):
+            response = client.get("/drivers/export")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/x-ndjson"
+        rows = [json.loads(line) for line in response.text.splitlines()]
+        assert [row["license_number"] for row in rows] == [f"EXP{i:06d}" for i in range(5)]
+        assert rows[0] == {
+            "id": rows[0]["id"],
+            "user_id": 1,
+            "license_number": "EXP000000",
+            "years_of_experience": 0,
+            "status": "PENDING",
+        }
+
+    def test_export_csv_with_filters(self, client, driver_factory):
+        """CSV с заголовком, фильтры status и after как у списка"""
+        driver_factory.bulk(client, self.ROWS)
+        cursor = client.get("/drivers/?limit=3").headers["X-Next-Cursor"]
+
+        response = client.get(f"/drivers/export?format=csv&status=PENDING&after={cursor}")
+
+        assert response.headers["content-type"] == "text/csv; charset=utf-8"
+        lines = response.text.splitlines()
+        assert lines[0] == "id,user_id,license_number,years_of_experience,status"
+        assert [line.split(",")[2] for line in lines[1:]] == ["EXP000003", "EXP000004"]
+
+        assert client.get("/drivers/export?status=VERIFIED").text == ""
+        assert client.get("/drivers/export?after=broken").status_code == 400
+
+    def test_export_async_path(self, async_client, driver_factory):
+        """Выгрузка через AsyncSession.stream"""
+        driver_factory.bulk(async_client, self.ROWS[:3])
+        response = async_client.get("/drivers/export?format=csv")
+        assert len(response.text.splitlines()) == 4
+
+
+class TestDriverEncoders:
+    """Тесты быстрого пути сериализации строк"""
+
+    def test_json_array_matches_response_model(self):
+        """encode_json_array совпадает с сериализацией list[DriverResponse]"""
+        import json
+
+        from pydantic import TypeAdapter
+
+        from app.api.encoders import DRIVER_FIELDS, encode_json_array
+        from app.models.db.driver import DriverStatusDB
+        from app.models.schemas.driver import DriverResponse
+
+        rows = [(1, 10, "ROW000001", 3, DriverStatusDB.VERIFIED)]
+        expected = TypeAdapter(list[DriverResponse]).dump_json(
+            [
+                DriverResponse(
+                    **dict(zip(DRIVER_FIELDS, (1, 10, "ROW000001", 3, "VERIFIED"), strict=True))
+                )
+            ]
+        )
+
+        assert json.loads(encode_json_array(rows)) == json.loads(expected)
+        assert encode_json_array([]) == b"[]"
+
+
+class TestDriverListCache:
+    """Тесты read-through кэша списков водителей"""
+
+    def test_listing_served_from_cache_and_invalidated_on_create(self, client):
+        """Повторный список - из кэша; create_driver сбрасывает затронутые страницы"""
+        from app.services.cache import driver_list_cache
+
+        client.post(
+            "/drivers/",
+            json={"user_id": 1, "license_number": "CACHE0001", "years_of_experience": 1},
+        )
+        assert len(client.get("/drivers/").json()) == 1
+        with patch("app.services.driver_service.DriverService._query_driver_rows") as mock:
+            assert len(client.get("/drivers/").json()) == 1
+            mock.assert_not_called()
+
+        client.post(
+            "/drivers/",
+            json={"user_id": 2, "license_number": "CACHE0002", "years_of_experience": 1},
+        )
+        assert len(client.get("/drivers/").json()) == 2
+
+        stats = client.get("/cache/stats").json()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 2
+        assert stats["invalidations"] == 1
+        assert stats["entries"] == 1
+        assert driver_list_cache.stats.hits == 1
+
+    def test_status_change_invalidates_after_commit(self, db):
+        """Смена статуса сбрасывает кэш только после commit: читатель не закэширует старую строку"""
+        from app.services.driver_service import DriverService
+
+        driver = DriverService.create_driver(
+            db, DriverCreateRequest(user_id=1, license_number="CACHE0003", years_of_experience=1)
+        )
+        calls = []
+
+        def invalidate(changed, *statuses):
+            calls.append((changed.status, set(statuses), db.in_transaction()))
+
+        with patch.object(DriverService, "_invalidate_listings", side_effect=invalidate):
+            DriverService.change_status(
+                db, driver.id, DriverUpdateRequest(status=DriverStatus.VERIFIED)
+            )
+            DriverService.change_statuses(
+                db, [DriverStatusChange(id=driver.id, status=DriverStatus.REJECTED)]
+            )
+
+        assert calls == [
+            (DriverStatus.VERIFIED, {DriverStatus.PENDING}, False),
+            (DriverStatus.REJECTED, {DriverStatus.VERIFIED}, False),
+        ]
+
+    def test_precise_invalidation(self):
+        """Сбрасываются только страницы с подходящим статусом и диапазоном id"""
+        from app.models.db.driver import DriverStatusDB
+        from app.services.cache import DriverListCache, DriverPageKey, LRUCache
+
+        cache = DriverListCache(LRUCache())
+
+        def page(*ids):
+            return [(i, 1, f"L{i:05d}", 1, DriverStatusDB.PENDING) for i in ids]
+
+        full_first = DriverPageKey(None, 0, 2, None)
+        last_page = DriverPageKey(None, 0, 2, 2)
+        verified = DriverPageKey(DriverStatus.VERIFIED, 0, 2, None)
+        cache.store(full_first, page(1, 2), cache.generation)
+        cache.store(last_page, page(3), cache.generation)
+        cache.store(verified, [], cache.generation)
+
+        cache.invalidate(4, {DriverStatus.PENDING})  # Новый водитель в конце таблицы
+        assert cache.backend.keys() == [full_first, verified]
+
+        cache.invalidate(1, {DriverStatus.PENDING, DriverStatus.VERIFIED})  # Смена статуса id=1
+        assert cache.backend.keys() == []
+
+    def test_lru_eviction_ttl_and_generation(self):
+        """Вытеснение по размеру и TTL; запись, начатая до инвалидации, не кэшируется"""
+        from app.services.cache import DriverListCache, DriverPageKey, LRUCache
+
+        backend = LRUCache(max_entries=1, ttl_seconds=60)
+        backend.set("a", 1)
+        backend.set("b", 2)
+        assert backend.get("a") is None
+        assert backend.get("b") == 2
+        assert backend.stats.evictions == 1
+
+        with patch("app.services.cache.time.monotonic", return_value=10**9):
+            assert backend.get("b") is None
+        assert backend.stats.evictions == 2
+
+        cache = DriverListCache(LRUCache())
+        key = DriverPageKey(None, 0, 10, None)
+        generation = cache.generation
+        cache.invalidate(1, {DriverStatus.PENDING})
+        cache.store(key, [], generation)
+        assert cache.lookup(key) is None
+        cache.store(key, [], cache.generation)
+        assert cache.lookup(key) is not None
+        assert cache.lookup(key, version=1) is None  # Страница без версии - не для ETag
+        cache.clear()
+
+        cache.enabled = False
+        cache.invalidate(1, {DriverStatus.PENDING})
+        assert cache.load(key, lambda: []).rows == ()
+        assert len(cache.backend) == 0
+
+    def test_async_listing_cached(self, async_client):
+        """Async путь использует тот же кэш"""
+        async_client.post(
+            "/drivers/",
+            json={"user_id": 1, "license_number": "ACACHE001", "years_of_experience": 1},
+        )
+        assert len(async_client.get("/drivers/").json()) == 1
+        assert len(async_client.get("/drivers/").json()) == 1
+        assert async_client.get("/cache/stats").json()["hits"] == 1
+
+
+class TestDriverAsyncPath:
+    """Тесты асинхронного пути (AsyncSession + aiosqlite)"""
+
+    def test_create_and_get_drivers_async_router(self, async_client):
+        """Роутер работает через AsyncSession"""
+        response = async_client.post(
+            "/drivers/",
+            json={"user_id": 7, "license_number": "ASYNC0001", "years_of_experience": 2},
+        )
+        assert response.status_code == 201
+
+        duplicate = async_client.post(
+            "/drivers/",
+            json={"user_id": 7, "license_number": "ASYNC0001", "years_of_experience": 2},
+        )
+        assert duplicate.status_code == 409
+
+        repeated = async_client.post(
+            "/drivers/?on_conflict=return",
+            json={"user_id": 7, "license_number": "ASYNC0001", "years_of_experience": 2},
+        )
+        assert repeated.status_code == 200
+        assert repeated.json()["id"] == response.json()["id"]
+
+        response = async_client.get("/drivers/?status=PENDING")
+        assert response.status_code == 200
+        assert [d["license_number"] for d in response.json()] == ["ASYNC0001"]
+
+    @pytest.mark.asyncio
+    async def test_service_async_methods(self, async_db):
+        """Асинхронные методы DriverService"""
+        from app.services.driver_service import DriverService
+
+        driver = await DriverService.create_driver_async(
+            async_db,
+            DriverCreateRequest(user_id=1, license_number="ASYNC0002", years_of_experience=3),
+        )
+        assert driver.id is not None
+
+        drivers = await DriverService.get_drivers_async(async_db, DriverStatus.VERIFIED)
+        assert drivers == []
+
+        with patch.object(async_db, "execute", side_effect=Exception("DB down")):
+            with pytest.raises(Exception, match="DB down"):
+                await DriverService.get_drivers_async(async_db)
+
+    @pytest.mark.asyncio
+    async def test_get_async_db(self, db, monkeypatch):
+        """get_async_db отдаёт AsyncSession; get_session выбирает вид сессии по настройкам app"""
+        from types import SimpleNamespace
+
+        from sqlalchemy.ext.asyncio import AsyncSession
+        from starlette.requests import Request
+
+        from app.config import Settings
+        from app.database import session
+
+        db_generator = session.get_async_db()
+        async_session = await db_generator.__anext__()
+        assert isinstance(async_session, AsyncSession)
+        await db_generator.aclose()
+
+        for db_async in (False, True):
+            app = SimpleNamespace(state=SimpleNamespace(settings=Settings(db_async=db_async)))
+            sessions = session.get_session(Request({"type": "http", "app": app}), db)
+            selected = await sessions.__anext__()
+            assert (selected is db) is not db_async
+            assert isinstance(selected, AsyncSession) is db_async
+            await sessions.aclose()
+
+        monkeypatch.setenv("AUTOPILOT_DB_ASYNC", "yes")
+        assert Settings.from_env().db_async is True
+
+
 def test_health_check(client):
     """Тест health check эндпоинта"""
     response = client.get("/health")
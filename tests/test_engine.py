@@ -0,0 +1,59 @@
+import pytest
+
+
+class TestDatabaseEngineFactory:
+    """Тесты фабрики движков и профилей SQLite"""
+
+    def test_production_profile_pragmas(self, tmp_path):
+        """Профиль production включает WAL и остальные PRAGMA на каждом соединении"""
+        from sqlalchemy import text
+
+        from app.config import Settings
+        from app.database.engine import create_db_engine
+
+        settings = Settings(
+            database_url=f"sqlite:///{tmp_path / 'prod.db'}",
+            db_profile="production",
+            sqlite_busy_timeout_ms=1234,
+            db_pool_size=3,
+        )
+        engine = create_db_engine(settings)
+        with engine.connect() as conn:
+            assert conn.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+            assert conn.execute(text("PRAGMA synchronous")).scalar() == 1  # NORMAL
+            assert conn.execute(text("PRAGMA busy_timeout")).scalar() == 1234
+            assert conn.execute(text("PRAGMA cache_size")).scalar() == -65536
+        assert engine.pool.size() == 3
+        engine.dispose()
+
+    @pytest.mark.asyncio
+    async def test_async_engine_and_memory_database(self, tmp_path):
+        """Async-движок берёт URL из database_url; in-memory БД - StaticPool"""
+        from sqlalchemy import text
+        from sqlalchemy.pool import AsyncAdaptedQueuePool, StaticPool
+
+        from app.config import Settings
+        from app.database.engine import create_async_db_engine, create_db_engine
+
+        settings = Settings(
+            database_url=f"sqlite:///{tmp_path / 'async.db'}", db_profile="production"
+        )
+        async_engine = create_async_db_engine(settings)
+        assert isinstance(async_engine.pool, AsyncAdaptedQueuePool)
+        async with async_engine.connect() as conn:
+            assert (await conn.execute(text("PRAGMA journal_mode"))).scalar() == "wal"
+        await async_engine.dispose()
+
+        memory_engine = create_db_engine(Settings(database_url="sqlite://"))
+        assert isinstance(memory_engine.pool, StaticPool)
+        assert Settings(async_database_url="sqlite+aiosqlite://").resolved_async_database_url == (
+            "sqlite+aiosqlite://"
+        )
+
+    def test_invalid_pragma_value(self):
+        """Значения PRAGMA подставляются в SQL, поэтому проверяются"""
+        from app.config import Settings
+        from app.database.engine import create_db_engine
+
+        with pytest.raises(ValueError, match="journal_mode"):
+            create_db_engine(Settings(sqlite_journal_mode="WAL; DROP TABLE drivers"))
@@ -0,0 +1,125 @@
+from unittest.mock import patch
+
+import pytest
+
+
+class TestMetrics:
+    """Тесты /metrics: латентность маршрутов, запросы к БД, таймеры сервиса"""
+
+    def test_prometheus_exposition(self, client):
+        """Запросы попадают в гистограммы по шаблону маршрута"""
+        from app.metrics import DB_QUERIES_PER_REQUEST, HTTP_REQUEST_DURATION, SERVICE_DURATION
+
+        route = "/drivers/{driver_id}/status"
+        requests_before = HTTP_REQUEST_DURATION.count(method="PATCH", route=route, status="200")
+        creates_before = SERVICE_DURATION.count(operation="create_driver")
+
+        driver_id = client.post(
+            "/drivers/",
+            json={"user_id": 1, "license_number": "METRIC001", "years_of_experience": 2},
+        ).json()["id"]
+        client.patch(f"/drivers/{driver_id}/status", json={"status": "VERIFIED"})
+        client.get("/no-such-page")
+
+        assert (
+            HTTP_REQUEST_DURATION.count(method="PATCH", route=route, status="200")
+            == requests_before + 1
+        )
+        assert SERVICE_DURATION.count(operation="create_driver") == creates_before + 1
+
+        response = client.get("/metrics")
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+        body = response.text
+        assert "# TYPE autopilot_http_request_duration_seconds histogram" in body
+        assert (
+            'autopilot_http_request_duration_seconds_bucket{method="PATCH",'
+            'route="/drivers/{driver_id}/status",status="200",le="+Inf"}'
+        ) in body
+        assert 'route="unmatched",status="404"' in body
+        assert 'autopilot_db_query_duration_seconds_count{statement="UPDATE"}' in body
+        assert 'autopilot_service_duration_seconds_sum{operation="change_status"}' in body
+        assert "autopilot_drivers_created_total " in body
+
+        # PATCH статуса: SELECT версии + условный UPDATE ... RETURNING
+        assert DB_QUERIES_PER_REQUEST.count(route=route) >= 1
+        assert 'autopilot_db_queries_per_request_bucket{route="/drivers/{driver_id}/status"' in body
+
+    def test_failed_statements_are_timed(self, db):
+        """Упавшее выражение попадает в метрики и не оставляет состояния на соединении"""
+        from sqlalchemy import text
+        from sqlalchemy.exc import OperationalError
+
+        from app.metrics import DB_QUERY_DURATION, DB_QUERY_ERRORS
+
+        timed_before = DB_QUERY_DURATION.count(statement="INSERT")
+        errors_before = DB_QUERY_ERRORS.value(statement="INSERT")
+        connection = db.connection()
+        info = dict(connection.info)
+        for _ in range(3):
+            with pytest.raises(OperationalError):
+                connection.execute(text("INSERT INTO no_such_table VALUES (1)"))
+
+        assert DB_QUERY_DURATION.count(statement="INSERT") == timed_before + 3
+        assert DB_QUERY_ERRORS.value(statement="INSERT") == errors_before + 3
+        assert dict(connection.info) == info
+
+    def test_registry_primitives(self):
+        """Формат счётчиков и гистограмм, экранирование меток, выключенный реестр"""
+        from app.metrics import SERVICE_DURATION, MetricsRegistry, metrics, timed
+
+        registry = MetricsRegistry()
+        counter = registry.counter("test_total", "Test counter", ("kind",))
+        counter.inc(kind='a"b')
+        counter.inc(2.5, kind='a"b')
+        histogram = registry.histogram("test_seconds", "Test histogram", buckets=(0.1, 1.0))
+        histogram.observe(0.05)
+        histogram.observe(5)
+        with pytest.raises(ValueError):
+            registry.counter("test_total", "Duplicate")
+
+        assert registry.render().splitlines() == [
+            "# HELP test_total Test counter",
+            "# TYPE test_total counter",
+            'test_total{kind="a\\"b"} 3.5',
+            "# HELP test_seconds Test histogram",
+            "# TYPE test_seconds histogram",
+            'test_seconds_bucket{le="0.1"} 1',
+            'test_seconds_bucket{le="1"} 1',
+            'test_seconds_bucket{le="+Inf"} 2',
+            "test_seconds_sum 5.05",
+            "test_seconds_count 2",
+        ]
+
+        def operation():
+            return 42
+
+        # Флаг проверяется при вызове: lifespan выставляет его после импорта сервисов
+        wrapped = timed("noop")(operation)
+        with patch.object(metrics, "enabled", False):
+            assert wrapped() == 42
+        assert SERVICE_DURATION.count(operation="noop") == 0
+
+    @pytest.mark.asyncio
+    async def test_async_service_timer(self, async_db):
+        """timed() оборачивает и корутины"""
+        from app.metrics import SERVICE_DURATION
+        from app.services.driver_service import DriverService
+
+        before = SERVICE_DURATION.count(operation="get_driver_rows_async")
+        await DriverService.get_driver_rows_async(async_db)
+        assert SERVICE_DURATION.count(operation="get_driver_rows_async") == before + 1
+
+    def test_engine_without_metrics(self, tmp_path):
+        """AUTOPILOT_METRICS_ENABLED=0 - движок без хуков SQLAlchemy"""
+        from app.config import Settings
+        from app.database.engine import create_db_engine
+
+        url = f"sqlite:///{tmp_path / 'plain.db'}"
+        engine = create_db_engine(Settings(database_url=url, metrics_enabled=False))
+        assert not engine.dispatch.before_cursor_execute
+        engine.dispose()
+
+        engine = create_db_engine(Settings(database_url=url))
+        assert engine.dispatch.before_cursor_execute
+        engine.dispose()
@@ -0,0 +1,142 @@
+import json
+
+import pytest
+
+
+class TestRequestProfiling:
+    """Тесты профилирования запросов и журнала медленных SQL-выражений"""
+
+    def _app(self, **overrides):
+        from app.config import Settings
+        from app.main import create_app
+        from tests.conftest import SQLALCHEMY_DATABASE_URL
+
+        return create_app(
+            Settings(
+                database_url=SQLALCHEMY_DATABASE_URL,
+                db_schema_bootstrap="none",
+                stats_reconcile_interval_seconds=0,
+                **overrides,
+            )
+        )
+
+    def _profiles(self, caplog):
+        return [
+            json.loads(record.getMessage().split(" ", 2)[2])
+            for record in caplog.records
+            if record.name == "app.api.profiling"
+        ]
+
+    def test_profile_header_adds_server_timing(self, db, caplog):
+        from fastapi.testclient import TestClient
+
+        caplog.set_level("INFO", logger="app.api.profiling")
+        payload = {"user_id": 1, "license_number": "PROF0001", "years_of_experience": 3}
+        with TestClient(self._app(profile_header_enabled=True)) as client:
+            created = client.post("/drivers/", json=payload, headers={"X-Profile": "1"})
+            plain = client.get("/drivers/")
+            profiled = client.get("/drivers/?limit=10", headers={"X-Profile": "1"})
+
+        assert created.status_code == 201
+        assert "conversion;dur=" in created.headers["Server-Timing"]
+        assert "Server-Timing" not in plain.headers
+        timing = profiled.headers["Server-Timing"]
+        assert timing.startswith("db;dur=") and "serialization;dur=" in timing
+        assert "total;dur=" in timing
+
+        [create, page] = self._profiles(caplog)
+        assert create["status"] == 201
+        assert any(query["statement"].startswith("INSERT") for query in create["queries"])
+        assert page["path"] == "/drivers/" and page["status"] == 200
+        assert page["phases"]["serialization"]["calls"] == 1
+        assert any(query["statement"].startswith("SELECT") for query in page["queries"])
+        assert page["db_ms"] <= page["handler_ms"] <= page["total_ms"]
+
+    def test_sampled_requests_are_logged_without_header(self, db, caplog):
+        from fastapi.testclient import TestClient
+
+        caplog.set_level("INFO", logger="app.api.profiling")
+        with TestClient(self._app(profile_sample_rate=1.0)) as client:
+            # Заголовок без profile_header_enabled не учитывается
+            response = client.get("/drivers/stats", headers={"X-Profile": "1"})
+        assert "Server-Timing" not in response.headers
+        [profile] = self._profiles(caplog)
+        assert profile["path"] == "/drivers/stats"
+        assert profile["queries"]
+
+    def test_slow_query_log_attaches_plan(self, db, caplog):
+        from sqlalchemy import create_engine, text
+
+        from app.database.engine import install_query_profiling
+        from app.metrics import DB_SLOW_QUERIES
+        from app.profiling import RequestProfile, current_profile
+        from tests.conftest import SQLALCHEMY_DATABASE_URL
+
+        engine = create_engine(SQLALCHEMY_DATABASE_URL)
+        install_query_profiling(engine, 1e-9)
+        slow_selects = DB_SLOW_QUERIES.value(statement="SELECT")
+        profile = RequestProfile()
+        token = current_profile.set(profile)
+        try:
+            with engine.begin() as conn:
+                conn.execute(
+                    text("SELECT id FROM drivers WHERE license_number = :number"),
+                    {"number": "SLOW0001"},
+                ).all()
+                conn.execute(
+                    text(
+                        "INSERT INTO drivers (user_id, license_number, years_of_experience, "
+                        "status, version) VALUES (:u, :n, 1, 'PENDING', 1)"
+                    ),
+                    [{"u": 1, "n": "SLOW0002"}, {"u": 2, "n": "SLOW0003"}],
+                )
+        finally:
+            current_profile.reset(token)
+            engine.dispose()
+
+        select, insert = profile.queries
+        assert "license_number" in select.plan
+        assert insert.plan is None  # executemany не объясняется
+        assert DB_SLOW_QUERIES.value(statement="SELECT") == slow_selects + 1
+        warnings = [
+            record.getMessage() for record in caplog.records if record.levelname == "WARNING"
+        ]
+        assert any("Slow query" in message and select.plan in message for message in warnings)
+
+    def test_failed_statement_in_profile(self, db):
+        """Упавшее выражение - в профиле с ошибкой, без состояния на соединении"""
+        from sqlalchemy import text
+        from sqlalchemy.exc import OperationalError
+
+        from app.profiling import RequestProfile, current_profile
+
+        profile = RequestProfile()
+        token = current_profile.set(profile)
+        connection = db.connection()
+        info = dict(connection.info)
+        try:
+            for _ in range(3):
+                with pytest.raises(OperationalError):
+                    connection.execute(text("SELECT * FROM no_such_table"))
+        finally:
+            current_profile.reset(token)
+
+        assert [query.error.split(":")[0] for query in profile.queries] == ["OperationalError"] * 3
+        assert "no_such_table" in profile.as_dict(1.0)["queries"][0]["error"]
+        assert dict(connection.info) == info
+
+    def test_explain_statement_skips_other_statements(self, db):
+        from app.database.engine import explain_statement
+        from tests.conftest import engine
+
+        with engine.connect() as conn:
+            dbapi_connection = conn.connection.dbapi_connection
+            assert explain_statement(dbapi_connection, "sqlite", "PRAGMA user_version", ()) is None
+            assert explain_statement(dbapi_connection, "mysql", "SELECT 1", ()) is None
+
+    def test_profiled_without_profile_is_plain_call(self):
+        from app.profiling import profiled
+
+        calls = []
+        wrapped = profiled("conversion")(lambda value: calls.append(value) or value)
+        assert wrapped(3) == 3 and calls == [3]
@@ -0,0 +1,181 @@
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import create_engine, event, inspect, select
+
+from app.database.migrate import alembic_config, schema_matches_models, upgrade_database
+from app.models.db.driver import DriverDB
+from app.models.domain.driver import DriverStatus
+from app.models.schemas.driver import DriverCreateRequest
+from app.services.driver_service import DriverService
+
+
+@contextmanager
+def captured_selects(engine):
+    """SELECT-запросы (SQL + параметры), выполненные через engine"""
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+def query_plan(connection, statement, parameters):
+    rows = connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).all()
+    return [row[3] for row in rows]
+
+
+def assert_indexed(plan):
+    """Нет полного прохода по drivers (и журналу изменений) и сортировки во временном B-дереве"""
+    for table in ("drivers", "driver_changes"):
+        assert not any(step.split()[:2] == ["SCAN", table] for step in plan), plan
+    assert not any("TEMP B-TREE" in step for step in plan), plan
+
+
+class TestHotQueryPlans:
+    """EXPLAIN QUERY PLAN горячих запросов DriverService"""
+
+    @pytest.mark.parametrize(
+        "call",
+        [
+            pytest.param(lambda db: DriverService.get_drivers(db, after_id=10), id="keyset"),
+            pytest.param(
+                lambda db: DriverService.get_drivers(db, DriverStatus.VERIFIED, after_id=10),
+                id="status+keyset",
+            ),
+            pytest.param(
+                lambda db: DriverService.get_drivers(db, DriverStatus.PENDING, skip=20),
+                id="status+offset",
+            ),
+            pytest.param(
+                lambda db: [
+                    DriverService.get_or_create_driver(
+                        db,
+                        DriverCreateRequest(
+                            user_id=1, license_number="PLAN00001", years_of_experience=1
+                        ),
+                    )
+                    for _ in range(2)
+                ],
+                id="get-or-create-conflict-lookup",
+            ),
+            pytest.param(
+                lambda db: DriverService.bulk_create_drivers(
+                    db,
+                    [
+                        DriverCreateRequest(
+                            user_id=1, license_number="PLAN00002", years_of_experience=1
+                        )
+                    ],
+                ),
+                id="bulk-duplicate-check",
+            ),
+            pytest.param(
+                lambda db: db.execute(select(DriverDB.id).where(DriverDB.user_id == 1)).all(),
+                id="by-user-id",
+            ),
+            pytest.param(
+                lambda db: [
+                    DriverService.search_drivers(db, "PLAN", after=position)
+                    for position in (None, (1, "PLAN0"), (2, 1))
+                ],
+                id="search-phases",
+            ),
+            pytest.param(
+                lambda db: DriverService.lookup_drivers(db, [1, 2, 3], ["PLAN1", "PLAN2"]),
+                id="lookup",
+            ),
+            pytest.param(
+                lambda db: DriverService.get_changes(db, 10, DriverStatus.VERIFIED),
+                id="changes-by-status",
+            ),
+        ],
+    )
+    def test_hot_query_uses_index(self, db, call):
+        engine = db.get_bind()
+        with captured_selects(engine) as statements:
+            call(db)
+
+        assert statements
+        with engine.connect() as connection:
+            for statement, parameters in statements:
+                assert_indexed(query_plan(connection, statement, parameters))
+
+    def test_unfiltered_listing_walks_primary_key(self, db):
+        """Без фильтра список идёт по rowid в порядке id, без сортировки"""
+        engine = db.get_bind()
+        with captured_selects(engine) as statements:
+            DriverService.get_drivers(db)
+
+        with engine.connect() as connection:
+            plan = query_plan(connection, *statements[0])
+        assert plan == ["SCAN drivers"]
+
+
+class TestMigrations:
+    """Тесты миграций Alembic"""
+
+    def test_migrations_match_models(self, tmp_path):
+        """upgrade head даёт ту же схему, что и модели; downgrade до base работает"""
+        from alembic import command
+
+        engine = create_engine(f"sqlite:///{tmp_path / 'migrated.db'}")
+        upgrade_database(engine)
+
+        with engine.connect() as connection:
+            assert schema_matches_models(connection)
+        indexes = {index["name"] for index in inspect(engine).get_indexes("drivers")}
+        assert {"ix_drivers_status_id", "ix_drivers_user_id"} <= indexes
+
+        with engine.begin() as connection:
+            config = alembic_config()
+            config.attributes["connection"] = connection
+            command.downgrade(config, "base")
+        assert inspect(engine).get_table_names() == ["alembic_version"]
+        engine.dispose()
+
+    def test_legacy_database_is_adopted(self, tmp_path):
+        """БД без alembic_version (create_all до миграций) помечается и догоняется"""
+        engine = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+        upgrade_database(engine, "0001")
+        with engine.begin() as connection:
+            connection.exec_driver_sql("DROP TABLE alembic_version")
+            # Схема 0001 ещё без колонок последующих ревизий - вставка без ORM
+            connection.exec_driver_sql(
+                "INSERT INTO drivers (user_id, license_number, years_of_experience, status)"
+                " VALUES (1, 'LEGACY001', 1, 'PENDING')"
+            )
+
+        upgrade_database(engine)
+
+        with engine.connect() as connection:
+            assert schema_matches_models(connection)
+            version = connection.exec_driver_sql("SELECT version_num FROM alembic_version")
+            assert version.scalar() == "0009"
+            assert connection.exec_driver_sql("SELECT count(*) FROM drivers").scalar() == 1
+            # Счётчики статистики заполнены по существующим строкам
+            stats = connection.exec_driver_sql(
+                "SELECT status, experience_bucket, shard, count FROM driver_stats"
+            )
+            assert stats.all() == [("PENDING", 0, 1, 1)]
+        engine.dispose()
+
+    def test_create_all_database_is_stamped_head(self, tmp_path):
+        """Схема, уже совпадающая с моделями, помечается head без повторных миграций"""
+        from app.database.session import Base
+
+        engine = create_engine(f"sqlite:///{tmp_path / 'fresh.db'}")
+        Base.metadata.create_all(bind=engine)
+
+        upgrade_database(engine)
+
+        with engine.connect() as connection:
+            version = connection.exec_driver_sql("SELECT version_num FROM alembic_version")
+            assert version.scalar() == "0009"
+        engine.dispose()
@@ -0,0 +1,357 @@
+"""
+Контрактные тесты хранилища: одни и те же сценарии DriverService на SQLite и
+PostgreSQL (psycopg - синхронный Session, asyncpg - AsyncSession.run_sync).
+
+PostgreSQL берётся из AUTOPILOT_TEST_POSTGRES_URL или запускается локально
+пакетом pgserver; без них postgres-варианты пропускаются.
+"""
+
+import asyncio
+import os
+import threading
+
+import pytest
+from sqlalchemy import create_engine, inspect, text, update
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+
+from app.config import Settings
+from app.database.engine import EXPLAIN_PREFIXES, install_query_profiling
+from app.database.migrate import schema_matches_models, upgrade_database
+from app.database.session import Base
+from app.models.db.driver import DriverChangeOperationDB, DriverStatsDB
+from app.models.domain.driver import DriverStatus
+from app.models.schemas.driver import (
+    BulkDriverStatus,
+    DriverCreateRequest,
+    DriverStatusChange,
+    DriverUpdateRequest,
+    StatusChangeOutcome,
+)
+from app.profiling import RequestProfile, current_profile
+from app.services.driver_service import (
+    DriverChangesPrunedError,
+    DriverService,
+    DriverVersionConflictError,
+)
+from app.services.repository import (
+    PostgresDriverRepository,
+    SQLiteDriverRepository,
+    get_repository,
+)
+
+BACKENDS = ["sqlite", "postgresql+psycopg", "postgresql+asyncpg"]
+
+
+@pytest.fixture(scope="session")
+def postgres_url(tmp_path_factory):
+    """URL PostgreSQL для тестов или skip"""
+    url = os.environ.get("AUTOPILOT_TEST_POSTGRES_URL")
+    if url:
+        yield url
+        return
+    pgserver = pytest.importorskip("pgserver")
+    server = pgserver.get_server(tmp_path_factory.mktemp("pgdata"), cleanup_mode="stop")
+    try:
+        yield server.get_uri()
+    finally:
+        server.cleanup()
+
+
+class Backend:
+    """Вызов метода DriverService с сессией выбранного хранилища"""
+
+    def __init__(self, name, url):
+        self.name = name
+        self.url = url
+        if name == "postgresql+asyncpg":
+            self.loop = asyncio.new_event_loop()
+            self.engine = create_async_engine(url, poolclass=NullPool)
+            self.session = async_sessionmaker(self.engine, expire_on_commit=False)()
+        else:
+            self.engine = create_engine(url, poolclass=NullPool)
+            self.session = sessionmaker(bind=self.engine, autoflush=False)()
+
+    def call(self, func, *args):
+        if self.name == "postgresql+asyncpg":
+            return self.loop.run_until_complete(self.session.run_sync(func, *args))
+        return func(self.session, *args)
+
+    def run(self, fn):
+        """fn(connection) в отдельной транзакции"""
+        if self.name == "postgresql+asyncpg":
+
+            async def run_async():
+                async with self.engine.begin() as connection:
+                    return await connection.run_sync(fn)
+
+            return self.loop.run_until_complete(run_async())
+        with self.engine.begin() as connection:
+            return fn(connection)
+
+    def close(self):
+        """Закрытие сессии, удаление таблиц и движка"""
+        if self.name == "postgresql+asyncpg":
+            self.loop.run_until_complete(self.session.close())
+            self.run(lambda connection: Base.metadata.drop_all(connection))
+            self.loop.run_until_complete(self.engine.dispose())
+            self.loop.close()
+        else:
+            self.session.close()
+            self.run(lambda connection: Base.metadata.drop_all(connection))
+            self.engine.dispose()
+
+
+def _backend_url(name, tmp_path, postgres_url):
+    if name == "sqlite":
+        return f"sqlite:///{tmp_path / 'contract.db'}"
+    return make_url(postgres_url).set(drivername=name).render_as_string(hide_password=False)
+
+
+@pytest.fixture(params=BACKENDS)
+def backend(request, tmp_path):
+    postgres_url = None
+    if request.param != "sqlite":
+        postgres_url = request.getfixturevalue("postgres_url")
+    backend = Backend(request.param, _backend_url(request.param, tmp_path, postgres_url))
+    backend.run(lambda connection: Base.metadata.drop_all(connection))
+    backend.run(lambda connection: Base.metadata.create_all(connection))
+    try:
+        yield backend
+    finally:
+        backend.close()
+
+
+def _request(license_number, user_id=1, years=5):
+    return DriverCreateRequest(
+        user_id=user_id, license_number=license_number, years_of_experience=years
+    )
+
+
+class TestStorageContract:
+    """Поведение DriverService не зависит от хранилища"""
+
+    def test_repository_by_dialect(self, backend):
+        repository = backend.call(get_repository)
+        expected = SQLiteDriverRepository if backend.name == "sqlite" else PostgresDriverRepository
+        assert isinstance(repository, expected)
+
+    def test_create_and_duplicate(self, backend):
+        driver = backend.call(DriverService.create_driver, _request("AB1234567"))
+        assert driver.id is not None
+        assert driver.status == DriverStatus.PENDING
+
+        with pytest.raises(IntegrityError):
+            backend.call(DriverService.create_driver, _request("AB1234567", user_id=2))
+
+        same, created = backend.call(DriverService.get_or_create_driver, _request("AB1234567"))
+        assert (same.id, created) == (driver.id, False)
+        other, created = backend.call(DriverService.get_or_create_driver, _request("CD7654321"))
+        assert created and other.id > driver.id
+        with pytest.raises(IntegrityError):
+            backend.call(DriverService.get_or_create_driver, _request("CD7654321", user_id=9))
+
+    def test_bulk_create(self, backend):
+        backend.call(DriverService.create_driver, _request("BULK00002"))
+        requests = [_request(f"BULK{i:05d}", years=i % 25) for i in range(1200)]
+        requests.append(_request("BULK00010"))
+
+        results = backend.call(DriverService.bulk_create_drivers, requests)
+
+        assert sorted(result.index for result in results) == list(range(1201))
+        conflicts = [
+            result.index for result in results if result.status == BulkDriverStatus.CONFLICT
+        ]
+        assert sorted(conflicts) == [2, 1200]
+        created = sorted(
+            (result for result in results if result.status == BulkDriverStatus.CREATED),
+            key=lambda result: result.index,
+        )
+        assert len(created) == 1199
+        # id соответствуют номерам прав в порядке запроса
+        rows = backend.call(DriverService.get_driver_rows, None, 0, 2000)
+        by_license = {row.license_number: row.id for row in rows}
+        assert all(by_license[result.license_number] == result.id for result in created)
+        assert [result.id for result in created] == sorted(result.id for result in created)
+
+        stats = backend.call(DriverService.get_stats)
+        assert stats.total == 1200
+        assert backend.call(DriverService.reconcile_stats) == 0
+        changes = backend.call(DriverService.get_changes, 0, None, 2000)
+        assert len(changes) == 1200
+        assert backend.call(DriverService.get_table_version) == changes[-1].seq
+
+    def test_status_changes(self, backend):
+        driver = backend.call(DriverService.create_driver, _request("ST1234567"))
+        verified = backend.call(
+            DriverService.change_status,
+            driver.id,
+            DriverUpdateRequest(status=DriverStatus.VERIFIED, version=1),
+        )
+        assert (verified.status, verified.version) == (DriverStatus.VERIFIED, 2)
+        with pytest.raises(DriverVersionConflictError):
+            backend.call(
+                DriverService.change_status,
+                driver.id,
+                DriverUpdateRequest(status=DriverStatus.REJECTED, version=1),
+            )
+
+        other = backend.call(DriverService.create_driver, _request("ST7654321"))
+        results = backend.call(
+            DriverService.change_statuses,
+            [
+                DriverStatusChange(id=other.id, status=DriverStatus.REJECTED),
+                DriverStatusChange(id=other.id + 100, status=DriverStatus.REJECTED),
+            ],
+        )
+        assert [result.outcome for result in results] == [
+            StatusChangeOutcome.UPDATED,
+            StatusChangeOutcome.NOT_FOUND,
+        ]
+        stats = backend.call(DriverService.get_stats)
+        assert stats.by_status[DriverStatus.VERIFIED] == 1
+        assert stats.by_status[DriverStatus.REJECTED] == 1
+        assert stats.by_status[DriverStatus.PENDING] == 0
+
+    def test_search_ranking(self, backend):
+        for license_number in ("XAB1230", "AB12300", "AB123", "AB12399", "ZZAB123", "QQ99999"):
+            backend.call(DriverService.create_driver, _request(license_number))
+
+        rows, position = backend.call(DriverService.search_drivers, "AB123", 3)
+        assert [row.license_number for row in rows] == ["AB123", "AB12300", "AB12399"]
+        rows, position = backend.call(DriverService.search_drivers, "AB123", 10, position)
+        assert [row.license_number for row in rows] == ["XAB1230", "ZZAB123"]
+        assert position is None
+        # Подстрока - без учёта регистра
+        rows, _ = backend.call(DriverService.search_drivers, "zab", 10)
+        assert [row.license_number for row in rows] == ["ZZAB123"]
+        # Спецсимволы LIKE/FTS5 ищутся как обычные
+        assert backend.call(DriverService.search_drivers, '%_"', 10)[0] == []
+
+    def test_stream_batches(self, backend):
+        backend.call(
+            DriverService.bulk_create_drivers, [_request(f"STREAM{i:04d}") for i in range(25)]
+        )
+
+        def batches(db):
+            return [len(batch) for batch in DriverService.iter_driver_batches(db, None, 5, 10)]
+
+        assert backend.call(batches) == [10, 10]
+
+    def test_change_feed_overlapping_transactions(self, backend):
+        """
+        Изменение, записанное в журнал раньше, а закоммиченное позже другого,
+        не пропадает из ленты: второй писатель журнала ждёт commit первого.
+        """
+        driver = backend.call(DriverService.create_driver, _request("ORD000001"))
+        cursor = backend.call(DriverService.get_table_version)
+        url = make_url(backend.url)
+        if backend.name != "sqlite":
+            url = url.set(drivername="postgresql+psycopg")
+        other_engine = create_engine(url, poolclass=NullPool)
+        other_session = sessionmaker(bind=other_engine, autoflush=False)
+
+        def read_feed(after):
+            with other_session() as reader:
+                return [row.seq for row in DriverService.get_changes(reader, after)]
+
+        errors = []
+
+        def create_concurrently():
+            try:
+                with other_session() as writer:
+                    DriverService.create_driver(writer, _request("ORD000002"))
+            except Exception as e:  # pragma: no cover - видно в assert ниже
+                errors.append(e)
+
+        try:
+            # Первая транзакция пишет в журнал и пока не фиксируется
+            row = backend.call(DriverService.get_driver_row, driver.id)
+            backend.call(DriverService._log_changes, DriverChangeOperationDB.STATUS_CHANGED, [row])
+            writer = threading.Thread(target=create_concurrently)
+            writer.start()
+            writer.join(0.5)
+            assert writer.is_alive()
+            # Читатель не видит более поздний seq раньше незакоммиченного
+            assert read_feed(cursor) == []
+            # Версия таблицы (ETag списков) не обгоняет незакоммиченную запись
+            with other_session() as reader:
+                assert DriverService.get_table_version(reader) == cursor
+
+            backend.call(lambda db: db.commit())
+            writer.join(10)
+            assert not writer.is_alive() and errors == []
+            seqs = read_feed(cursor)
+            assert len(seqs) == 2 and seqs == sorted(seqs)
+            assert backend.call(DriverService.get_table_version) == seqs[-1]
+        finally:
+            other_engine.dispose()
+
+    def test_prune_changes(self, backend):
+        for i in range(3):
+            backend.call(DriverService.create_driver, _request(f"PR{i:07d}"))
+        seqs = [row.seq for row in backend.call(DriverService.get_changes)]
+
+        assert backend.call(DriverService.prune_changes, 1) == 2
+        with pytest.raises(DriverChangesPrunedError) as excinfo:
+            backend.call(DriverService.get_changes, seqs[0])
+        assert excinfo.value.last_seq == seqs[-1]
+        assert [row.seq for row in backend.call(DriverService.get_changes, seqs[1])] == seqs[2:]
+        assert backend.call(DriverService.get_table_version) == seqs[-1]
+
+    def test_failed_explain_keeps_transaction(self, backend, monkeypatch):
+        """Упавший EXPLAIN медленного выражения не прерывает транзакцию запроса"""
+        sync_engine = getattr(backend.engine, "sync_engine", backend.engine)
+        install_query_profiling(sync_engine, 1e-9)
+        monkeypatch.setitem(EXPLAIN_PREFIXES, "postgresql", "EXPLAIN (NO_SUCH) ")
+        monkeypatch.setitem(EXPLAIN_PREFIXES, "sqlite", "EXPLAIN NO_SUCH ")
+        profile = RequestProfile()
+        token = current_profile.set(profile)
+        try:
+            backend.call(DriverService.create_driver, _request("EX1234567"))
+            assert backend.call(DriverService.get_stats).total == 1
+        finally:
+            current_profile.reset(token)
+        assert any((query.plan or "").startswith("EXPLAIN failed") for query in profile.queries)
+
+    def test_reconcile_repairs_drift(self, backend):
+        backend.call(DriverService.create_driver, _request("RC1234567"))
+        backend.run(lambda connection: connection.execute(update(DriverStatsDB).values(count=7)))
+        assert backend.call(DriverService.reconcile_stats) == 1
+        assert backend.call(DriverService.get_stats).total == 1
+
+
+@pytest.mark.parametrize("backend_name", ["sqlite", "postgresql+psycopg"])
+def test_migrations_match_models(backend_name, tmp_path, request):
+    """Миграции до head дают схему моделей на обоих хранилищах"""
+    postgres_url = request.getfixturevalue("postgres_url") if backend_name != "sqlite" else None
+    engine = create_engine(_backend_url(backend_name, tmp_path, postgres_url), poolclass=NullPool)
+    try:
+        with engine.begin() as connection:
+            Base.metadata.drop_all(connection)
+            connection.execute(text("DROP TABLE IF EXISTS alembic_version"))
+        upgrade_database(engine)
+        with engine.connect() as connection:
+            assert schema_matches_models(connection)
+            if backend_name != "sqlite":
+                # Индекс pg_trgm - только если расширение есть в сборке PostgreSQL
+                available = connection.scalar(
+                    text("SELECT count(*) FROM pg_available_extensions WHERE name = 'pg_trgm'")
+                )
+                indexes = {index["name"] for index in inspect(connection).get_indexes("drivers")}
+                assert ("ix_drivers_license_number_trgm" in indexes) == bool(available)
+    finally:
+        with engine.begin() as connection:
+            Base.metadata.drop_all(connection)
+            connection.execute(text("DROP TABLE IF EXISTS alembic_version"))
+        engine.dispose()
+
+
+def test_async_url_for_postgres():
+    settings = Settings(database_url="postgresql+psycopg://user:secret@db:5432/autopilot")
+    assert settings.resolved_async_database_url == (
+        "postgresql+asyncpg://user:secret@db:5432/autopilot"
+    )